@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'restaurant.apps.RestaurantConfig',
     'rest_framework',
     'django_filters',
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'restaurant.metrics.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -144,5 +146,79 @@ REST_FRAMEWORK = {
     ),
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Menyu va taomlar javoblari keshi (restaurant/cache.py)
+MENU_CACHE_ALIAS = 'default'
+MENU_CACHE_TIMEOUT = 300
+
+# To'liq matnli qidiruv konfiguratsiyasi (restaurant/search.py)
+SEARCH_CONFIG = 'simple'
+
+# Buyurtmalarni haydovchilarga taqsimlash (restaurant/dispatch.py)
+DISPATCH_BATCH_SIZE = 200
+DISPATCH_INTERVAL_SECONDS = 5
+DISPATCH_MAX_ACTIVE_DELIVERIES = 1
+DISPATCH_RATING_WEIGHT = 1.0
+DISPATCH_LOAD_WEIGHT = 1.0
+
+# Haydovchi reytingida sharh vaznining yarim umri, kun (restaurant/ratings.py).
+# None — barcha sharhlar teng vaznli; o'zgartirilsa recompute_driver_ratings ni ishga tushiring.
+# Juda qisqa qiymat (~6 kundan kam) tizim tekshiruvida rad etiladi: vazn float dan chiqib ketadi
+DRIVER_RATING_HALF_LIFE_DAYS = None
+
+# Taxminiy yetkazish vaqti (restaurant/eta.py, refresh_eta buyrug'i)
+ETA_INTERVAL_SECONDS = 5
+# Oshxonada bir vaqtda tayyorlanadigan taomlar soni
+ETA_KITCHEN_PARALLELISM = 3
+ETA_HISTORY_DAYS = 14
+ETA_HISTORY_MIN_SAMPLES = 5
+ETA_DEFAULT_DELIVERY_MINUTES = 25
+# Baho shuncha soniyadan kam o'zgargan bo'lsa qayta yozilmaydi (ETag o'zgarmaydi)
+ETA_UPDATE_THRESHOLD_SECONDS = 60
+
+# Checkout da oshxona navbatining standart sig'imi, daqiqa (restaurant/kitchen.py).
+# Restaurant.kitchen_capacity_minutes ustun turadi; None — cheklanmagan
+KITCHEN_MAX_BACKLOG_MINUTES = None
+
+# Tavsiyalar (restaurant/recommendations.py, build_recommendations buyrug'i)
+RECOMMENDATION_TOP_K = 20
+# Bir partiyada o'qiladigan buyurtma/mijoz id oralig'i
+RECOMMENDATION_BATCH_SIZE = 50000
+RECOMMENDATION_LIKE_WEIGHT = 1.0
+RECOMMENDATION_REVIEW_WEIGHT = 1.0
+
+# Bo'sh haydovchilar indeksi (restaurant/availability.py) bazadan qayta quriladigan davr, soniya
+AVAILABILITY_INDEX_TTL = 60
+
+# Trend hisoblagichlari (restaurant/trending.py) bazadan qayta quriladigan davr, soniya
+TRENDING_INDEX_TTL = 60
+# trending/ endpointidagi k ning yuqori chegarasi (shuncha element tartiblangan holda saqlanadi)
+TRENDING_MAX_K = 50
+
+# CSV/NDJSON eksport (restaurant/export.py): server kursoridan bir martada o'qiladigan qatorlar
+EXPORT_CHUNK_SIZE = 2000
+
+# Kunlik statistika (restaurant/analytics.py): oldingi ishga tushirishdan oldinroqqa qarab tekshirish, soniya
+DAILY_STATS_OVERLAP_SECONDS = 300
+
+# So'rovlar soni va vaqt metrikalari (restaurant/metrics.py)
+QUERY_METRICS_HEADERS = DEBUG
+# True bo'lsa, viewset byudjetidan oshgan so'rov xato beradi (testlarda BudgetTestRunner yoqadi)
+QUERY_BUDGET_STRICT = False
+TEST_RUNNER = 'restaurant.test_runner.BudgetTestRunner'
+
+# Kursor bo'yicha sahifalash (orders, reviews, deliveries)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# Menyu va taomlarni ommaviy yozish (restaurant/bulk.py)
+BULK_WRITE_MAX_ITEMS = 5000
+BULK_WRITE_BATCH_SIZE = 1000
+
 
 
@@ -0,0 +1,161 @@
+"""
+Kunlik savdo statistikasi: DailyRestaurantStats va DailyDishStats.
+
+refresh_daily_stats() oxirgi ishga tushirishdan beri o'zgargan buyurtma va to'lovlar
+(updated_at) qaysi (restoran, kun) juftliklariga tegishli ekanini topadi va faqat
+shularning restoran va kunlarini qayta hisoblaydi. Hisoblash idempotent: eski qatorlar
+o'chirilib, bitta GROUP BY natijasidan qayta yoziladi. Boshqa restoran yoki kunga ko'chgan
+buyurtmaning eski juftligini signal StaleDailyStats ga yozadi, u ham qayta hisoblanadi.
+O'chirilgan buyurtmalar updated_at qoldirmaydi — ular uchun full=True (yoki --full) bilan
+to'liq qayta hisoblash kerak.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    Order, OrderItem, Payment, DailyRestaurantStats, DailyDishStats, RollupCheckpoint, StaleDailyStats,
+)
+
+CHECKPOINT = 'daily_stats'
+EXCLUDED_STATUSES = ('cancelled',)
+
+
+def _day_bounds(days):
+    """Kunlar ro'yxatini qamrab oluvchi [boshlanish, tugash) oralig'i (placed_at indeksi uchun)"""
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(min(days), time.min, tzinfo=tz)
+    end = datetime.combine(max(days) + timedelta(days=1), time.min, tzinfo=tz)
+    return start, end
+
+
+def touched_pairs(since):
+    """since dan beri o'zgargan buyurtma/to'lovlarning {(restaurant_id, kun)} to'plami"""
+    orders = (
+        Order.objects.filter(updated_at__gte=since)
+        .annotate(day=TruncDate('placed_at'))
+        .order_by()
+        .values_list('restaurant_id', 'day')
+        .distinct()
+    )
+    payments = (
+        Payment.objects.filter(updated_at__gte=since)
+        .annotate(day=TruncDate('order__placed_at'))
+        .order_by()
+        .values_list('order__restaurant_id', 'day')
+        .distinct()
+    )
+    return set(orders) | set(payments)
+
+
+def _restaurant_rows(restaurants, days):
+    start, end = _day_bounds(days)
+    queryset = Order.objects.filter(placed_at__gte=start, placed_at__lt=end)
+    if restaurants is not None:
+        queryset = queryset.filter(restaurant_id__in=restaurants)
+    return (
+        queryset.annotate(day=TruncDate('placed_at'))
+        .order_by()
+        .values('restaurant_id', 'day')
+        .annotate(
+            orders_count=Count('id'),
+            cancelled_count=Count('id', filter=Q(status__in=EXCLUDED_STATUSES)),
+            revenue=Sum('total_amount', filter=~Q(status__in=EXCLUDED_STATUSES)),
+            paid_amount=Sum('payment__amount', filter=Q(payment__status='paid')),
+        )
+    )
+
+
+def _dish_rows(restaurants, days):
+    start, end = _day_bounds(days)
+    queryset = OrderItem.objects.filter(order__placed_at__gte=start, order__placed_at__lt=end).exclude(
+        order__status__in=EXCLUDED_STATUSES
+    )
+    if restaurants is not None:
+        queryset = queryset.filter(order__restaurant_id__in=restaurants)
+    line_total = ExpressionWrapper(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    return (
+        queryset.annotate(day=TruncDate('order__placed_at'))
+        .order_by()
+        .values('order__restaurant_id', 'dish_id', 'day')
+        .annotate(quantity_sum=Sum('quantity'), revenue=Sum(line_total))
+    )
+
+
+def recompute(pairs=None):
+    """
+    Berilgan (restaurant_id, kun) juftliklari restoranlari va kunlarini (None — hammasini)
+    qayta hisoblaydi. Yozilgan restoran-kun qatorlari sonini qaytaradi.
+    """
+    if pairs is None:
+        bounds = Order.objects.aggregate(first=Min('placed_at'), last=Max('placed_at'))
+        if bounds['first'] is None:
+            days = set()
+        else:
+            days = {timezone.localdate(bounds['first']), timezone.localdate(bounds['last'])}
+        restaurants = None
+    else:
+        days = {day for _, day in pairs}
+        restaurants = {restaurant_id for restaurant_id, _ in pairs}
+
+    restaurant_stats, dish_stats = [], []
+    items_count = defaultdict(int)
+    if days:
+        for row in _dish_rows(restaurants, days):
+            if pairs is not None and row['day'] not in days:
+                continue
+            key = (row['order__restaurant_id'], row['day'])
+            items_count[key] += row['quantity_sum']
+            dish_stats.append(DailyDishStats(
+                restaurant_id=key[0], dish_id=row['dish_id'], day=key[1],
+                quantity=row['quantity_sum'], revenue=row['revenue'] or Decimal('0'),
+            ))
+        for row in _restaurant_rows(restaurants, days):
+            if pairs is not None and row['day'] not in days:
+                continue
+            key = (row['restaurant_id'], row['day'])
+            restaurant_stats.append(DailyRestaurantStats(
+                restaurant_id=key[0], day=key[1],
+                orders_count=row['orders_count'], cancelled_count=row['cancelled_count'],
+                items_count=items_count[key],
+                revenue=row['revenue'] or Decimal('0'), paid_amount=row['paid_amount'] or Decimal('0'),
+            ))
+
+    with transaction.atomic():
+        for model in (DailyDishStats, DailyRestaurantStats):
+            stale = model.objects.all()
+            if pairs is not None:
+                stale = stale.filter(restaurant_id__in=restaurants, day__in=days)
+            stale.delete()
+        DailyRestaurantStats.objects.bulk_create(restaurant_stats, batch_size=1000)
+        DailyDishStats.objects.bulk_create(dish_stats, batch_size=1000)
+    return len(restaurant_stats)
+
+
+def refresh_daily_stats(full=False):
+    """
+    Oxirgi ishga tushirishdan beri o'zgargan kunlarni qayta hisoblaydi.
+    Birinchi marta yoki full=True bo'lsa, hamma narsa qayta quriladi.
+    """
+    started = timezone.now()
+    checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT).first()
+    # Faqat o'qilgan qatorlar o'chiriladi, shu orada qo'shilganlari keyingi ishga tushirishga qoladi
+    stale = {
+        pk: (restaurant_id, day)
+        for pk, restaurant_id, day in StaleDailyStats.objects.values_list('pk', 'restaurant_id', 'day')
+    }
+    if full or checkpoint is None:
+        written = recompute()
+    else:
+        # Oldingi ishga tushirish paytida hali commit bo'lmagan yozuvlar ham qamrab olinadi
+        since = checkpoint.refreshed_at - timedelta(seconds=settings.DAILY_STATS_OVERLAP_SECONDS)
+        written = recompute(touched_pairs(since) | set(stale.values()))
+    StaleDailyStats.objects.filter(pk__in=stale).delete()
+    RollupCheckpoint.objects.update_or_create(name=CHECKPOINT, defaults={'refreshed_at': started})
+    return written
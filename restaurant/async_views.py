@@ -0,0 +1,252 @@
+"""
+Restoran, menyu, taom va buyurtmalar uchun ASGI-native o'qish endpointlari.
+
+Sinxron DRF viewsetlar ASGI ostida har bir so'rov uchun oqimni band qiladi. Bu yerdagi
+viewlar esa ORM ning async API si (aget, aiterator, aaggregate, afirst) bilan DB ni
+kutadi. Queryset, ruxsatlar, serializer va select_related/prefetch_related rejasi mos
+viewsetdan olinadi, shuning uchun javoblar sinxron endpointlarniki bilan bir xil.
+Barcha munosabatlar oldindan yuklangani uchun serializatsiya event loop ichida
+DB ga murojaat qilmaydi. ETag/304 va menyu keshi ham sinxron viewsetlar kabi ishlaydi.
+
+Sinxron endpointlardan farqlari:
+- DjangoFilterBackend o'rniga filterset_fields bo'yicha oddiy aniq tenglik filtri;
+- buyurtmalar ro'yxati o'z keyset kursori bilan faqat oldinga sahifalanadi.
+"""
+import base64
+import binascii
+from operator import attrgetter
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.dateparse import parse_datetime
+from django.views import View
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+
+from . import cache as response_cache
+from . import search
+from .mixins import CachedResponseMixin, ConditionalGetMixin
+from .views import RestaurantViewSet, MenuViewSet, DishViewSet, OrderViewSet
+
+
+async def authenticate(request):
+    """TokenAuthentication ning async varianti: 'Authorization: Token <key>'"""
+    auth = request.headers.get('Authorization', '').split()
+    if not auth or auth[0].lower() != 'token':
+        return AnonymousUser()
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed("Token sarlavhasi noto'g'ri.")
+    # customer_profile ham shu so'rovda olinadi, get_queryset da qo'shimcha so'rov bo'lmaydi
+    token = await Token.objects.select_related('user__customer_profile').filter(key=auth[1]).afirst()
+    if token is None:
+        raise exceptions.AuthenticationFailed("Token noto'g'ri.")
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed("Foydalanuvchi faol emas yoki o'chirilgan.")
+    return token.user
+
+
+class AsyncReadView(View):
+    """
+    viewset_class ning list va retrieve amallarini async bajaradi.
+    URL da pk bo'lsa retrieve, bo'lmasa list. query_budgets — metrikalar uchun.
+    """
+    viewset_class = None
+    basename = None
+    query_budgets = {}
+    chunk_size = 500
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, pk=None):
+        action = 'list' if pk is None else 'retrieve'
+        self._start_metrics(request, action)
+        try:
+            user = await authenticate(request)
+        except exceptions.AuthenticationFailed as error:
+            return self.error(error.detail, 401, {'WWW-Authenticate': 'Token'})
+
+        drf_request = Request(request)
+        drf_request.user = user
+        viewset = self.viewset_class(
+            request=drf_request, format_kwarg=None, action=action, basename=self.basename,
+            args=(), kwargs={} if pk is None else {'pk': pk},
+        )
+        for permission in viewset.get_permissions():
+            if not permission.has_permission(drf_request, viewset):
+                if not user.is_authenticated:
+                    return self.error(exceptions.NotAuthenticated.default_detail, 401, {'WWW-Authenticate': 'Token'})
+                return self.error(exceptions.PermissionDenied.default_detail, 403)
+
+        try:
+            queryset = await self.filter_queryset(drf_request, viewset, viewset.get_queryset())
+            if pk is not None:
+                queryset = queryset.filter(pk=pk)
+            return await self.conditional(request, viewset, queryset, action, pk)
+        except exceptions.APIException as error:
+            if isinstance(error.detail, (list, dict)):
+                return self.render(error.detail, error.status_code)
+            return self.error(error.detail, error.status_code)
+
+    async def conditional(self, request, viewset, queryset, action, pk):
+        if not isinstance(viewset, ConditionalGetMixin):
+            return await self.respond(request, viewset, queryset, action, pk)
+        etag, last_modified = await viewset.aget_freshness(queryset, listing=action == 'list')
+        if etag is None:
+            return await self.respond(request, viewset, queryset, action, pk)
+        response = viewset.not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = await self.respond(request, viewset, queryset, action, pk)
+        return viewset.patch_freshness_headers(response, etag, last_modified)
+
+    async def respond(self, request, viewset, queryset, action, pk):
+        cached = isinstance(viewset, CachedResponseMixin)
+        key = await sync_to_async(self._cache_key)(viewset, action, pk) if cached else None
+        if key is not None:
+            data = await sync_to_async(response_cache.lookup)(key)
+            if data is not None:
+                return self.render(data, headers={'X-Cache': 'HIT'})
+
+        if action == 'retrieve':
+            try:
+                instance = await queryset.aget()
+            except queryset.model.DoesNotExist:
+                return self.error(exceptions.NotFound.default_detail, 404)
+            data = viewset.get_serializer(instance).data
+            if cached:
+                await sync_to_async(self._store_detail)(viewset, pk, instance, data)
+        elif viewset.pagination_class is not None:
+            data = await self.paginate(request, viewset, queryset)
+        else:
+            data = viewset.get_serializer(await self._fetch(queryset), many=True).data
+            if key is not None:
+                await sync_to_async(response_cache.store)(key, data)
+        return self.render(data, headers={'X-Cache': 'MISS'} if cached else None)
+
+    async def filter_queryset(self, drf_request, viewset, queryset):
+        params = drf_request.query_params
+        filterset_fields = getattr(viewset, 'filterset_fields', None) or ()
+        for field in filterset_fields:
+            value = params.get(field)
+            if value in (None, ''):
+                continue
+            try:
+                queryset = queryset.filter(**{field: value})
+            except (ValueError, DjangoValidationError) as error:
+                raise exceptions.ValidationError({field: [str(error)]})
+        if params.get('search'):
+            # Trigram mavjudligi bir marta DB dan tekshiriladi, event loop da bo'lmasligi kerak
+            await sync_to_async(search.trigram_available)()
+        for backend in viewset.filter_backends:
+            if not issubclass(backend, DjangoFilterBackend):
+                queryset = backend().filter_queryset(drf_request, queryset, viewset)
+        return queryset
+
+    async def _fetch(self, queryset):
+        # prefetch_related bilan aiterator uchun chunk_size majburiy
+        return [obj async for obj in queryset.aiterator(chunk_size=self.chunk_size)]
+
+    async def paginate(self, request, viewset, queryset):
+        """
+        Keyset sahifalash: paginatorning ordering i bo'yicha (masalan -placed_at, -id),
+        ?cursor= oxirgi qatorning (vaqt, id) juftligi. Faqat oldinga yuriladi.
+        """
+        paginator = viewset.paginator
+        time_field, id_field = (field.lstrip('-') for field in paginator.ordering)
+        page_size = paginator.get_page_size(viewset.request)
+        queryset = queryset.order_by(*paginator.ordering)
+
+        cursor = request.GET.get(paginator.cursor_query_param)
+        if cursor:
+            position = self._decode_cursor(cursor)
+            if position is None:
+                raise exceptions.NotFound(paginator.invalid_cursor_message)
+            moment, last_id = position
+            queryset = queryset.filter(
+                Q(**{f'{time_field}__lt': moment}) | Q(**{time_field: moment, f'{id_field}__lt': last_id})
+            )
+
+        rows = await self._fetch(queryset[:page_size + 1])
+        next_url = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), paginator.cursor_query_param,
+                self._encode_cursor(getattr(last, time_field), getattr(last, id_field)),
+            )
+        return {'next': next_url, 'previous': None, 'results': viewset.get_serializer(rows, many=True).data}
+
+    @staticmethod
+    def _encode_cursor(moment, pk):
+        return base64.urlsafe_b64encode(f'{moment.isoformat()}|{pk}'.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            moment, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            moment = parse_datetime(moment)
+            return (moment, int(pk)) if moment is not None else None
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+
+    @staticmethod
+    def _cache_key(viewset, action, pk):
+        request = viewset.request
+        if action == 'retrieve':
+            return response_cache.detail_key(viewset.basename, pk, request)
+        scope = request.query_params.get(viewset.cache_scope_param) if viewset.cache_scope_param else None
+        return response_cache.list_key(viewset.basename, scope, request)
+
+    @staticmethod
+    def _store_detail(viewset, pk, instance, data):
+        owner = attrgetter(viewset.cache_owner_attr)(instance)
+        response_cache.remember_owner(viewset.basename, pk, owner)
+        response_cache.store(response_cache.detail_key(viewset.basename, pk, viewset.request, owner), data)
+
+    def _start_metrics(self, request, action):
+        request.metrics_endpoint = f'async-{self.basename}.{action}'
+        budget = self.query_budgets.get(action)
+        if budget is not None:
+            request.query_budget = budget
+        collector = getattr(request, 'metrics_collector', None)
+        if collector is not None:
+            request.metrics_view_started = collector.mark()
+
+    @staticmethod
+    def render(data, status=200, headers=None):
+        return HttpResponse(
+            JSONRenderer().render(data), status=status, content_type='application/json', headers=headers,
+        )
+
+    def error(self, detail, status, headers=None):
+        return self.render({'detail': detail}, status, headers)
+
+
+class AsyncRestaurantView(AsyncReadView):
+    viewset_class = RestaurantViewSet
+    basename = 'restaurant'
+    query_budgets = {'list': 4, 'retrieve': 4}
+
+
+class AsyncMenuView(AsyncReadView):
+    viewset_class = MenuViewSet
+    basename = 'menu'
+    query_budgets = {'list': 4, 'retrieve': 4}
+
+
+class AsyncDishView(AsyncReadView):
+    viewset_class = DishViewSet
+    basename = 'dish'
+    query_budgets = {'list': 4, 'retrieve': 4}
+
+
+class AsyncOrderView(AsyncReadView):
+    viewset_class = OrderViewSet
+    basename = 'order'
+    query_budgets = {'list': 6, 'retrieve': 6}
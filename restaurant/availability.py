@@ -0,0 +1,155 @@
+"""
+Bo'sh haydovchilarning xotiradagi indeksi.
+
+Onlayn va faol haydovchilar reyting bo'yicha savatlarga (0.00–5.00, 0.01 qadam)
+joylanadi, har bir haydovchining faol yetkazishlari soni ham saqlanadi. Eng yaxshi
+bo'sh haydovchini olish (claim) bazaga murojaat qilmaydi va savatlar soni
+o'zgarmas bo'lgani uchun O(1) ishlaydi.
+
+Indeks jarayon (process) ichida yashaydi: Driver va Delivery signallari uni
+yangilab boradi, AVAILABILITY_INDEX_TTL soniyadan keyin esa bazadan qayta quriladi,
+shunda boshqa jarayonlardagi o'zgarishlar ham yetib keladi.
+
+claim faqat shu jarayon ichida atomar: bazada sig'im tekshirilmaydi, shuning uchun ikki
+worker (yoki dispatch_batch bilan parallel so'rov) TTL oralig'ida bitta haydovchini bir vaqtda
+band qilishi va uni DISPATCH_MAX_ACTIVE_DELIVERIES dan oshirib yuborishi mumkin. Qat'iy
+chegara kerak bo'lsa dispatch_batch (select_for_update bilan) ishlatiladi.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count
+
+MAX_BUCKET = 500
+
+
+def _bucket(rating):
+    return min(MAX_BUCKET, max(0, int(round(float(rating) * 100))))
+
+
+class DriverAvailabilityIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._buckets = [{} for _ in range(MAX_BUCKET + 1)]
+        self._top = -1
+        self._drivers = {}        # driver_id -> (bucket, onlayn va faolmi)
+        self._loads = {}          # driver_id -> faol yetkazishlar soni
+        self._reserved = {}       # claim qilingan, lekin Delivery signali hali kelmagan
+        self._loaded_at = None
+
+    @property
+    def capacity(self):
+        return settings.DISPATCH_MAX_ACTIVE_DELIVERIES
+
+    def _place(self, driver_id):
+        bucket, available = self._drivers[driver_id]
+        if available and self._loads.get(driver_id, 0) < self.capacity:
+            self._buckets[bucket][driver_id] = None
+            self._top = max(self._top, bucket)
+
+    def _unplace(self, driver_id):
+        if driver_id in self._drivers:
+            self._buckets[self._drivers[driver_id][0]].pop(driver_id, None)
+
+    def rebuild(self):
+        from .dispatch import ACTIVE_DELIVERY_STATUSES
+        from .models import Driver, Delivery
+
+        drivers = Driver.objects.filter(is_online=True, is_active=True).order_by().values_list('id', 'rating')
+        loads = (
+            Delivery.objects.filter(status__in=ACTIVE_DELIVERY_STATUSES, driver__isnull=False)
+            .order_by()
+            .values('driver_id')
+            .annotate(active=Count('id'))
+            .values_list('driver_id', 'active')
+        )
+        with self._lock:
+            # claim qilingan, lekin Delivery hali commit bo'lmagan bandliklar bazada ko'rinmaydi:
+            # ular saqlanadi, aks holda delivery_started yuklamani ikkinchi marta oshiradi
+            reserved = {driver_id: count for driver_id, count in self._reserved.items() if count}
+            self._reset()
+            self._loads = dict(loads)
+            self._reserved = reserved
+            for driver_id, count in reserved.items():
+                self._loads[driver_id] = self._loads.get(driver_id, 0) + count
+            for driver_id, rating in drivers:
+                self._drivers[driver_id] = (_bucket(rating), True)
+                self._place(driver_id)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > settings.AVAILABILITY_INDEX_TTL:
+            self.rebuild()
+
+    def claim(self):
+        """Eng yuqori reytingli bo'sh haydovchi id sini band qiladi, bo'lmasa None"""
+        self.ensure_loaded()
+        with self._lock:
+            while self._top >= 0 and not self._buckets[self._top]:
+                self._top -= 1
+            if self._top < 0:
+                return None
+            bucket = self._buckets[self._top]
+            driver_id = next(iter(bucket))
+            del bucket[driver_id]
+            self._loads[driver_id] = self._loads.get(driver_id, 0) + 1
+            self._reserved[driver_id] = self._reserved.get(driver_id, 0) + 1
+            # Sig'imi qolgan bo'lsa, savat oxiriga qaytadi (bir xil reytinglilar navbat bilan)
+            self._place(driver_id)
+            return driver_id
+
+    def release(self, driver_id):
+        """claim qilingan haydovchi ishlatilmasa, bandlikni bekor qiladi"""
+        with self._lock:
+            if self._reserved.get(driver_id):
+                self._reserved[driver_id] -= 1
+                self._change_load(driver_id, -1)
+
+    def upsert_driver(self, driver_id, rating, available):
+        with self._lock:
+            self._unplace(driver_id)
+            self._drivers[driver_id] = (_bucket(rating), available)
+            self._place(driver_id)
+
+    def remove_driver(self, driver_id):
+        with self._lock:
+            self._unplace(driver_id)
+            self._drivers.pop(driver_id, None)
+            self._loads.pop(driver_id, None)
+            self._reserved.pop(driver_id, None)
+
+    def _change_load(self, driver_id, delta):
+        self._unplace(driver_id)
+        self._loads[driver_id] = max(0, self._loads.get(driver_id, 0) + delta)
+        if driver_id in self._drivers:
+            self._place(driver_id)
+
+    def delivery_started(self, driver_id):
+        with self._lock:
+            if self._reserved.get(driver_id):
+                # claim paytida yuklama allaqachon oshirilgan
+                self._reserved[driver_id] -= 1
+                return
+            self._change_load(driver_id, 1)
+
+    def delivery_finished(self, driver_id):
+        with self._lock:
+            self._change_load(driver_id, -1)
+
+    def load_of(self, driver_id):
+        return self._loads.get(driver_id, 0)
+
+
+index = DriverAvailabilityIndex()
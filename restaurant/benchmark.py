@@ -0,0 +1,221 @@
+"""
+restaurant/urls.py routeridagi barcha endpointlarni test klienti orqali o'lchash.
+
+Har bir viewset uchun list, birinchi obyektning retrieve i, ?view=compact varianti
+(bo'lsa) va GET bilan ishlaydigan detail=False amallari chaqiriladi. Har bir endpoint
+uchun p50/p95 kechikish, so'rovdagi SQL soni va javob hajmi hisoblanadi.
+Keshlanadigan list/retrieve lar (CachedResponseMixin) har bir so'rovdan oldin kesh
+tozalanib "sovuq" holda o'lchanadi, keshdan olingan javob esa alohida '@cached' qatorida.
+compare() ikki natija faylini (masalan ikki git reviziyasi) solishtiradi.
+run_asgi() sinxron va async (restaurant/async_views.py) endpointlarni ASGI handler
+orqali bir vaqtda ko'p so'rov bilan yuklab, o'tkazuvchanlikni (so'rov/soniya) solishtiradi.
+"""
+import asyncio
+import json
+import math
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connections
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .metrics import QueryCollector
+from .mixins import CachedResponseMixin
+from .urls import router
+
+BENCHMARK_USERNAME = 'benchmark'
+ASYNC_BASENAMES = ('restaurant', 'menu', 'dish', 'order')
+# O'lchash vaqtida javoblar keshi shu alohida aliasga yo'naltiriladi, uni tozalash boshqa keshlarga tegmaydi
+BENCHMARK_CACHE_ALIAS = 'benchmark'
+CACHED_ACTIONS = ('list', 'retrieve')
+
+
+def percentile(values, fraction):
+    """Eng yaqin rang (nearest-rank) bo'yicha persentil"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def endpoints():
+    """[(nom, url)] — routerdagi har bir viewset uchun o'qish endpointlari"""
+    result = []
+    for prefix, viewset, basename in router.registry:
+        list_url = reverse(f'{basename}-list')
+        result.append((f'{basename}.list', list_url))
+        compact = getattr(viewset, 'compact_serializer_class', None) is not None
+        if compact:
+            result.append((f'{basename}.list?compact', f'{list_url}?view=compact'))
+
+        first = viewset.queryset.model.objects.order_by('pk').values_list('pk', flat=True).first()
+        if first is not None:
+            detail_url = reverse(f'{basename}-detail', args=[first])
+            result.append((f'{basename}.retrieve', detail_url))
+            if compact:
+                result.append((f'{basename}.retrieve?compact', f'{detail_url}?view=compact'))
+
+        for extra in viewset.get_extra_actions():
+            if not extra.detail and 'get' in extra.mapping:
+                result.append((f'{basename}.{extra.url_name}', reverse(f'{basename}-{extra.url_name}')))
+    return result
+
+
+def async_endpoint_pairs():
+    """[(nom, sinxron url, async url)] — async varianti bor endpointlar"""
+    viewsets = {basename: viewset for _, viewset, basename in router.registry}
+    pairs = []
+    for basename in ASYNC_BASENAMES:
+        pairs.append((f'{basename}.list', reverse(f'{basename}-list'), reverse(f'async-{basename}-list')))
+        first = viewsets[basename].queryset.model.objects.order_by('pk').values_list('pk', flat=True).first()
+        if first is not None:
+            pairs.append((
+                f'{basename}.retrieve',
+                reverse(f'{basename}-detail', args=[first]), reverse(f'async-{basename}-detail', args=[first]),
+            ))
+    return pairs
+
+
+def _benchmark_user():
+    user, _ = User.objects.get_or_create(username=BENCHMARK_USERNAME, defaults={'is_staff': True})
+    return user
+
+
+def _client():
+    client = APIClient()
+    client.force_authenticate(_benchmark_user())
+    return client
+
+
+def cached_endpoint(name):
+    """Endpoint javobi CachedResponseMixin orqali keshlanadimi"""
+    viewsets = {basename: viewset for _, viewset, basename in router.registry}
+    basename, _, action = name.partition('.')
+    return issubclass(viewsets[basename], CachedResponseMixin) and action.split('?')[0] in CACHED_ACTIONS
+
+
+def measure(url, client, repeat, warmup, cold=False):
+    """cold=True — har bir so'rovdan oldin javoblar keshi tozalanadi"""
+    latencies, queries, sizes, statuses = [], [], [], set()
+    for run in range(warmup + repeat):
+        if cold:
+            caches[settings.MENU_CACHE_ALIAS].clear()
+        collector = QueryCollector()
+        with connections['default'].execute_wrapper(collector):
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+        if run < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(collector.queries)
+        sizes.append(len(response.content))
+        statuses.add(response.status_code)
+    return {
+        'status': sorted(statuses),
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'queries': round(statistics.mean(queries), 2),
+        'bytes': round(statistics.mean(sizes)),
+    }
+
+
+def run(repeat=20, warmup=2, only=None):
+    client = _client()
+    results = {}
+    cache_settings = {
+        'CACHES': {**settings.CACHES, BENCHMARK_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': BENCHMARK_CACHE_ALIAS,
+        }},
+        'MENU_CACHE_ALIAS': BENCHMARK_CACHE_ALIAS,
+    }
+    # Test klienti 'testserver' hostidan so'rov yuboradi
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], **cache_settings):
+        for name, url in endpoints():
+            if only and not any(part in name for part in only):
+                continue
+            cached = cached_endpoint(name)
+            results[name] = {'url': url, **measure(url, client, repeat, warmup, cold=cached)}
+            if cached:
+                results[f'{name}@cached'] = {'url': url, **measure(url, client, repeat, warmup)}
+    return results
+
+
+async def _load(client, url, headers, total, concurrency):
+    """total ta so'rovni concurrency ta parallel mijoz bilan yuboradi"""
+    latencies, statuses = [], set()
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses.add(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'status': sorted(statuses),
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+    }
+
+
+def run_asgi(total=200, concurrency=50, only=None):
+    """
+    {endpoint: {'sync': ..., 'async': ...}} — ikkala variant ham ASGI handler orqali
+    (AsyncClient) bir xil yuklama bilan o'lchanadi.
+    """
+    token, _ = Token.objects.get_or_create(user=_benchmark_user())
+    headers = {'Authorization': f'Token {token.key}'}
+    pairs = [pair for pair in async_endpoint_pairs() if not only or any(part in pair[0] for part in only)]
+
+    async def main():
+        client = AsyncClient()
+        results = {}
+        for name, sync_url, async_url in pairs:
+            results[name] = {
+                'sync': await _load(client, sync_url, headers, total, concurrency),
+                'async': await _load(client, async_url, headers, total, concurrency),
+            }
+        return results
+
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        return async_to_sync(main)()
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    [(endpoint, baseline, current, regressiya sabablari)] qaytaradi.
+    SQL soni oshishi yoki p95 threshold dan ko'proq sekinlashishi regressiya hisoblanadi.
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        before, after = baseline.get(name), current.get(name)
+        reasons = []
+        if before and after:
+            if after['queries'] > before['queries']:
+                reasons.append(f"queries {before['queries']} -> {after['queries']}")
+            if after['p95_ms'] > before['p95_ms'] * (1 + threshold):
+                reasons.append(f"p95 {before['p95_ms']} -> {after['p95_ms']} ms")
+        rows.append((name, before, after, reasons))
+    return rows
+
+
+def load(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def save(results, path):
+    with open(path, 'w', encoding='utf-8') as target:
+        json.dump(results, target, indent=2, ensure_ascii=False)
@@ -0,0 +1,61 @@
+"""
+Menyu va taomlarni ommaviy yaratish, yangilash va upsert qilish (POST/PUT/PATCH bulk/).
+
+Qatorlar bulk_create/bulk_update bilan yoziladi: restoran onboarding idagi yuzlab taom
+yoki minglab taom narxini o'zgartirish bitta so'rov va bir necha SQL bilan bajariladi.
+bulk_create va bulk_update signal yubormaydi, shuning uchun signals.py dagi ishlar shu
+yerda bajariladi: tegishli restoranlarning javoblar keshi eskirtiriladi va qidiruv
+vektorlari bitta UPDATE bilan yangilanadi. bulk_update auto_now ni qo'ymaydi — updated_at
+(ETag) qo'lda yoziladi.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache as response_cache
+from .search import update_search_vectors
+
+MODES = {'POST': 'create', 'PUT': 'upsert', 'PATCH': 'update'}
+
+
+def write(model, mode, rows, existing, restaurant_ids, search_fields=()):
+    """
+    rows — tekshirilgan qatorlar (dict), existing — {pk: obyekt} (yangilanadiganlari),
+    restaurant_ids — eski va yangi egalar. (created, updated) id ro'yxatlarini qaytaradi.
+    """
+    batch_size = settings.BULK_WRITE_BATCH_SIZE
+    touched = set().union(*(row.keys() for row in rows)) - {'id'}
+
+    with transaction.atomic():
+        if mode == 'update':
+            now = timezone.now()
+            objs = []
+            for row in rows:
+                obj = existing[row['id']]
+                for field, value in row.items():
+                    setattr(obj, field, value)
+                obj.updated_at = now
+                objs.append(obj)
+            model.objects.bulk_update(objs, [*sorted(touched), 'updated_at'], batch_size=batch_size)
+        else:
+            objs = [model(**row) for row in rows]
+            if mode == 'create':
+                model.objects.bulk_create(objs, batch_size=batch_size)
+            else:
+                # PUT — to'liq qator: berilmagan maydonlar standart qiymatiga qaytadi.
+                # auto_now maydoni editable emas, lekin INSERT qiymati (hozirgi vaqt) yozilishi kerak
+                update_fields = [
+                    field.name for field in model._meta.concrete_fields
+                    if not field.primary_key and (field.editable or field.name == 'updated_at')
+                ]
+                model.objects.bulk_create(
+                    objs, batch_size=batch_size,
+                    update_conflicts=True, unique_fields=['id'], update_fields=update_fields,
+                )
+
+        created = [obj.pk for row, obj in zip(rows, objs) if 'id' not in row]
+        updated = [obj.pk for row, obj in zip(rows, objs) if 'id' in row]
+        if search_fields and (created or mode == 'upsert' or touched & set(search_fields)):
+            update_search_vectors(model, [obj.pk for obj in objs])
+        response_cache.invalidate_restaurants(restaurant_ids)
+    return created, updated
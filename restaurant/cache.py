@@ -0,0 +1,122 @@
+"""
+Menyu va taomlar uchun javoblar keshi.
+
+Har bir restoranning o'z versiya hisoblagichi bor: restoran, uning menyulari yoki
+taomlari o'zgarganda versiya oshiriladi va eski kalitlar o'z-o'zidan eskiradi.
+Restoran bo'yicha filtrlanmagan ro'yxatlar umumiy ('all') versiyadan foydalanadi.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .metrics import registry as metrics_registry
+
+GLOBAL_SCOPE = 'all'
+KEY_PREFIX = 'menu-cache'
+# Hit/miss hisoblagichlari /metrics/ javobida: counters.response_cache
+STATS_GROUP = 'response_cache'
+
+
+def get_cache():
+    return caches[settings.MENU_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'{KEY_PREFIX}:version:{scope}'
+
+
+def _owner_key(basename, pk):
+    return f'{KEY_PREFIX}:owner:{basename}:{pk}'
+
+
+def _new_version():
+    # Versiya kaliti keshdan chiqib ketsa ham eski yozuvlar bilan to'qnashmasligi uchun
+    return time.time_ns()
+
+
+def get_version(scope):
+    cache = get_cache()
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def _bump(scope):
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(scope))
+    except ValueError:
+        cache.set(_version_key(scope), _new_version(), timeout=None)
+
+
+def _bump_scopes(scopes):
+    for scope in scopes:
+        _bump(scope)
+
+
+def invalidate_restaurant(restaurant_id, basename=None, pk=None):
+    """
+    Restoran versiyasini (va umumiy versiyani) oshiradi. basename/pk berilsa, obyekt
+    avval boshqa restoranga tegishli bo'lgan bo'lsa, o'sha restoran ham eskiradi.
+    Versiya darhol va tranzaksiya commit bo'lgandan keyin yana bir bor oshiriladi,
+    aks holda commit dan oldingi ma'lumot yangi versiya ostida keshlanib qolishi mumkin.
+    """
+    scopes = {GLOBAL_SCOPE}
+    if restaurant_id is not None:
+        scopes.add(str(restaurant_id))
+    if basename is not None and pk is not None:
+        cache = get_cache()
+        previous_owner = cache.get(_owner_key(basename, pk))
+        if previous_owner is not None:
+            scopes.add(str(previous_owner))
+        cache.delete(_owner_key(basename, pk))
+    _bump_scopes(scopes)
+    transaction.on_commit(lambda: _bump_scopes(scopes))
+
+
+def invalidate_restaurants(restaurant_ids):
+    """Bir nechta restoranni birdaniga eskirtiradi (signal yubormaydigan bulk yozuvlar uchun)"""
+    scopes = {GLOBAL_SCOPE, *(str(restaurant_id) for restaurant_id in restaurant_ids if restaurant_id is not None)}
+    _bump_scopes(scopes)
+    transaction.on_commit(lambda: _bump_scopes(scopes))
+
+
+def _params_hash(request):
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return hashlib.md5(params.encode()).hexdigest()
+
+
+def list_key(basename, scope, request):
+    scope = str(scope) if scope else GLOBAL_SCOPE
+    return f'{KEY_PREFIX}:{basename}:list:{scope}:{get_version(scope)}:{_params_hash(request)}'
+
+
+def detail_key(basename, pk, request, owner=None):
+    """Obyekt egasi (restoran) noma'lum bo'lsa None qaytaradi"""
+    if owner is None:
+        owner = get_cache().get(_owner_key(basename, pk))
+        if owner is None:
+            return None
+    return f'{KEY_PREFIX}:{basename}:detail:{pk}:{get_version(str(owner))}:{_params_hash(request)}'
+
+
+def remember_owner(basename, pk, owner):
+    get_cache().set(_owner_key(basename, pk), owner, timeout=settings.MENU_CACHE_TIMEOUT)
+
+
+def lookup(key):
+    data = get_cache().get(key) if key else None
+    metrics_registry.count(STATS_GROUP, 'hits' if data is not None else 'misses')
+    return data
+
+
+def store(key, data):
+    get_cache().set(key, data, timeout=settings.MENU_CACHE_TIMEOUT)
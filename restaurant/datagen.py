@@ -0,0 +1,168 @@
+"""
+Benchmark va yuklama sinovlari uchun sintetik ma'lumotlar generatori.
+
+Barcha qatorlar bulk_create bilan yoziladi, hajm scale koeffitsienti bilan
+boshqariladi (scale=1: 20 restoran, 200 mijoz, 2000 buyurtma). Bir xil seed bir
+xil ma'lumot beradi. bulk_create signal yubormaydi, shuning uchun oxirida
+hisoblagichlar, qidiruv vektorlari, kesh va haydovchilar indeksi qo'lda yangilanadi.
+"""
+import io
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache as response_cache
+from .analytics import refresh_daily_stats
+from .availability import index as availability_index
+from .eta import refresh_estimates
+from .models import (
+    Restaurant, RestaurantLike, RestaurantComment, Menu, Dish, Customer, Driver,
+    Order, OrderItem, Payment, Delivery, Review,
+)
+from .search import update_search_vectors
+from .trending import index as trending_index
+
+BASE_COUNTS = {'restaurants': 20, 'customers': 200, 'drivers': 30, 'orders': 2000}
+MENUS_PER_RESTAURANT = 3
+DISHES_PER_MENU = 10
+CATEGORIES = ['Milliy', 'Fast food', 'Ichimlik', 'Shirinlik', 'Salat', 'Sho‘rva']
+WORDS = ['Plov', 'Lag‘mon', 'Somsa', 'Burger', 'Pizza', 'Sushi', 'Shashlik', 'Manti', 'Kabob', 'Salat']
+ORDER_STATUSES = ['pending', 'preparing', 'delivering', 'completed', 'completed', 'completed', 'cancelled']
+DELIVERY_STATUS = {'delivering': 'picked_up', 'completed': 'delivered'}
+BATCH_SIZE = 2000
+
+
+def _counts(scale):
+    return {name: max(1, int(count * scale)) for name, count in BASE_COUNTS.items()}
+
+
+def generate(scale=1.0, seed=0, days=90):
+    """Ma'lumotlarni yaratadi va har bir model bo'yicha yaratilgan qatorlar sonini qaytaradi"""
+    rng = random.Random(seed)
+    counts = _counts(scale)
+    # Takroriy ishga tushirishda unique telefon/email to'qnashmasligi uchun
+    tag = f'{int(time.time()) % 10 ** 6:06d}'
+    now = timezone.now()
+
+    with transaction.atomic():
+        restaurants = Restaurant.objects.bulk_create([
+            Restaurant(
+                name=f"{rng.choice(WORDS)} House {i}", description=f"{rng.choice(CATEGORIES)} taomlari",
+                address=f"Toshkent, {rng.randint(1, 200)}-uy", phone=f"+1{tag}{i:07d}",
+                email=f"restaurant{i}.{tag}@example.com",
+            )
+            for i in range(counts['restaurants'])
+        ], batch_size=BATCH_SIZE)
+        menus = Menu.objects.bulk_create([
+            Menu(name=f"Menyu {j}", restaurant=restaurant)
+            for restaurant in restaurants for j in range(MENUS_PER_RESTAURANT)
+        ], batch_size=BATCH_SIZE)
+        dishes = Dish.objects.bulk_create([
+            Dish(
+                name=f"{rng.choice(WORDS)} {k}", category=rng.choice(CATEGORIES), menu=menu,
+                price=Decimal(rng.randint(100, 5000)) / 100, prep_time_minutes=rng.randint(5, 40),
+                is_available=rng.random() > 0.05,
+            )
+            for menu in menus for k in range(DISHES_PER_MENU)
+        ], batch_size=BATCH_SIZE)
+        customers = Customer.objects.bulk_create([
+            Customer(full_name=f"Mijoz {i}", email=f"customer{i}.{tag}@example.com", phone=f"+2{tag}{i:07d}")
+            for i in range(counts['customers'])
+        ], batch_size=BATCH_SIZE)
+        drivers = Driver.objects.bulk_create([
+            Driver(
+                full_name=f"Haydovchi {i}", phone=f"+3{tag}{i:07d}", vehicle_info="Cobalt",
+                is_online=rng.random() > 0.3, rating=Decimal(rng.randint(300, 500)) / 100,
+            )
+            for i in range(counts['drivers'])
+        ], batch_size=BATCH_SIZE)
+
+        dishes_by_restaurant = {}
+        for dish in dishes:
+            dishes_by_restaurant.setdefault(dish.menu.restaurant_id, []).append(dish)
+
+        orders, items_by_order = [], []
+        for _ in range(counts['orders']):
+            restaurant = rng.choice(restaurants)
+            status = rng.choice(ORDER_STATUSES)
+            chosen = rng.sample(dishes_by_restaurant[restaurant.id], rng.randint(1, 4))
+            items = [(dish, rng.randint(1, 3)) for dish in chosen]
+            orders.append(Order(
+                delivery_address=f"Toshkent, {rng.randint(1, 500)}-uy", status=status,
+                customer=rng.choice(customers), restaurant=restaurant,
+                driver=rng.choice(drivers) if status in DELIVERY_STATUS else None,
+                total_amount=sum(dish.price * quantity for dish, quantity in items),
+            ))
+            items_by_order.append(items)
+        orders = Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+
+        # auto_now_add bulk_create da ham joriy vaqtni qo'yadi, vaqtlar keyin tarqatiladi
+        for order in orders:
+            order.placed_at = now - timedelta(minutes=rng.randint(0, days * 24 * 60))
+        Order.objects.bulk_update(orders, ['placed_at'], batch_size=BATCH_SIZE)
+
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, dish=dish, quantity=quantity, unit_price=dish.price)
+            for order, items in zip(orders, items_by_order) for dish, quantity in items
+        ], batch_size=BATCH_SIZE)
+        Payment.objects.bulk_create([
+            Payment(
+                order=order, amount=order.total_amount, method=rng.choice(['cash', 'card', 'online']),
+                status='failed' if order.status == 'cancelled' else 'paid',
+                paid_at=None if order.status == 'cancelled' else order.placed_at,
+            )
+            for order in orders if order.status != 'pending'
+        ], batch_size=BATCH_SIZE)
+        Delivery.objects.bulk_create([
+            Delivery(
+                order=order, driver=order.driver, status=DELIVERY_STATUS[order.status],
+                pickup_at=order.placed_at + timedelta(minutes=20),
+                delivered_at=order.placed_at + timedelta(minutes=45) if order.status == 'completed' else None,
+            )
+            for order in orders if order.status in DELIVERY_STATUS
+        ], batch_size=BATCH_SIZE)
+        reviews = Review.objects.bulk_create([
+            Review(
+                order=order, customer=order.customer, restaurant=order.restaurant, driver=order.driver,
+                rating=rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 2, 4, 6])[0], comment="Yaxshi",
+            )
+            for order in orders if order.status == 'completed' and rng.random() < 0.3
+        ], batch_size=BATCH_SIZE)
+
+        like_pairs = {
+            (rng.choice(restaurants).id, rng.choice(customers).id)
+            for _ in range(counts['customers'] * 2)
+        }
+        likes = RestaurantLike.objects.bulk_create([
+            RestaurantLike(restaurant_id=restaurant_id, customer_id=customer_id)
+            for restaurant_id, customer_id in sorted(like_pairs)
+        ], batch_size=BATCH_SIZE)
+        comments = RestaurantComment.objects.bulk_create([
+            RestaurantComment(restaurant=rng.choice(restaurants), customer=rng.choice(customers), text="Zo‘r joy")
+            for _ in range(counts['customers'])
+        ], batch_size=BATCH_SIZE)
+
+    call_command('rebuild_restaurant_counters', stdout=io.StringIO())
+    call_command('recompute_driver_ratings', stdout=io.StringIO())
+    call_command('rebuild_kitchen_load', stdout=io.StringIO())
+    call_command('build_recommendations', stdout=io.StringIO())
+    update_search_vectors(Restaurant, [restaurant.pk for restaurant in restaurants])
+    update_search_vectors(Dish, [dish.pk for dish in dishes])
+    for restaurant in restaurants:
+        response_cache.invalidate_restaurant(restaurant.pk)
+    availability_index.invalidate()
+    trending_index.invalidate()
+    refresh_daily_stats(full=True)
+    refresh_estimates()
+
+    return {
+        'restaurants': len(restaurants), 'menus': len(menus), 'dishes': len(dishes),
+        'customers': len(customers), 'drivers': len(drivers), 'orders': len(orders),
+        'reviews': len(reviews), 'likes': len(likes), 'comments': len(comments),
+    }
+
@@ -0,0 +1,105 @@
+"""
+Kutilayotgan buyurtmalarni onlayn haydovchilarga partiyalab biriktirish.
+
+Har bir partiyada buyurtmalar va haydovchilar select_for_update(skip_locked=True)
+bilan bloklanadi, shuning uchun bir nechta dispatcher jarayoni bir vaqtda ishlasa
+ham bitta buyurtma ikki marta biriktirilmaydi.
+"""
+import heapq
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .availability import index as availability_index
+from .models import Driver, Order, Delivery
+
+DISPATCHABLE_ORDER_STATUSES = ('pending', 'preparing')
+ACTIVE_DELIVERY_STATUSES = ('assigned', 'picked_up')
+
+
+def driver_score(rating, load):
+    """Yuqori reyting va kam yuklama — yuqori ball"""
+    return settings.DISPATCH_RATING_WEIGHT * float(rating) - settings.DISPATCH_LOAD_WEIGHT * load
+
+
+def assign(order_ids, drivers, loads, capacity):
+    """
+    Greedy taqsimlash: eng eski buyurtma eng yuqori balli bo'sh haydovchiga beriladi,
+    so'ng haydovchining bali yangi yuklama bilan qayta hisoblanadi.
+    drivers — [(driver_id, rating)], loads — {driver_id: faol yetkazishlar soni}.
+    [(order_id, driver_id)] qaytaradi.
+    """
+    ratings = dict(drivers)
+    heap = [
+        (-driver_score(rating, loads.get(driver_id, 0)), driver_id)
+        for driver_id, rating in drivers
+        if loads.get(driver_id, 0) < capacity
+    ]
+    heapq.heapify(heap)
+
+    assignments = []
+    for order_id in order_ids:
+        if not heap:
+            break
+        _, driver_id = heapq.heappop(heap)
+        assignments.append((order_id, driver_id))
+        loads[driver_id] = loads.get(driver_id, 0) + 1
+        if loads[driver_id] < capacity:
+            heapq.heappush(heap, (-driver_score(ratings[driver_id], loads[driver_id]), driver_id))
+    return assignments
+
+
+def _record_assignments(assignments):
+    for _, driver_id in assignments:
+        availability_index.delivery_started(driver_id)
+
+
+def dispatch_batch(batch_size=None, capacity=None):
+    """Bitta partiyani bitta tranzaksiyada taqsimlaydi va [(order_id, driver_id)] qaytaradi"""
+    batch_size = batch_size or settings.DISPATCH_BATCH_SIZE
+    capacity = capacity or settings.DISPATCH_MAX_ACTIVE_DELIVERIES
+
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(status__in=DISPATCHABLE_ORDER_STATUSES, driver__isnull=True, delivery__isnull=True)
+            .order_by('placed_at', 'id')
+            .only('id')[:batch_size]
+        )
+        if not orders:
+            return []
+
+        drivers = list(
+            Driver.objects.select_for_update(skip_locked=True)
+            .filter(is_online=True, is_active=True)
+            .order_by()
+            .values_list('id', 'rating')
+        )
+        loads = dict(
+            Delivery.objects.filter(driver_id__in=[driver_id for driver_id, _ in drivers], status__in=ACTIVE_DELIVERY_STATUSES)
+            .order_by()
+            .values('driver_id')
+            .annotate(active=Count('id'))
+            .values_list('driver_id', 'active')
+        )
+
+        assignments = assign([order.id for order in orders], drivers, loads, capacity)
+        if not assignments:
+            return []
+
+        drivers_by_order = dict(assignments)
+        now = timezone.now()
+        assigned_orders = [order for order in orders if order.id in drivers_by_order]
+        for order in assigned_orders:
+            order.driver_id = drivers_by_order[order.id]
+            order.updated_at = now
+        Order.objects.bulk_update(assigned_orders, ['driver', 'updated_at'])
+        Delivery.objects.bulk_create([
+            Delivery(order_id=order_id, driver_id=driver_id, status='assigned')
+            for order_id, driver_id in assignments
+        ])
+        # bulk_create signal yubormaydi, indeksdagi yuklamani o'zimiz oshiramiz
+        transaction.on_commit(lambda: _record_assignments(assignments))
+    return assignments
@@ -0,0 +1,167 @@
+"""
+Buyurtmalarning taxminiy yetkazish vaqti (Order.estimated_delivery_time, Delivery.estimated_time).
+
+Barcha faol buyurtmalar bitta o'tishda NumPy massivlari ustida qayta hisoblanadi
+(refresh_eta buyrug'i har bir necha soniyada ishga tushiradi), o'zgarganlari bulk_update
+bilan yoziladi. Buyurtmani kuzatuvchi mijozlar saqlangan qiymatni o'qiydi.
+
+Model:
+- oshxona ishi: taomlar parallel tayyorlanadi — eng uzun taomdan va jami ish / ETA_KITCHEN_PARALLELISM
+  dan kam emas (Dish.prep_time_minutes, miqdor bilan);
+- navbat: shu restoranda oldinda turgan buyurtmalar ishi (avval 'preparing', keyin 'pending',
+  placed_at bo'yicha) / ETA_KITCHEN_PARALLELISM;
+- yo'l: restoranning oxirgi ETA_HISTORY_DAYS kundagi pickup_at -> delivered_at o'rtachasi, namunalar
+  kam bo'lsa barcha restoranlar o'rtachasi, tarix bo'lmasa ETA_DEFAULT_DELIVERY_MINUTES.
+Tayyor bo'lish vaqti placed_at dan hisoblanadi va hozirgidan oldin bo'lmaydi, shuning uchun
+qayta hisoblashda baho har safar oldinga surilib ketmaydi. Yo'ldagi buyurtma uchun pickup_at dan.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Sum
+from django.utils import timezone
+
+from .models import Order, OrderItem, Delivery
+
+ACTIVE_STATUSES = ('pending', 'preparing', 'delivering')
+# Oshxona navbatidagi tartib; yo'ldagilar navbatda emas
+QUEUE_PRIORITY = {'preparing': 0, 'pending': 1, 'delivering': 2}
+IN_KITCHEN = 2
+
+
+def kitchen_minutes(prep_max, prep_total, parallelism):
+    return np.maximum(prep_max, prep_total / parallelism)
+
+
+def queue_minutes(restaurants, priority, placed, work, parallelism):
+    """Har bir buyurtmadan oldin shu restoran oshxonasida turgan ish, daqiqa"""
+    order = np.lexsort((placed, priority, restaurants))
+    sorted_work = work[order]
+    sorted_restaurants = restaurants[order]
+    ahead = np.cumsum(sorted_work) - sorted_work
+    # Restoran guruhi boshidagi qiymatni ayirib, jamg'arma har restoranda noldan boshlanadi
+    starts = np.r_[True, sorted_restaurants[1:] != sorted_restaurants[:-1]]
+    ahead -= np.maximum.accumulate(np.where(starts, ahead, 0))
+    result = np.empty_like(ahead)
+    result[order] = ahead / parallelism
+    return result
+
+
+def delivery_minutes(restaurants, history, default):
+    """
+    history — {restaurant_id: (o'rtacha daqiqa, namunalar soni)}. Namunasi yetarli bo'lmagan
+    restoranlarga barcha restoranlar bo'yicha o'rtacha beriladi.
+    """
+    if not history:
+        return np.full(len(restaurants), float(default))
+    ids = np.array(sorted(history))
+    means = np.array([history[restaurant_id][0] for restaurant_id in ids], dtype=float)
+    counts = np.array([history[restaurant_id][1] for restaurant_id in ids], dtype=float)
+    overall = float((means * counts).sum() / counts.sum())
+
+    positions = np.minimum(np.searchsorted(ids, restaurants), len(ids) - 1)
+    known = (ids[positions] == restaurants) & (counts[positions] >= settings.ETA_HISTORY_MIN_SAMPLES)
+    return np.where(known, means[positions], overall)
+
+
+def estimate(now, placed, restaurants, priority, prep_max, prep_total, pickup, travel):
+    """
+    Vaqtlar — epoch soniyalari (pickup yo'q bo'lsa NaN), travel — yo'l daqiqalari.
+    Taxminiy yetkazish vaqtlari massivini qaytaradi.
+    """
+    parallelism = settings.ETA_KITCHEN_PARALLELISM
+    work = kitchen_minutes(prep_max, prep_total, parallelism)
+    in_kitchen = priority < IN_KITCHEN
+
+    wait = np.zeros(len(placed))
+    if in_kitchen.any():
+        wait[in_kitchen] = queue_minutes(
+            restaurants[in_kitchen], priority[in_kitchen], placed[in_kitchen], work[in_kitchen], parallelism,
+        )
+    ready = np.maximum(now, placed + (wait + work) * 60)
+    ready = np.where(in_kitchen, ready, np.where(np.isnan(pickup), now, pickup))
+    return np.maximum(now, ready + travel * 60)
+
+
+def _timestamps(values):
+    return np.array([value.timestamp() if value else np.nan for value in values], dtype=float)
+
+
+def _seconds(values):
+    return np.array([value.total_seconds() if value is not None else np.nan for value in values], dtype=float)
+
+
+def _changed(current, new):
+    return np.isnan(current) | (np.abs(current - new) >= settings.ETA_UPDATE_THRESHOLD_SECONDS)
+
+
+def load_history(now):
+    duration = ExpressionWrapper(F('delivered_at') - F('pickup_at'), output_field=DurationField())
+    rows = (
+        Delivery.objects
+        .filter(
+            status='delivered', pickup_at__isnull=False,
+            delivered_at__gte=now - timedelta(days=settings.ETA_HISTORY_DAYS),
+        )
+        .order_by()
+        .values('order__restaurant_id')
+        .annotate(duration=Avg(duration), count=Count('id'))
+    )
+    return {
+        row['order__restaurant_id']: (row['duration'].total_seconds() / 60, row['count'])
+        for row in rows
+    }
+
+
+def refresh_estimates(now=None):
+    """Barcha faol buyurtmalarni qayta baholaydi, o'zgargan qatorlar sonini qaytaradi"""
+    now = now or timezone.now()
+    rows = list(
+        Order.objects.filter(status__in=ACTIVE_STATUSES).order_by().values_list(
+            'id', 'restaurant_id', 'status', 'placed_at', 'estimated_delivery_time',
+            'delivery__id', 'delivery__pickup_at', 'delivery__estimated_time',
+        )
+    )
+    if not rows:
+        return {'orders': 0, 'deliveries': 0}
+    order_ids, restaurant_ids, statuses, placed_at, current, delivery_ids, pickup_at, delivery_current = zip(*rows)
+
+    prep = {
+        row['order_id']: (row['longest'], row['total'])
+        for row in OrderItem.objects.filter(order__status__in=ACTIVE_STATUSES).order_by().values('order_id').annotate(
+            longest=Max('dish__prep_time_minutes'), total=Sum(F('dish__prep_time_minutes') * F('quantity')),
+        )
+    }
+    prep_max = np.array([prep.get(order_id, (0, 0))[0] for order_id in order_ids], dtype=float)
+    prep_total = np.array([prep.get(order_id, (0, 0))[1] for order_id in order_ids], dtype=float)
+
+    restaurants = np.array(restaurant_ids)
+    travel = delivery_minutes(restaurants, load_history(now), settings.ETA_DEFAULT_DELIVERY_MINUTES)
+    eta = estimate(
+        now.timestamp(), _timestamps(placed_at), restaurants,
+        np.array([QUEUE_PRIORITY[status] for status in statuses]),
+        prep_max, prep_total, _timestamps(pickup_at), travel,
+    )
+
+    orders = [
+        Order(pk=order_ids[i], estimated_delivery_time=datetime.fromtimestamp(eta[i], tz=dt_timezone.utc), updated_at=now)
+        for i in np.flatnonzero(_changed(_timestamps(current), eta))
+    ]
+    has_delivery = np.array([delivery_id is not None for delivery_id in delivery_ids])
+    deliveries = [
+        Delivery(pk=delivery_ids[i], estimated_time=timedelta(seconds=round(travel[i] * 60)), updated_at=now)
+        for i in np.flatnonzero(has_delivery & _changed(_seconds(delivery_current), travel * 60))
+    ]
+
+    batch_size = settings.BULK_WRITE_BATCH_SIZE
+    with transaction.atomic():
+        # Shu orada yakunlangan buyurtmalarga yozilmaydi
+        Order.objects.filter(status__in=ACTIVE_STATUSES).bulk_update(
+            orders, ['estimated_delivery_time', 'updated_at'], batch_size=batch_size,
+        )
+        Delivery.objects.exclude(status__in=('delivered', 'cancelled')).bulk_update(
+            deliveries, ['estimated_time', 'updated_at'], batch_size=batch_size,
+        )
+    return {'orders': len(orders), 'deliveries': len(deliveries)}
@@ -0,0 +1,122 @@
+"""
+Order, OrderItem, Payment va Review qatorlarini CSV yoki NDJSON ko'rinishida oqim
+bilan eksport qilish.
+
+Qatorlar values_list() proyeksiyasi va .iterator(chunk_size=...) orqali server
+tomonidagi kursor bilan o'qiladi: model obyektlari yaratilmaydi, xotira qator soniga
+bog'liq bo'lmaydi. CSV sarlavhasi so'rov bajarilishidan oldin yuboriladi.
+"""
+import csv
+import io
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Order, OrderItem, Payment, Review
+
+ExportSpec = namedtuple('ExportSpec', 'model fields date_field restaurant_field status_field')
+
+EXPORTS = {
+    'orders': ExportSpec(
+        Order,
+        ('id', 'placed_at', 'status', 'restaurant_id', 'customer_id', 'driver_id', 'total_amount', 'delivery_address'),
+        'placed_at', 'restaurant_id', 'status',
+    ),
+    'order-items': ExportSpec(
+        OrderItem,
+        ('id', 'order_id', 'order__placed_at', 'order__restaurant_id', 'dish_id', 'dish__name', 'quantity', 'unit_price'),
+        'order__placed_at', 'order__restaurant_id', 'order__status',
+    ),
+    'payments': ExportSpec(
+        Payment,
+        ('id', 'order_id', 'order__restaurant_id', 'amount', 'method', 'status', 'transaction_reference', 'paid_at', 'created_at'),
+        'created_at', 'order__restaurant_id', 'status',
+    ),
+    'reviews': ExportSpec(
+        Review,
+        ('id', 'order_id', 'restaurant_id', 'customer_id', 'driver_id', 'rating', 'comment', 'created_at'),
+        'created_at', 'restaurant_id', None,
+    ),
+}
+
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def parse_bound(value, end=False):
+    """
+    '2024-05-01' yoki ISO datetime ni aware datetime ga aylantiradi.
+    Sana berilsa va end=True bo'lsa, keyingi kunning boshi qaytadi (kun to'liq kiradi).
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Noto'g'ri sana: {value}")
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(dataset, restaurant=None, date_from=None, date_to=None, status=None):
+    """Filtrlangan values_list queryset. date_from/date_to — parse_bound natijasi"""
+    spec = EXPORTS[dataset]
+    queryset = spec.model.objects.all()
+    if restaurant is not None:
+        queryset = queryset.filter(**{spec.restaurant_field: restaurant})
+    if date_from is not None:
+        queryset = queryset.filter(**{f'{spec.date_field}__gte': date_from})
+    if date_to is not None:
+        queryset = queryset.filter(**{f'{spec.date_field}__lt': date_to})
+    if status is not None:
+        if spec.status_field is None:
+            raise ValueError(f"'{dataset}' holat bo'yicha filtrlanmaydi")
+        queryset = queryset.filter(**{spec.status_field: status})
+    # pk tartibi — indeksdan foydalanadi va eksport takrorlanuvchan bo'ladi
+    return queryset.order_by('pk').values_list(*spec.fields)
+
+
+def _chunks(queryset, chunk_size, out, write_row):
+    """
+    Qatorlarni out buferiga yozadi va har chunk_size qatorda bitta bo'lak qaytaradi.
+    Birinchi qator alohida yuboriladi, mijoz ma'lumotni darhol ola boshlaydi.
+    """
+    for count, row in enumerate(queryset.iterator(chunk_size=chunk_size), 1):
+        write_row(row)
+        if count == 1 or count % chunk_size == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate(0)
+    if out.tell():
+        yield out.getvalue()
+
+
+def stream_csv(dataset, queryset, chunk_size=None):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(EXPORTS[dataset].fields)
+    yield out.getvalue()
+    out.seek(0)
+    out.truncate(0)
+    yield from _chunks(queryset, chunk_size or settings.EXPORT_CHUNK_SIZE, out, writer.writerow)
+
+
+def stream_ndjson(dataset, queryset, chunk_size=None):
+    fields = EXPORTS[dataset].fields
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    out = io.StringIO()
+
+    def write_row(row):
+        out.write(encoder.encode(dict(zip(fields, row))))
+        out.write('\n')
+
+    yield from _chunks(queryset, chunk_size or settings.EXPORT_CHUNK_SIZE, out, write_row)
+
+
+def stream(dataset, output, queryset, chunk_size=None):
+    renderer = {'csv': stream_csv, 'ndjson': stream_ndjson}[output]
+    return renderer(dataset, queryset, chunk_size)
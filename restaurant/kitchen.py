@@ -0,0 +1,108 @@
+"""
+Restoran oshxonasi yuklamasi va checkout da buyurtma qabul qilishni cheklash.
+
+Order.kitchen_minutes — buyurtma taomlarining tayyorlanish vaqti yig'indisi
+(Dish.prep_time_minutes * quantity, buyurtma paytidagi qiymat). Restaurant.kitchen_load_minutes —
+'pending' va 'preparing' holatidagi buyurtmalar kitchen_minutes yig'indisi. U bosqichma-bosqich
+yangilanadi: checkout da (admit), OrderItem va Order signallarida hamda transitions.py dagi
+holat o'tishlari CTE sida. Taom prep_time_minutes o'zgarsa, navbatdagi buyurtmalar ishi
+o'zgarmaydi — farq rebuild_kitchen_load buyrug'i bilan tekislanadi.
+
+Qabul qilish O(1): bitta shartli UPDATE yuklamani oshiradi yoki hech narsa o'zgartirmaydi.
+Sig'im Restaurant.kitchen_capacity_minutes, bo'sh bo'lsa KITCHEN_MAX_BACKLOG_MINUTES
+(None — cheklanmagan). Bo'sh oshxona har doim bitta buyurtmani qabul qiladi.
+"""
+import math
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from rest_framework.exceptions import Throttled
+
+from .models import Restaurant
+
+KITCHEN_STATUSES = ('pending', 'preparing')
+
+
+class KitchenBusy(Throttled):
+    """429 va Retry-After: oshxona navbati sig'imdan oshadi"""
+    default_detail = "Restoran oshxonasi band, buyurtmani keyinroq bering."
+    default_code = 'kitchen_busy'
+
+
+def in_kitchen(status):
+    return status in KITCHEN_STATUSES
+
+
+def leaves_kitchen(sources, target):
+    """sources holatlaridan target ga o'tgan buyurtmalar oshxona navbatidan chiqadimi"""
+    return not in_kitchen(target) and all(in_kitchen(status) for status in sources)
+
+
+def order_minutes(lines):
+    """Checkout qatorlari (OrderItem, dish yuklangan) ishi, daqiqa"""
+    return sum(line.dish.prep_time_minutes * line.quantity for line in lines)
+
+
+def _capacity():
+    default = settings.KITCHEN_MAX_BACKLOG_MINUTES
+    if default is None:
+        return F('kitchen_capacity_minutes')
+    return Coalesce(F('kitchen_capacity_minutes'), Value(default))
+
+
+def admit(restaurant_id, minutes):
+    """Yuklamani minutes ga oshiradi yoki KitchenBusy ko'taradi (tranzaksiya ichida chaqiriladi)"""
+    capacity = _capacity()
+    fits = Q(kitchen_load_minutes=0) | Q(kitchen_load_minutes__lte=capacity - minutes)
+    if settings.KITCHEN_MAX_BACKLOG_MINUTES is None:
+        fits |= Q(kitchen_capacity_minutes__isnull=True)
+    admitted = Restaurant.objects.filter(fits, pk=restaurant_id).update(
+        kitchen_load_minutes=F('kitchen_load_minutes') + minutes,
+    )
+    if not admitted:
+        raise KitchenBusy(wait=retry_after(restaurant_id, minutes))
+
+
+def retry_after(restaurant_id, minutes):
+    """Navbatdagi ortiqcha ish oshxona tezligida (ETA_KITCHEN_PARALLELISM) tugashigacha, soniya"""
+    load, capacity = (
+        Restaurant.objects.filter(pk=restaurant_id)
+        .annotate(capacity=_capacity())
+        .values_list('kitchen_load_minutes', 'capacity')
+        .get()
+    )
+    overflow = load + minutes - (capacity or 0)
+    return max(1, math.ceil(overflow * 60 / settings.ETA_KITCHEN_PARALLELISM))
+
+
+def change_load(restaurant_id, delta):
+    if restaurant_id is None or not delta:
+        return
+    Restaurant.objects.filter(pk=restaurant_id).update(
+        kitchen_load_minutes=Greatest(F('kitchen_load_minutes') + delta, 0),
+    )
+
+
+def change_order_load(order_id, delta):
+    """Buyurtma ishi o'zgardi (OrderItem): buyurtma oshxonada bo'lsa restoran yuklamasi ham o'zgaradi"""
+    if order_id is None or not delta:
+        return
+    Restaurant.objects.filter(orders__id=order_id, orders__status__in=KITCHEN_STATUSES).update(
+        kitchen_load_minutes=Greatest(F('kitchen_load_minutes') + delta, 0),
+    )
+
+
+def unload_sql(changed):
+    """
+    transitions.py CTE lari uchun: changed CTE sidagi (restaurant_id, kitchen_minutes qaytaradi)
+    buyurtmalar ishini restoranlar yuklamasidan ayiruvchi UPDATE.
+    """
+    restaurant_table = connection.ops.quote_name(Restaurant._meta.db_table)
+    return (
+        f'UPDATE {restaurant_table} AS r '
+        f'SET kitchen_load_minutes = GREATEST(r.kitchen_load_minutes - w.minutes, 0) '
+        f'FROM (SELECT restaurant_id, SUM(kitchen_minutes) AS minutes FROM {changed} GROUP BY restaurant_id) AS w '
+        f'WHERE r.id = w.restaurant_id'
+    )
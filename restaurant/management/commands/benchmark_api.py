@@ -0,0 +1,144 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from restaurant import benchmark
+from restaurant.datagen import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Routerdagi barcha o'qish endpointlarini o'lchaydi: p50/p95 kechikish, SQL soni, javob hajmi. "
+        "Natijani saqlash, ikki natijani yoki ikki git reviziyasini solishtirish mumkin"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help="Vaqtinchalik bazadagi ma'lumotlar hajmi")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', nargs='*', help="Faqat nomida shu qismlar bo'lgan endpointlar")
+        parser.add_argument(
+            '--use-existing', action='store_true',
+            help="Vaqtinchalik baza yaratmasdan joriy bazadagi ma'lumotlarda o'lchash",
+        )
+        parser.add_argument('--save', help="Natijani JSON faylga yozish")
+        parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help="Ikki JSON natijani solishtirish")
+        parser.add_argument(
+            '--revisions', nargs=2, metavar=('REV_A', 'REV_B'),
+            help="Ikki git reviziyasini alohida worktree larda o'lchab solishtirish",
+        )
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help="Sinxron va async o'qish endpointlarini ASGI orqali parallel yuklama bilan solishtirish",
+        )
+        parser.add_argument('--requests', type=int, default=200, help="--asgi: har bir endpointga so'rovlar soni")
+        parser.add_argument('--concurrency', type=int, default=50, help="--asgi: parallel mijozlar soni")
+        parser.add_argument('--threshold', type=float, default=0.1, help="p95 sekinlashish chegarasi (0.1 = 10%%)")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            baseline, current = (benchmark.load(path) for path in options['compare'])
+            return self._report_comparison(baseline, current, options)
+        if options['revisions']:
+            baseline, current = (self._run_revision(revision, options) for revision in options['revisions'])
+            return self._report_comparison(baseline, current, options)
+
+        results = self._run(options)
+        if options['asgi']:
+            self._report_asgi(results)
+        else:
+            self._report(results)
+        if options['save']:
+            benchmark.save(results, options['save'])
+            self.stderr.write(self.style.SUCCESS(f"Natija yozildi: {options['save']}"))
+
+    def _measure(self, options):
+        if options['asgi']:
+            return benchmark.run_asgi(options['requests'], options['concurrency'], options['only'])
+        return benchmark.run(options['repeat'], options['warmup'], options['only'])
+
+    def _run(self, options):
+        if options['use_existing']:
+            return self._measure(options)
+
+        verbosity = options['verbosity']
+        old_name = settings.DATABASES['default']['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            created = generate(scale=options['scale'], seed=options['seed'])
+            if verbosity > 1:
+                self.stderr.write(', '.join(f"{name}: {count}" for name, count in created.items()))
+            return self._measure(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run_revision(self, revision, options):
+        """Reviziyani vaqtinchalik worktree ga chiqarib, o'sha kod bilan benchmark_api ni ishga tushiradi"""
+        root = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        with tempfile.TemporaryDirectory() as workdir:
+            tree = os.path.join(workdir, 'tree')
+            output = os.path.join(workdir, 'result.json')
+            subprocess.run(['git', '-C', root, 'worktree', 'add', '--detach', tree, revision], check=True, capture_output=True)
+            try:
+                command = [
+                    sys.executable, 'manage.py', 'benchmark_api', '--save', output,
+                    '--scale', str(options['scale']), '--seed', str(options['seed']),
+                    '--repeat', str(options['repeat']), '--warmup', str(options['warmup']),
+                ]
+                if options['only']:
+                    command += ['--only', *options['only']]
+                completed = subprocess.run(command, cwd=tree, capture_output=True, text=True)
+                if completed.returncode != 0:
+                    raise CommandError(f"{revision}: benchmark_api xato bilan tugadi\n{completed.stderr}")
+                self.stderr.write(self.style.SUCCESS(f"{revision} o'lchandi"))
+                return benchmark.load(output)
+            finally:
+                subprocess.run(['git', '-C', root, 'worktree', 'remove', '--force', tree], capture_output=True)
+
+    def _report(self, results):
+        self.stdout.write(f"{'endpoint':<45} {'status':>8} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'bytes':>9}")
+        for name, row in results.items():
+            status = ','.join(str(code) for code in row['status'])
+            self.stdout.write(
+                f"{name:<45} {status:>8} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['queries']:>8} {row['bytes']:>9}"
+            )
+
+    def _report_asgi(self, results):
+        self.stdout.write(
+            f"{'endpoint':<25} {'sync rps':>10} {'async rps':>10} {'sync p95':>10} {'async p95':>10} {'status':>8}"
+        )
+        for name, row in results.items():
+            sync, async_ = row['sync'], row['async']
+            status = ','.join(str(code) for code in sorted(set(sync['status']) | set(async_['status'])))
+            self.stdout.write(
+                f"{name:<25} {sync['rps']:>10} {async_['rps']:>10} {sync['p95_ms']:>10} {async_['p95_ms']:>10} {status:>8}"
+            )
+
+    def _report_comparison(self, baseline, current, options):
+        rows = benchmark.compare(baseline, current, options['threshold'])
+        self.stdout.write(f"{'endpoint':<45} {'p95 ms':>19} {'queries':>13} {'bytes':>17}")
+        regressions = 0
+        for name, before, after, reasons in rows:
+            if before is None or after is None:
+                self.stdout.write(f"{name:<45} {'yangi' if before is None else 'olib tashlangan':>19}")
+                continue
+            line = (
+                f"{name:<45} {before['p95_ms']:>9}->{after['p95_ms']:<9} "
+                f"{before['queries']:>6}->{after['queries']:<6} {before['bytes']:>8}->{after['bytes']:<8}"
+            )
+            if reasons:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"{line} REGRESSIYA: {'; '.join(reasons)}"))
+            else:
+                self.stdout.write(line)
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{regressions} ta endpointda regressiya")
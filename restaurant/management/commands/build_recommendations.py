@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from restaurant.recommendations import build_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Buyurtmalar, layklar va sharhlardan taom va restoran tavsiyalarining top-K jadvallarini "
+        "qayta quradi (kechasi ishga tushiriladi)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, help="Har bir taom/mijoz uchun tavsiyalar soni")
+
+    def handle(self, *args, **options):
+        built = build_all(options['top_k'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{built['dishes']} ta taom va {built['customers']} ta mijoz tavsiyalari yangilandi"
+        ))
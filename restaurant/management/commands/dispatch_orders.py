@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from restaurant.dispatch import dispatch_batch
+
+
+class Command(BaseCommand):
+    help = "Kutilayotgan buyurtmalarni onlayn haydovchilarga partiyalab biriktiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Faqat bitta partiyani bajarish")
+        parser.add_argument('--interval', type=float, default=settings.DISPATCH_INTERVAL_SECONDS)
+        parser.add_argument('--batch-size', type=int, default=settings.DISPATCH_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            assignments = dispatch_batch(batch_size=options['batch_size'])
+            if assignments:
+                self.stdout.write(f"{len(assignments)} ta buyurtma haydovchilarga biriktirildi")
+            if options['once']:
+                break
+            time.sleep(options['interval'])
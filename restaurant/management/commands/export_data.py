@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant import export
+
+
+class Command(BaseCommand):
+    help = "Buyurtma, buyurtma elementlari, to'lovlar yoki sharhlarni CSV/NDJSON ga oqim bilan eksport qiladi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(export.EXPORTS))
+        parser.add_argument('--output', choices=list(export.FORMATS), default='csv')
+        parser.add_argument('--file', help="Fayl yo'li (berilmasa stdout)")
+        parser.add_argument('--restaurant', type=int)
+        parser.add_argument('--date-from', help="2024-05-01 yoki ISO datetime")
+        parser.add_argument('--date-to', help="Sana berilsa, shu kun ham kiradi")
+        parser.add_argument('--status')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export.export_queryset(
+                options['dataset'],
+                restaurant=options['restaurant'],
+                date_from=export.parse_bound(options['date_from']) if options['date_from'] else None,
+                date_to=export.parse_bound(options['date_to'], end=True) if options['date_to'] else None,
+                status=options['status'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        chunks = export.stream(options['dataset'], options['output'], queryset, options['chunk_size'])
+        if options['file']:
+            with open(options['file'], 'w', encoding='utf-8', newline='') as out:
+                out.writelines(chunks)
+            self.stderr.write(self.style.SUCCESS(f"Eksport yozildi: {options['file']}"))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from restaurant.datagen import generate
+
+
+class Command(BaseCommand):
+    help = "Sintetik restoran, menyu, taom, mijoz, buyurtma, to'lov, yetkazish va sharhlarni bulk_create bilan yaratadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help="1.0 = 20 restoran, 200 mijoz, 2000 buyurtma")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--days', type=int, default=90, help="Buyurtmalar necha kunga tarqatiladi")
+
+    def handle(self, *args, **options):
+        created = generate(scale=options['scale'], seed=options['seed'], days=options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f"{name}: {count}" for name, count in created.items())
+        ))
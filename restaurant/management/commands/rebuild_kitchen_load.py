@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from restaurant.kitchen import KITCHEN_STATUSES
+from restaurant.models import Restaurant, Order, OrderItem
+
+
+def _summed(queryset, group, expression):
+    """group bo'yicha yig'indini korrelyatsiyalangan subquery sifatida qaytaradi"""
+    subquery = (
+        queryset.filter(**{group: OuterRef('pk')})
+        .order_by()
+        .values(group)
+        .annotate(value=Sum(expression))
+        .values('value')
+    )
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = (
+        "Oshxonadagi buyurtmalar ishini taomlarning joriy tayyorlanish vaqtidan va restoranlar "
+        "oshxona yuklamasini noldan qayta hisoblaydi"
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            orders = Order.objects.filter(status__in=KITCHEN_STATUSES).update(
+                kitchen_minutes=_summed(OrderItem.objects.all(), 'order', F('dish__prep_time_minutes') * F('quantity')),
+            )
+            restaurants = Restaurant.objects.update(
+                kitchen_load_minutes=_summed(
+                    Order.objects.filter(status__in=KITCHEN_STATUSES), 'restaurant', F('kitchen_minutes'),
+                ),
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{orders} ta buyurtma ishi va {restaurants} ta restoran oshxona yuklamasi yangilandi"
+        ))
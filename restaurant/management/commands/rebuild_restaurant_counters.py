@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from restaurant.models import Restaurant, RestaurantLike, RestaurantComment, Review
+
+
+def _grouped(queryset, aggregate):
+    """Restoran bo'yicha guruhlangan qiymatni korrelyatsiyalangan subquery sifatida qaytaradi"""
+    subquery = (
+        queryset.filter(restaurant=OuterRef('pk'))
+        .order_by()
+        .values('restaurant')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = "Restoranlarning layk, izoh va reyting hisoblagichlarini noldan qayta hisoblaydi"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Restaurant.objects.update(
+                likes_count=_grouped(RestaurantLike.objects.all(), Count('id')),
+                comments_count=_grouped(RestaurantComment.objects.all(), Count('id')),
+                rating_sum=_grouped(Review.objects.all(), Sum('rating')),
+                rating_count=_grouped(Review.objects.all(), Count('id')),
+            )
+        self.stdout.write(self.style.SUCCESS(f"{updated} ta restoran hisoblagichlari yangilandi"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from restaurant.models import Restaurant, Dish
+from restaurant.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Restoran va taomlarning qidiruv vektorlarini qayta hisoblaydi (bulk importdan keyin)"
+
+    def handle(self, *args, **options):
+        restaurants = update_search_vectors(Restaurant)
+        dishes = update_search_vectors(Dish)
+        self.stdout.write(self.style.SUCCESS(
+            f"{restaurants} ta restoran va {dishes} ta taom qidiruv vektori yangilandi"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from restaurant.ratings import recompute_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Haydovchilar reytingini sharhlar ustidagi bitta guruhlangan so'rovdan qayta hisoblaydi "
+        "(bulk importdan yoki DRIVER_RATING_HALF_LIFE_DAYS o'zgargandan keyin)"
+    )
+
+    def handle(self, *args, **options):
+        updated = recompute_all()
+        self.stdout.write(self.style.SUCCESS(f"{updated} ta haydovchi reytingi yangilandi"))
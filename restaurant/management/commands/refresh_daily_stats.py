@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from restaurant.analytics import refresh_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Kunlik restoran va taom statistikasini yangilaydi (faqat oxirgi ishga tushirishdan beri o'zgargan kunlar)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Barcha kunlarni qayta hisoblash")
+
+    def handle(self, *args, **options):
+        written = refresh_daily_stats(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"{written} ta restoran-kun statistikasi yangilandi"))
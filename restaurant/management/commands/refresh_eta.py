@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from restaurant.eta import refresh_estimates
+
+
+class Command(BaseCommand):
+    help = "Faol buyurtmalarning taxminiy yetkazish vaqtini qayta hisoblaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Faqat bir marta hisoblash")
+        parser.add_argument('--interval', type=float, default=settings.ETA_INTERVAL_SECONDS)
+
+    def handle(self, *args, **options):
+        while True:
+            updated = refresh_estimates()
+            if any(updated.values()):
+                self.stdout.write(
+                    f"{updated['orders']} ta buyurtma va {updated['deliveries']} ta yetkazish bahosi yangilandi"
+                )
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,225 @@
+"""
+So'rovlar soni, DB vaqti, serializatsiya vaqti va javob hajmini o'lchash.
+
+QueryMetricsMiddleware har bir so'rov davomida barcha ulanishlarga execute_wrapper
+o'rnatadi (DEBUG shart emas) va natijani endpoint bo'yicha gistogrammalarga yozadi.
+Endpoint nomi va so'rovlar byudjetini QueryBudgetMixin beradi ('{basename}.{action}').
+DEBUG da o'lchovlar X-Query-Count, X-DB-Time-Ms, X-Serialize-Time-Ms,
+X-Response-Time-Ms va X-Response-Bytes sarlavhalarida qaytadi.
+Boshqa modullar registry.count() bilan oddiy hisoblagichlarni ham yozadi (masalan javoblar
+keshi hit/miss), ular snapshot() ning 'counters' qismida qaytadi.
+Byudjet oshsa ogohlantirish yoziladi, QUERY_BUDGET_STRICT=True bo'lsa (testlarda)
+QueryBudgetExceeded ko'tariladi. Middleware async ham ishlaydi: ASGI da async viewlar
+(restaurant/async_views.py) oqimga o'tkazilmasdan bajariladi.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = {
+    'queries': (1, 2, 3, 5, 8, 13, 21, 50, 100),
+    'db_ms': (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+    'serialize_ms': (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+    'total_ms': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    'bytes': (1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class Histogram:
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        buckets = {f'le_{bound}': count for bound, count in zip(self.bounds, self.counts)}
+        buckets['inf'] = self.counts[-1]
+        return {'sum': round(self.total, 3), 'max': round(self.max, 3), 'buckets': buckets}
+
+
+class MetricsRegistry:
+    """Jarayon ichidagi endpoint -> gistogrammalar jadvali va guruhlangan hisoblagichlar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._counters = {}
+
+    def record(self, endpoint, **values):
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    'count': 0, **{name: Histogram(bounds) for name, bounds in BUCKETS.items()}
+                }
+            entry['count'] += 1
+            for name, value in values.items():
+                if value is not None:
+                    entry[name].observe(value)
+
+    def count(self, group, name, amount=1):
+        """Hisoblagichni oshiradi; += oqimlar orasida atomar emas, shuning uchun qulf ostida"""
+        with self._lock:
+            counters = self._counters.setdefault(group, {})
+            counters[name] = counters.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            result = {
+                endpoint: {
+                    name: value if name == 'count' else value.as_dict()
+                    for name, value in entry.items()
+                }
+                for endpoint, entry in sorted(self._endpoints.items())
+            }
+            result['counters'] = {group: dict(counters) for group, counters in sorted(self._counters.items())}
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._counters.clear()
+
+
+registry = MetricsRegistry()
+
+# Joriy so'rovning kollektori: parallel async so'rovlar bitta ulanishni bo'lishganda
+# har bir kollektor faqat o'z so'rovining SQL larini hisoblaydi
+_active_collector = contextvars.ContextVar('active_query_collector', default=None)
+
+
+class QueryCollector:
+    """scoped=True — faqat o'zi faol bo'lgan kontekstdagi (o'z so'rovidagi) SQL lar hisoblanadi"""
+
+    def __init__(self, scoped=False):
+        self.scoped = scoped
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.scoped and _active_collector.get() is not self:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def mark(self):
+        return time.perf_counter(), self.db_time
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class QueryMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _install(collector):
+        installed = list(connections.all())
+        for connection in installed:
+            connection.execute_wrappers.append(collector)
+        return installed
+
+    @staticmethod
+    def _uninstall(installed, collector):
+        # execute_wrapper() oxirgisini olib tashlaydi, parallel so'rovlarda bu boshqasiniki bo'lishi mumkin
+        for connection in installed:
+            connection.execute_wrappers.remove(collector)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        collector = QueryCollector(scoped=True)
+        request.metrics_collector = collector
+        token = _active_collector.set(collector)
+        started = collector.mark()
+        installed = self._install(collector)
+        try:
+            response = self.get_response(request)
+        finally:
+            self._uninstall(installed, collector)
+            _active_collector.reset(token)
+        return self._finish(request, response, collector, started)
+
+    async def __acall__(self, request):
+        collector = QueryCollector(scoped=True)
+        request.metrics_collector = collector
+        token = _active_collector.set(collector)
+        started = collector.mark()
+        # Ulanish obyektlari ORM so'rovlari bajariladigan (thread_sensitive) oqimda olinadi
+        installed = await sync_to_async(self._install)(collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self._uninstall)(installed, collector)
+            _active_collector.reset(token)
+        return self._finish(request, response, collector, started)
+
+    def _finish(self, request, response, collector, started):
+        finished = collector.mark()
+        total = finished[0] - started[0]
+        serialize = None
+        view_started = getattr(request, 'metrics_view_started', None)
+        if view_started is not None:
+            # View ichidagi (serializer.data) va render qilishdagi Python vaqti, DB vaqtisiz
+            serialize = (finished[0] - view_started[0]) - (finished[1] - view_started[1])
+        size = None if response.streaming else len(response.content)
+        endpoint = getattr(request, 'metrics_endpoint', None) or self._fallback_endpoint(request)
+
+        registry.record(
+            endpoint, queries=collector.queries, db_ms=_ms(collector.db_time),
+            serialize_ms=_ms(serialize) if serialize is not None else None,
+            total_ms=_ms(total), bytes=size,
+        )
+
+        if settings.QUERY_METRICS_HEADERS:
+            response['X-Query-Count'] = str(collector.queries)
+            response['X-DB-Time-Ms'] = str(_ms(collector.db_time))
+            if serialize is not None:
+                response['X-Serialize-Time-Ms'] = str(_ms(serialize))
+            response['X-Response-Time-Ms'] = str(_ms(total))
+            if size is not None:
+                response['X-Response-Bytes'] = str(size)
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and collector.queries > budget:
+            message = f"{endpoint}: {collector.queries} ta SQL so'rov, byudjet {budget}"
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    @staticmethod
+    def _fallback_endpoint(request):
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match and match.view_name else 'unresolved'
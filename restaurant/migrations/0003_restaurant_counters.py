@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Restaurant = apps.get_model('restaurant', 'Restaurant')
+    RestaurantLike = apps.get_model('restaurant', 'RestaurantLike')
+    RestaurantComment = apps.get_model('restaurant', 'RestaurantComment')
+    Review = apps.get_model('restaurant', 'Review')
+
+    def grouped(model, aggregate):
+        subquery = (
+            model.objects.filter(restaurant=OuterRef('pk'))
+            .order_by()
+            .values('restaurant')
+            .annotate(value=aggregate)
+            .values('value')
+        )
+        return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+    Restaurant.objects.update(
+        likes_count=grouped(RestaurantLike, Count('id')),
+        comments_count=grouped(RestaurantComment, Count('id')),
+        rating_sum=grouped(Review, Sum('rating')),
+        rating_count=grouped(Review, Count('id')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0002_restaurantcomment_restaurantlike'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='restaurant',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Restoran', 'verbose_name_plural': 'Restoranlar'},
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Izohlar soni'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Layklar soni'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Baholar soni'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Baholar yig‘indisi'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['-likes_count'], name='restaurant_likes_count_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def recompute_totals(apps, schema_editor):
+    Order = apps.get_model('restaurant', 'Order')
+    OrderItem = apps.get_model('restaurant', 'OrderItem')
+
+    line_total = ExpressionWrapper(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=12, decimal_places=2))
+    totals = (
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by()
+        .values('order')
+        .annotate(total=Sum(line_total))
+        .values('total')
+    )
+    Order.objects.update(
+        total_amount=Coalesce(Subquery(totals, output_field=DecimalField(max_digits=10, decimal_places=2)), Value(Decimal('0')))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_totals, migrations.RunPython.noop),
+    ]
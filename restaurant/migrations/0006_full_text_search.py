@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:54
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+TRIGRAM_INDEXES = [
+    ('restaurant_name_trgm_idx', 'restaurant_restaurant', 'name'),
+    ('dish_name_trgm_idx', 'restaurant_dish', 'name'),
+    ('customer_full_name_trgm_idx', 'restaurant_customer', 'full_name'),
+    ('driver_full_name_trgm_idx', 'restaurant_driver', 'full_name'),
+]
+
+
+def fill_search_vectors(apps, schema_editor):
+    Restaurant = apps.get_model('restaurant', 'Restaurant')
+    Dish = apps.get_model('restaurant', 'Dish')
+    Restaurant.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector('description', weight='B', config='simple')
+        + SearchVector('address', weight='C', config='simple')
+        + SearchVector('phone', weight='D', config='simple')
+    ))
+    Dish.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector('category', weight='B', config='simple')
+        + SearchVector('description', weight='C', config='simple')
+    ))
+
+
+def enable_trigram(apps, schema_editor):
+    # pg_trgm serverda bo'lmasa qidiruv icontains ga qaytadi (restaurant/search.py)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ("{column}" gin_trgm_ops)'
+        )
+
+
+def disable_trigram(apps, schema_editor):
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0005_recompute_order_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Qidiruv vektori'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Qidiruv vektori'),
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='dish_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='restaurant_search_idx'),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(enable_trigram, disable_trigram),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0006_full_text_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyDishStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Kun')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='Miqdor')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Tushum')),
+            ],
+            options={
+                'verbose_name': 'Kunlik taom statistikasi',
+                'verbose_name_plural': 'Kunlik taom statistikalari',
+                'ordering': ['-day', '-quantity'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRestaurantStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Kun')),
+                ('orders_count', models.PositiveIntegerField(default=0, verbose_name='Buyurtmalar soni')),
+                ('cancelled_count', models.PositiveIntegerField(default=0, verbose_name='Bekor qilinganlar soni')),
+                ('items_count', models.PositiveIntegerField(default=0, verbose_name='Sotilgan taomlar soni')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Tushum')),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='To‘langan summa')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan vaqti')),
+            ],
+            options={
+                'verbose_name': 'Kunlik restoran statistikasi',
+                'verbose_name_plural': 'Kunlik restoran statistikalari',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Nomi')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Yangilangan vaqti')),
+            ],
+            options={
+                'verbose_name': 'Statistika nazorat nuqtasi',
+                'verbose_name_plural': 'Statistika nazorat nuqtalari',
+            },
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Yangilangan vaqti'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at'], name='order_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['updated_at'], name='payment_updated_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailydishstats',
+            name='dish',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='restaurant.dish', verbose_name='Taom'),
+        ),
+        migrations.AddField(
+            model_name='dailydishstats',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_dish_stats', to='restaurant.restaurant', verbose_name='Restoran'),
+        ),
+        migrations.AddField(
+            model_name='dailyrestaurantstats',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='restaurant.restaurant', verbose_name='Restoran'),
+        ),
+        migrations.AddIndex(
+            model_name='dailydishstats',
+            index=models.Index(fields=['restaurant', 'day'], name='daily_dish_stats_rest_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailydishstats',
+            constraint=models.UniqueConstraint(fields=('dish', 'day'), name='daily_dish_stats_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrestaurantstats',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'day'), name='daily_restaurant_stats_unique'),
+        ),
+    ]
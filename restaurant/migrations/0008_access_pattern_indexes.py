@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:06
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Katta jadvallarda yozishni bloklamaslik uchun indekslar CONCURRENTLY quriladi
+    atomic = False
+
+    dependencies = [
+        ('restaurant', '0007_daily_stats'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='delivery',
+            index=models.Index(condition=models.Q(('status__in', ['assigned', 'picked_up'])), fields=['driver'], name='delivery_active_driver_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='dish',
+            index=models.Index(fields=['menu', 'is_available'], name='dish_menu_available_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='driver',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_online', True)), fields=['-rating'], name='driver_available_rating_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['customer', '-placed_at', '-id'], name='order_customer_placed_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'preparing'])), fields=['placed_at', 'id'], name='order_open_placed_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='review',
+            index=models.Index(fields=['customer', '-created_at', '-id'], name='review_customer_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='review',
+            index=models.Index(fields=['restaurant', '-created_at', '-id'], name='review_restaurant_created_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:31
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    # Vaznsiz (oddiy o'rtacha); DRIVER_RATING_HALF_LIFE_DAYS yoqilgan bo'lsa
+    # recompute_driver_ratings buyrug'i vaznli yig'indilarni yozadi
+    Driver = apps.get_model('restaurant', 'Driver')
+    Review = apps.get_model('restaurant', 'Review')
+
+    def grouped(aggregate, output_field):
+        subquery = (
+            Review.objects.filter(driver=OuterRef('pk'))
+            .order_by()
+            .values('driver')
+            .annotate(value=aggregate)
+            .values('value')
+        )
+        return Coalesce(Subquery(subquery, output_field=output_field), Value(0), output_field=output_field)
+
+    Driver.objects.update(
+        rating_sum=grouped(Sum('rating'), IntegerField()),
+        rating_count=grouped(Count('id'), IntegerField()),
+        rating_decay_sum=grouped(Cast(Sum('rating'), FloatField()), FloatField()),
+        rating_decay_weight=grouped(Cast(Count('id'), FloatField()), FloatField()),
+        rating=grouped(
+            Cast(Cast(Sum('rating'), FloatField()) / Count('id'), DecimalField(max_digits=3, decimal_places=2)),
+            DecimalField(max_digits=3, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0008_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driver',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Baholar soni'),
+        ),
+        migrations.AddField(
+            model_name='driver',
+            name='rating_decay_sum',
+            field=models.FloatField(default=0, verbose_name='Vaznli baholar yig‘indisi'),
+        ),
+        migrations.AddField(
+            model_name='driver',
+            name='rating_decay_weight',
+            field=models.FloatField(default=0, verbose_name='Baholar vazni'),
+        ),
+        migrations.AddField(
+            model_name='driver',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Baholar yig‘indisi'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:39
+
+from django.db import migrations, models
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+KITCHEN_STATUSES = ['pending', 'preparing']
+
+
+def fill_kitchen_load(apps, schema_editor):
+    Restaurant = apps.get_model('restaurant', 'Restaurant')
+    Order = apps.get_model('restaurant', 'Order')
+    OrderItem = apps.get_model('restaurant', 'OrderItem')
+
+    def summed(queryset, group, expression):
+        subquery = (
+            queryset.filter(**{group: OuterRef('pk')})
+            .order_by()
+            .values(group)
+            .annotate(value=Sum(expression))
+            .values('value')
+        )
+        return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+    Order.objects.update(
+        kitchen_minutes=summed(OrderItem.objects.all(), 'order', F('dish__prep_time_minutes') * F('quantity')),
+    )
+    Restaurant.objects.update(
+        kitchen_load_minutes=summed(
+            Order.objects.filter(status__in=KITCHEN_STATUSES), 'restaurant', F('kitchen_minutes'),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0010_delivery_delivered_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='kitchen_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Oshxona ishi (daqiqa)'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='kitchen_capacity_minutes',
+            field=models.PositiveIntegerField(blank=True, help_text='Bo‘sh bo‘lsa KITCHEN_MAX_BACKLOG_MINUTES sozlamasi ishlatiladi', null=True, verbose_name='Oshxona sig‘imi (daqiqa)'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='kitchen_load_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Oshxona yuklamasi (daqiqa)'),
+        ),
+        migrations.RunPython(fill_kitchen_load, migrations.RunPython.noop),
+    ]
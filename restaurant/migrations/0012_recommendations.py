@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:42
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0011_kitchen_load'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerRecommendation',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation', serialize=False, to='restaurant.customer', verbose_name='Mijoz')),
+                ('restaurant_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), size=None, verbose_name='Restoranlar')),
+                ('scores', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), size=None, verbose_name='Ballar')),
+                ('built_at', models.DateTimeField(verbose_name='Hisoblangan vaqti')),
+            ],
+            options={
+                'verbose_name': 'Restoran tavsiyasi',
+                'verbose_name_plural': 'Restoran tavsiyalari',
+            },
+        ),
+        migrations.CreateModel(
+            name='DishRecommendation',
+            fields=[
+                ('dish', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation', serialize=False, to='restaurant.dish', verbose_name='Taom')),
+                ('dish_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), size=None, verbose_name='Taomlar')),
+                ('scores', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), size=None, verbose_name='Ballar')),
+                ('built_at', models.DateTimeField(verbose_name='Hisoblangan vaqti')),
+            ],
+            options={
+                'verbose_name': 'Taom tavsiyasi',
+                'verbose_name_plural': 'Taom tavsiyalari',
+            },
+        ),
+    ]
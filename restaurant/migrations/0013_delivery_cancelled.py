@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0012_recommendations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='delivery',
+            name='status',
+            field=models.CharField(choices=[('assigned', 'Biriktirilgan'), ('picked_up', 'Olingan'), ('delivered', 'Yetkazilgan'), ('cancelled', 'Bekor qilingan')], default='assigned', max_length=20, verbose_name='Holati'),
+        ),
+    ]
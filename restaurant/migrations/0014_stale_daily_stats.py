@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0013_delivery_cancelled'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Kun')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurant.restaurant', verbose_name='Restoran')),
+            ],
+            options={
+                'verbose_name': 'Eskirgan kunlik statistika',
+                'verbose_name_plural': 'Eskirgan kunlik statistikalar',
+                'constraints': [models.UniqueConstraint(fields=('restaurant', 'day'), name='stale_daily_stats_unique')],
+            },
+        ),
+    ]
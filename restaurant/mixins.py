@@ -0,0 +1,431 @@
+import hashlib
+from operator import attrgetter
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import CharField, Count, F, Max, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import MD5, Cast, Concat
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from . import bulk as bulk_write
+from . import cache as response_cache
+
+
+def _split_param(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_params(request):
+    """
+    `?fields=` va `?expand=` parametrlarini (fields, expand) ko‘rinishida qaytaradi.
+    Parametr berilmagan bo‘lsa None, faqat o‘qish so‘rovlarida ishlaydi.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None, None
+    fields = _split_param(request.query_params.get('fields'))
+    expand = _split_param(request.query_params.get('expand'))
+    if fields is None and expand is None:
+        return None, None
+    return fields, expand or set()
+
+
+def _collapse(field, field_name):
+    """Ichma-ich serializerni id (yoki id lar ro‘yxati) bilan almashtiradi"""
+    kwargs = {'read_only': True}
+    if field.source and field.source != field_name:
+        kwargs['source'] = field.source
+    if isinstance(field, serializers.ListSerializer):
+        return serializers.PrimaryKeyRelatedField(many=True, **kwargs)
+    return serializers.PrimaryKeyRelatedField(**kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=id,name` — faqat so‘ralgan maydonlarni qoldiradi.
+    `?expand=menu` — ichma-ich obyektlardan faqat shularini to‘liq chiqaradi,
+    qolganlari id ko‘rinishida qaytadi. Faqat yuqori darajadagi serializerga ta'sir qiladi.
+    """
+
+    def _is_root(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        requested, expand = get_sparse_params(self.context.get('request'))
+        if requested is None and expand is None:
+            return fields
+        if requested:
+            for name in list(fields):
+                if name not in requested:
+                    del fields[name]
+        for name, field in list(fields.items()):
+            if isinstance(field, serializers.BaseSerializer) and name not in expand:
+                fields[name] = _collapse(field, name)
+        return fields
+
+
+class QueryPlanMixin:
+    """
+    select_related/prefetch_related rejasini serializer maydonlari bo‘yicha tuzadi:
+    so‘ralmagan yoki id ko‘rinishiga tushirilgan munosabatlar umuman yuklanmaydi.
+    """
+    select_related_map = {}
+    prefetch_related_map = {}
+
+    def get_query_plan(self):
+        requested, expand = get_sparse_params(getattr(self, 'request', None))
+        declared = getattr(self.get_serializer_class(), '_declared_fields', {})
+        select_related, prefetch_related = [], []
+
+        for name in {**self.select_related_map, **self.prefetch_related_map}:
+            if requested and name not in requested:
+                continue
+            nested = isinstance(declared.get(name), serializers.BaseSerializer)
+            if nested and expand is not None and name not in expand:
+                continue
+            select_related.extend(self.select_related_map.get(name, ()))
+            prefetch_related.extend(self.prefetch_related_map.get(name, ()))
+
+        if expand is not None:
+            # id ro‘yxatiga tushirilgan many=True munosabatlar uchun oddiy prefetch yetarli
+            for name, field in declared.items():
+                if isinstance(field, serializers.ListSerializer) and name not in expand:
+                    if not requested or name in requested:
+                        prefetch_related.append(field.source or name)
+
+        return select_related, self._unique_prefetches(prefetch_related)
+
+    @staticmethod
+    def _unique_prefetches(lookups):
+        seen, unique = set(), []
+        for lookup in lookups:
+            key = lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+            if key not in seen:
+                seen.add(key)
+                unique.append(lookup)
+        return unique
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select_related, prefetch_related = self.get_query_plan()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class CompactViewMixin(QueryPlanMixin):
+    """
+    `?view=compact` so‘rov parametri bilan o‘qish endpointlarini yengil
+    serializer va unga mos select_related/prefetch_related rejasiga o‘tkazadi.
+    """
+    compact_serializer_class = None
+    compact_select_related = ()
+    compact_prefetch_related = ()
+
+    def is_compact(self):
+        request = getattr(self, 'request', None)
+        return (
+            self.compact_serializer_class is not None
+            and request is not None
+            and request.method in permissions.SAFE_METHODS
+            and request.query_params.get('view') == 'compact'
+        )
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return self.compact_serializer_class
+        return super().get_serializer_class()
+
+    def get_query_plan(self):
+        if self.is_compact():
+            return list(self.compact_select_related), list(self.compact_prefetch_related)
+        return super().get_query_plan()
+
+
+class CachedResponseMixin:
+    """
+    list va retrieve javoblarini restoran versiyasi bilan keshlaydi.
+    cache_scope_param — ro'yxatni restoran bo'yicha filtrlaydigan so'rov parametri,
+    cache_owner_attr — obyektdan restoran id sini olish yo'li (masalan 'menu.restaurant_id').
+    """
+    cache_scope_param = None
+    cache_owner_attr = 'restaurant_id'
+
+    def _cached_response(self, data, hit):
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        scope = request.query_params.get(self.cache_scope_param) if self.cache_scope_param else None
+        key = response_cache.list_key(self.basename, scope, request)
+        data = response_cache.lookup(key)
+        if data is not None:
+            return self._cached_response(data, hit=True)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.store(key, response.data)
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        data = response_cache.lookup(response_cache.detail_key(self.basename, pk, request))
+        if data is not None:
+            return self._cached_response(data, hit=True)
+
+        instance = self.get_object()
+        data = self.get_serializer(instance).data
+        owner = attrgetter(self.cache_owner_attr)(instance)
+        response_cache.remember_owner(self.basename, pk, owner)
+        response_cache.store(response_cache.detail_key(self.basename, pk, request, owner), data)
+        return self._cached_response(data, hit=False)
+
+
+class ConditionalGetMixin:
+    """
+    list va retrieve uchun ETag/Last-Modified: filtrlangan queryset ustida bitta
+    MAX(updated_at), COUNT(*) so'rovi bajariladi va mijozdagi nusxa eskirmagan
+    bo'lsa, hech narsa serializatsiya qilinmasdan 304 qaytariladi.
+    etag_timestamp_fields — javobga kiradigan bog'langan jadvallarning updated_at ustunlari.
+    etag_value_fields — updated_at ni o'zgartirmasdan yangilanadigan ustunlar. ETag ga har bir qatorning
+    (id:qiymat) juftligi kiradi: yig'indi qiymat qatorlar orasida ko'chganda o'zgarmay qolardi.
+
+    Ro'yxatlarda faqat ETag beriladi: o'chirilgan qator MAX(updated_at) ni oldinga surmaydi,
+    Last-Modified esa eskirgan 304 ga olib kelardi. Kursor bilan sahifalangan ro'yxatda
+    tekshiruv butun tarix emas, faqat joriy sahifa qatorlari (keyset oynasi) ustida bajariladi.
+    """
+    etag_timestamp_fields = ('updated_at',)
+    etag_value_fields = ()
+
+    def get_freshness_aggregates(self):
+        aggregates = {f'ts_{index}': Max(field) for index, field in enumerate(self.etag_timestamp_fields)}
+        values = {
+            f'value_{index}': MD5(StringAgg(
+                Concat(Cast('pk', CharField()), Value(':'), Cast(field, CharField())), ',', order_by='pk',
+            ))
+            for index, field in enumerate(self.etag_value_fields)
+        }
+        return {'rows': Count('pk', distinct=True), **aggregates, **values}
+
+    def row_freshness_expression(self, path):
+        """
+        path (masalan 'items__dish__updated_at') ning bitta qator uchun MAX qiymati. Ko'p qatorli
+        bog'lanish (items) qatorlarni ko'paytirmasligi uchun korrelyatsiyalangan subquery bo'ladi.
+        """
+        parts = path.split('__')
+        model = self.get_queryset().model
+        for index, part in enumerate(parts):
+            field = model._meta.get_field(part)
+            if field.one_to_many or field.many_to_many:
+                outer = '__'.join([*parts[:index], 'pk'])
+                rows = field.related_model._default_manager.filter(**{field.field.name: OuterRef(outer)})
+                return Subquery(
+                    rows.order_by().values(field.field.name).annotate(latest=Max('__'.join(parts[index + 1:])))
+                    .values('latest')
+                )
+            if not field.is_relation:
+                break
+            model = field.related_model
+        return F(path)
+
+    def get_page_probe(self, queryset):
+        """
+        Kursor bilan sahifalangan ro'yxat: joriy sahifa qatorlari (keyset oynasi) va ularning
+        freshness qiymatlari bitta so'rovda. Sahifalash bo'lmasa None.
+        """
+        paginator = self.paginator
+        if not isinstance(paginator, CursorPagination):
+            return None
+        ordering = paginator.get_ordering(self.request, queryset, self)
+        columns = [field.lstrip('-') for field in ordering if field.lstrip('-') not in queryset.query.annotations]
+        fields = [*self.etag_timestamp_fields, *self.etag_value_fields]
+        keys = queryset.select_related(None).prefetch_related(None).only(*columns).annotate(**{
+            f'freshness_{index}': self.row_freshness_expression(field) for index, field in enumerate(fields)
+        })
+        page = paginator.paginate_queryset(keys, self.request, view=self)
+        window = [
+            (obj.pk, *(getattr(obj, f'freshness_{index}') for index in range(len(fields)))) for obj in page
+        ]
+        count = len(self.etag_timestamp_fields)
+        probe = {'rows': len(window)}
+        for index in range(count):
+            probe[f'ts_{index}'] = max((row[index + 1] for row in window if row[index + 1]), default=None)
+        for index in range(len(self.etag_value_fields)):
+            # Qiymatlar window dagi id lar bilan bir xil tartibda
+            probe[f'value_{index}'] = ','.join(str(row[count + index + 1]) for row in window)
+        return probe, [row[0] for row in window]
+
+    def get_freshness(self, queryset, listing=False):
+        page_probe = self.get_page_probe(queryset) if listing else None
+        if page_probe is not None:
+            probe, window = page_probe
+            return self.freshness_from_probe(probe, listing, window)
+        probe = queryset.order_by().aggregate(**self.get_freshness_aggregates())
+        return self.freshness_from_probe(probe, listing)
+
+    async def aget_freshness(self, queryset, listing=False):
+        probe = await queryset.order_by().aaggregate(**self.get_freshness_aggregates())
+        return self.freshness_from_probe(probe, listing)
+
+    def freshness_from_probe(self, probe, listing=False, window=None):
+        rows = probe.pop('rows')
+        timestamps = [probe[key] for key in sorted(probe) if key.startswith('ts_')]
+        values = [probe[key] for key in sorted(probe) if key.startswith('value_')]
+        if not rows:
+            return None, None
+
+        request = self.request
+        fingerprint = ':'.join([
+            self.basename, request.get_full_path(), str(request.user.pk), str(rows),
+            ','.join(map(str, window or ())),
+            *(timestamp.isoformat() if timestamp else '-' for timestamp in timestamps),
+            *(str(value) for value in values),
+        ])
+        etag = hashlib.md5(fingerprint.encode()).hexdigest()
+        if listing or values:
+            # Javob updated_at siz o'zgarishi mumkin — If-Modified-Since ga tayanib bo'lmaydi
+            return etag, None
+        last_modified = max((timestamp for timestamp in timestamps if timestamp), default=None)
+        return etag, last_modified
+
+    def _conditional(self, request, queryset, handler, *args, listing=False, **kwargs):
+        etag, last_modified = self.get_freshness(queryset, listing)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = self.not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.patch_freshness_headers(response, etag, last_modified)
+
+    @staticmethod
+    def not_modified_response(request, etag, last_modified):
+        """Mijozdagi nusxa eskirmagan bo'lsa 304 javob, aks holda None"""
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=quote_etag(etag), last_modified=last_modified_ts)
+
+    @staticmethod
+    def patch_freshness_headers(response, etag, last_modified):
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+        if response.status_code in (200, 304):
+            response['ETag'] = quote_etag(etag)
+            if last_modified_ts is not None:
+                response['Last-Modified'] = http_date(last_modified_ts)
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(request, queryset, super().list, *args, listing=True, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self._conditional(request, queryset, super().retrieve, *args, **kwargs)
+
+
+class TransitionMixin:
+    """
+    Holat mashinasi amallari (restaurant/transitions.py):
+    POST {id}/transition/ {"status": ...} va POST bulk-transition/ {"ids": [...], "status": ...}.
+    transition_function(ids, target) bitta shartli UPDATE bajaradi va o'zgargan id larni qaytaradi.
+    """
+    transition_function = None
+    transition_serializer_class = None
+    bulk_transition_serializer_class = None
+
+    def get_query_plan(self):
+        # O'tish uchun obyektning o'zi yetarli, bog'langan daraxt yuklanmaydi
+        if self.action in ('transition', 'bulk_transition'):
+            return [], []
+        return super().get_query_plan()
+
+    def get_serializer_class(self):
+        if self.action == 'transition':
+            return self.transition_serializer_class
+        if self.action == 'bulk_transition':
+            return self.bulk_transition_serializer_class
+        return super().get_serializer_class()
+
+    @action(detail=True, methods=['post'])
+    def transition(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target = serializer.validated_data['status']
+        if not self.transition_function([instance.pk], target):
+            return Response(
+                {'detail': f"'{instance.status}' holatidan '{target}' holatiga o'tib bo'lmaydi."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({'id': instance.pk, 'status': target})
+
+    @action(detail=False, methods=['post'], url_path='bulk-transition', permission_classes=[permissions.IsAdminUser])
+    def bulk_transition(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids, target = serializer.validated_data['ids'], serializer.validated_data['status']
+        changed = self.transition_function(ids, target)
+        return Response({'status': target, 'changed': changed, 'skipped': sorted(set(ids) - set(changed))})
+
+
+class BulkWriteMixin:
+    """
+    POST bulk/ — ommaviy yaratish, PUT bulk/ — upsert (id bo'lsa to'liq yangilash, bo'lmasa
+    yaratish), PATCH bulk/ — id bo'yicha qisman yangilash (masalan faqat narxlar).
+    Javob ixcham: {"created": [...], "updated": [...]} (restaurant/bulk.py).
+    """
+    bulk_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action == 'bulk':
+            return self.bulk_serializer_class
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=['post', 'put', 'patch'], url_path='bulk', permission_classes=[permissions.IsAdminUser])
+    def bulk(self, request):
+        mode = bulk_write.MODES[request.method]
+        serializer = self.get_serializer(
+            data=request.data, many=True, partial=mode == 'update', allow_empty=False,
+            max_length=settings.BULK_WRITE_MAX_ITEMS,
+            context={**self.get_serializer_context(), 'bulk_mode': mode},
+        )
+        serializer.is_valid(raise_exception=True)
+        created, _ = serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class QueryBudgetMixin:
+    """
+    Metrikalar uchun endpoint nomini ('{basename}.{action}') va so'rovlar byudjetini
+    QueryMetricsMiddleware ga uzatadi. query_budgets = {'list': 3, 'retrieve': 3}
+    — token, filtr qiymatlarini tekshirish va ETag so'rovlari ham hisobga kiradi.
+    """
+    query_budgets = {}
+
+    def initial(self, request, *args, **kwargs):
+        django_request = request._request
+        django_request.metrics_endpoint = f'{self.basename}.{self.action}'
+        budget = self.query_budgets.get(self.action)
+        if budget is not None:
+            django_request.query_budget = budget
+        collector = getattr(django_request, 'metrics_collector', None)
+        if collector is not None:
+            django_request.metrics_view_started = collector.mark()
+        super().initial(request, *args, **kwargs)
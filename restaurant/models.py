@@ -1,22 +1,66 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
-class Restaurant(models.Model):
+class DerivedFieldsMixin:
+    """
+    DERIVED_FIELDS — signallar va F() UPDATE lar yuritadigan maydonlar. update_fields siz
+    save() ularni yozmaydi, aks holda get_object() da o'qilgan eskirgan nusxa oraliqda
+    commit bo'lgan o'zgarishlarni bosib ketardi. Yangi qatorda yoki nomi aytilganda yoziladi.
+    """
+    DERIVED_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None and not args and not self._state.adding and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class Restaurant(DerivedFieldsMixin, models.Model):
     name = models.CharField(max_length=255, verbose_name="Restoran nomi")
     description = models.TextField(blank=True, null=True, verbose_name="Tavsif")
     address = models.TextField(verbose_name="Manzil")
     phone = models.CharField(max_length=20, unique=True, verbose_name="Telefon raqam")
     email = models.EmailField(unique=True, verbose_name="Email")
     is_active = models.BooleanField(default=True, verbose_name="Faolmi?")
+    likes_count = models.PositiveIntegerField(default=0, verbose_name="Layklar soni")
+    comments_count = models.PositiveIntegerField(default=0, verbose_name="Izohlar soni")
+    rating_sum = models.PositiveIntegerField(default=0, verbose_name="Baholar yig‘indisi")
+    rating_count = models.PositiveIntegerField(default=0, verbose_name="Baholar soni")
+    # Oshxona navbatidagi ish, daqiqa (restaurant/kitchen.py)
+    kitchen_load_minutes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Oshxona yuklamasi (daqiqa)")
+    kitchen_capacity_minutes = models.PositiveIntegerField(
+        blank=True, null=True, verbose_name="Oshxona sig‘imi (daqiqa)",
+        help_text="Bo‘sh bo‘lsa KITCHEN_MAX_BACKLOG_MINUTES sozlamasi ishlatiladi",
+    )
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name="Qidiruv vektori")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan vaqti")
 
+    # Layk/izoh/sharh signallari (signals._change_restaurant_counters) va kitchen.admit/change_load F() bilan yozadi
+    DERIVED_FIELDS = ('likes_count', 'comments_count', 'rating_sum', 'rating_count', 'kitchen_load_minutes')
+
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
     class Meta:
         verbose_name = "Restoran"
         verbose_name_plural = "Restoranlar"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['-likes_count'], name='restaurant_likes_count_idx'),
+            GinIndex(fields=['search_vector'], name='restaurant_search_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -77,6 +121,7 @@ class Dish(models.Model):
     is_available = models.BooleanField(default=True, verbose_name="Mavjudmi?")
     prep_time_minutes = models.PositiveIntegerField(default=10, verbose_name="Tayyorlanish vaqti (daqiqa)")
     menu = models.ForeignKey(Menu, on_delete=models.CASCADE, related_name='dishes', verbose_name="Menyu")
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name="Qidiruv vektori")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan vaqti")
 
@@ -84,6 +129,10 @@ class Dish(models.Model):
         verbose_name = "Taom"
         verbose_name_plural = "Taomlar"
         ordering = ["name"]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='dish_search_idx'),
+            models.Index(fields=['menu', 'is_available'], name='dish_menu_available_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -110,7 +159,7 @@ class Customer(models.Model):
         return self.full_name
 
 
-class Driver(models.Model):
+class Driver(DerivedFieldsMixin, models.Model):
     full_name = models.CharField(max_length=255, verbose_name="Haydovchi ismi")
     phone = models.CharField(max_length=20, unique=True, verbose_name="Telefon raqam")
     vehicle_info = models.CharField(max_length=255, verbose_name="Transport ma’lumotlari")
@@ -121,19 +170,34 @@ class Driver(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(5)],
         verbose_name="Reyting"
     )
+    # Review.driver baholaridan sharh yozilganda yangilanadi (restaurant/ratings.py)
+    rating_sum = models.PositiveIntegerField(default=0, verbose_name="Baholar yig‘indisi")
+    rating_count = models.PositiveIntegerField(default=0, verbose_name="Baholar soni")
+    rating_decay_sum = models.FloatField(default=0, verbose_name="Vaznli baholar yig‘indisi")
+    rating_decay_weight = models.FloatField(default=0, verbose_name="Baholar vazni")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan vaqti")
 
+    # ratings.change_driver_rating F() bilan yozadi
+    DERIVED_FIELDS = ('rating', 'rating_sum', 'rating_count', 'rating_decay_sum', 'rating_decay_weight')
+
     class Meta:
         verbose_name = "Haydovchi"
         verbose_name_plural = "Haydovchilar"
         ordering = ["-rating"]
+        indexes = [
+            # Bo'sh haydovchilarni reyting bo'yicha tanlash (dispatch, availability indeksi)
+            models.Index(
+                fields=['-rating'], name='driver_available_rating_idx',
+                condition=models.Q(is_online=True, is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return self.full_name
 
 
-class Order(models.Model):
+class Order(DerivedFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Kutilmoqda'),
         ('preparing', 'Tayyorlanmoqda'),
@@ -141,9 +205,20 @@ class Order(models.Model):
         ('completed', 'Yakunlangan'),
         ('cancelled', 'Bekor qilingan'),
     ]
+    # Holat mashinasi: joriy holat -> o'tish mumkin bo'lgan holatlar (restaurant/transitions.py)
+    TRANSITIONS = {
+        'pending': ('preparing', 'cancelled'),
+        'preparing': ('delivering', 'cancelled'),
+        'delivering': ('completed',),
+        'completed': (),
+        'cancelled': (),
+    }
 
     delivery_address = models.TextField(verbose_name="Yetkazib berish manzili")
+    # OrderItem signallari orqali F() bilan yangilanib boriladi
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Umumiy summa")
+    # Taomlar tayyorlanish vaqti yig'indisi; OrderItem signallari va checkout yozadi (restaurant/kitchen.py)
+    kitchen_minutes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Oshxona ishi (daqiqa)")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Holati")
     placed_at = models.DateTimeField(auto_now_add=True, verbose_name="Buyurtma vaqti")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan vaqti")
@@ -153,18 +228,28 @@ class Order(models.Model):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='orders', verbose_name="Restoran")
     driver = models.ForeignKey(Driver, on_delete=models.SET_NULL, null=True, blank=True, related_name='orders', verbose_name="Haydovchi")
 
+    # OrderItem signallari F() bilan yozadi
+    DERIVED_FIELDS = ('total_amount', 'kitchen_minutes')
+
     @property
     def calculated_total(self):
         return sum(item.total_price for item in self.items.all())
 
-    def save(self, *args, **kwargs):
-        self.total_amount = self.calculated_total
-        super().save(*args, **kwargs)
-
     class Meta:
         verbose_name = "Buyurtma"
         verbose_name_plural = "Buyurtmalar"
         ordering = ["-placed_at"]
+        indexes = [
+            models.Index(fields=['-placed_at', '-id'], name='order_placed_at_id_idx'),
+            models.Index(fields=['updated_at'], name='order_updated_at_idx'),
+            # Mijozning buyurtmalar ro'yxati: WHERE customer_id = ? ORDER BY placed_at DESC, id DESC
+            models.Index(fields=['customer', '-placed_at', '-id'], name='order_customer_placed_at_idx'),
+            # Dispatcher faqat ochiq buyurtmalarni eng eskisidan boshlab o'qiydi
+            models.Index(
+                fields=['placed_at', 'id'], name='order_open_placed_at_idx',
+                condition=models.Q(status__in=['pending', 'preparing']),
+            ),
+        ]
 
     def __str__(self):
         return f"Buyurtma #{self.id} - {self.customer.full_name}"
@@ -208,11 +293,16 @@ class Payment(models.Model):
     paid_at = models.DateTimeField(blank=True, null=True, verbose_name="To‘langan vaqt")
     order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='payment', verbose_name="Buyurtma")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan vaqti")
 
     class Meta:
         verbose_name = "To‘lov"
         verbose_name_plural = "To‘lovlar"
         ordering = ["-paid_at"]
+        indexes = [
+            # Kunlik statistikani qayta hisoblashda o'zgargan to'lovlarni topish uchun
+            models.Index(fields=['updated_at'], name='payment_updated_at_idx'),
+        ]
 
     def __str__(self):
         return f"To‘lov #{self.id} (Buyurtma {self.order.id})"
@@ -223,7 +313,15 @@ class Delivery(models.Model):
         ('assigned', 'Biriktirilgan'),
         ('picked_up', 'Olingan'),
         ('delivered', 'Yetkazilgan'),
+        # Faqat buyurtma bekor qilinganda (restaurant/transitions.py), haydovchi bo'shaydi
+        ('cancelled', 'Bekor qilingan'),
     ]
+    TRANSITIONS = {
+        'assigned': ('picked_up',),
+        'picked_up': ('delivered',),
+        'delivered': (),
+        'cancelled': (),
+    }
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='assigned', verbose_name="Holati")
     pickup_at = models.DateTimeField(blank=True, null=True, verbose_name="Olish vaqti")
@@ -238,6 +336,19 @@ class Delivery(models.Model):
         verbose_name = "Yetkazib berish"
         verbose_name_plural = "Yetkazib berishlar"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='delivery_created_at_id_idx'),
+            # Haydovchilarning faol yetkazishlari soni (dispatch, availability indeksi)
+            models.Index(
+                fields=['driver'], name='delivery_active_driver_idx',
+                condition=models.Q(status__in=['assigned', 'picked_up']),
+            ),
+            # ETA uchun oxirgi yetkazishlar davomiyligi (restaurant/eta.py)
+            models.Index(
+                fields=['delivered_at'], name='delivery_delivered_at_idx',
+                condition=models.Q(status='delivered'),
+            ),
+        ]
 
     def __str__(self):
         return f"Yetkazib berish #{self.id}"
@@ -260,6 +371,130 @@ class Review(models.Model):
         verbose_name = "Sharh"
         verbose_name_plural = "Sharhlar"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='review_created_at_id_idx'),
+            models.Index(fields=['customer', '-created_at', '-id'], name='review_customer_created_idx'),
+            # Restoran javobidagi sharhlar prefetch i: WHERE restaurant_id IN (...) ORDER BY created_at DESC
+            models.Index(fields=['restaurant', '-created_at', '-id'], name='review_restaurant_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer.full_name} - {self.rating}/5"
+
+
+class DailyRestaurantStats(models.Model):
+    """Restoranning kunlik savdo ko'rsatkichlari (refresh_daily_stats buyrug'i to'ldiradi)"""
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='daily_stats', verbose_name="Restoran")
+    day = models.DateField(verbose_name="Kun")
+    orders_count = models.PositiveIntegerField(default=0, verbose_name="Buyurtmalar soni")
+    cancelled_count = models.PositiveIntegerField(default=0, verbose_name="Bekor qilinganlar soni")
+    items_count = models.PositiveIntegerField(default=0, verbose_name="Sotilgan taomlar soni")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Tushum")
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="To‘langan summa")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan vaqti")
+
+    @property
+    def average_basket(self):
+        completed = self.orders_count - self.cancelled_count
+        if not completed:
+            return None
+        return round(self.revenue / completed, 2)
+
+    class Meta:
+        verbose_name = "Kunlik restoran statistikasi"
+        verbose_name_plural = "Kunlik restoran statistikalari"
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'day'], name='daily_restaurant_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.restaurant_id} - {self.day}"
+
+
+class DailyDishStats(models.Model):
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='daily_dish_stats', verbose_name="Restoran")
+    dish = models.ForeignKey(Dish, on_delete=models.CASCADE, related_name='daily_stats', verbose_name="Taom")
+    day = models.DateField(verbose_name="Kun")
+    quantity = models.PositiveIntegerField(default=0, verbose_name="Miqdor")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Tushum")
+
+    class Meta:
+        verbose_name = "Kunlik taom statistikasi"
+        verbose_name_plural = "Kunlik taom statistikalari"
+        ordering = ["-day", "-quantity"]
+        constraints = [
+            models.UniqueConstraint(fields=['dish', 'day'], name='daily_dish_stats_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['restaurant', 'day'], name='daily_dish_stats_rest_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.dish_id} - {self.day}: {self.quantity}"
+
+
+class RollupCheckpoint(models.Model):
+    """Kunlik statistika oxirgi marta qachon yangilangani (o'zgargan kunlarni topish uchun)"""
+    name = models.CharField(max_length=50, unique=True, verbose_name="Nomi")
+    refreshed_at = models.DateTimeField(verbose_name="Yangilangan vaqti")
+
+    class Meta:
+        verbose_name = "Statistika nazorat nuqtasi"
+        verbose_name_plural = "Statistika nazorat nuqtalari"
+
+    def __str__(self):
+        return f"{self.name}: {self.refreshed_at}"
+
+
+class StaleDailyStats(models.Model):
+    """
+    Buyurtma boshqa restoran yoki kunga ko'chganda eski (restoran, kun) juftligi: buyurtmaning
+    updated_at i faqat yangi juftlikni ko'rsatadi. refresh_daily_stats qayta hisoblab o'chiradi.
+    """
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='+', verbose_name="Restoran")
+    day = models.DateField(verbose_name="Kun")
+
+    class Meta:
+        verbose_name = "Eskirgan kunlik statistika"
+        verbose_name_plural = "Eskirgan kunlik statistikalar"
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'day'], name='stale_daily_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.restaurant_id} - {self.day}"
+
+
+class DishRecommendation(models.Model):
+    """Taom bilan birga buyurtma qilinadigan taomlar, top-K (build_recommendations buyrug'i to'ldiradi)"""
+    dish = models.OneToOneField(
+        Dish, on_delete=models.CASCADE, primary_key=True, related_name='recommendation', verbose_name="Taom",
+    )
+    dish_ids = ArrayField(models.IntegerField(), verbose_name="Taomlar")
+    scores = ArrayField(models.FloatField(), verbose_name="Ballar")
+    built_at = models.DateTimeField(verbose_name="Hisoblangan vaqti")
+
+    class Meta:
+        verbose_name = "Taom tavsiyasi"
+        verbose_name_plural = "Taom tavsiyalari"
+
+    def __str__(self):
+        return f"{self.dish_id}: {self.dish_ids}"
+
+
+class CustomerRecommendation(models.Model):
+    """Mijozga tavsiya qilinadigan restoranlar, top-K (build_recommendations buyrug'i to'ldiradi)"""
+    customer = models.OneToOneField(
+        Customer, on_delete=models.CASCADE, primary_key=True, related_name='recommendation', verbose_name="Mijoz",
+    )
+    restaurant_ids = ArrayField(models.IntegerField(), verbose_name="Restoranlar")
+    scores = ArrayField(models.FloatField(), verbose_name="Ballar")
+    built_at = models.DateTimeField(verbose_name="Hisoblangan vaqti")
+
+    class Meta:
+        verbose_name = "Restoran tavsiyasi"
+        verbose_name_plural = "Restoran tavsiyalari"
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.restaurant_ids}"
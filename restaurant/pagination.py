@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    OFFSET o‘rniga kursor (keyset) bo‘yicha sahifalash: chuqur sahifalar ham
+    indeks orqali birinchi sahifa kabi tez o‘qiladi.
+    """
+    page_size = settings.API_PAGE_SIZE
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+
+    def get_ordering(self, request, queryset, view):
+        # Faqat indekslangan (vaqt, id) tartibi: ?ordering= bilan past kardinallikdagi kalit
+        # (status, rating) OFFSET li kursorlarga olib keladi. Async endpointlar ham shu tartibda.
+        # ?search= da FullTextSearchFilter search_rank qo'shadi: natijalar rank bo'yicha sahifalanadi
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', *self.ordering[1:])
+        return self.ordering
+
+
+class OrderPagination(KeysetPagination):
+    ordering = ('-placed_at', '-id')
+
+
+class ReviewPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class DeliveryPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,155 @@
+"""
+Haydovchi reytingi Review.driver baholaridan.
+
+Driver da baholar yig'indisi va soni (rating_sum, rating_count) hamda vaqt bo'yicha
+so'nuvchi vaznli yig'indi (rating_decay_sum, rating_decay_weight) saqlanadi. Sharh
+yaratilishi, o'zgarishi va o'chirilishida ular sharh yozilgan tranzaksiyaning o'zida bitta
+F() UPDATE bilan o'zgaradi, Driver.rating shu UPDATE da qayta hisoblanadi. O'qishda
+(haydovchilar ro'yxati, dispatch, availability indeksi) sharhlar skanerlanmaydi.
+
+So'nish "forward decay" usulida: sharh vazni 2 ** ((created_at - RATING_EPOCH) / yarim_umr).
+Yangi sharhlar og'irroq, eski yig'indilarni vaqt o'tishi bilan qayta yozish shart emas —
+o'rtacha qiymat nisbat bo'lgani uchun umumiy masshtab qisqaradi.
+DRIVER_RATING_HALF_LIFE_DAYS = None bo'lsa vazn 1, ya'ni oddiy o'rtacha.
+Sozlama o'zgarsa, recompute_driver_ratings buyrug'ini ishga tushirish kerak.
+Juda qisqa yarim umrda vazn float dan chiqib ketadi (2 ** 1024) — buni ishga tushishda
+check_half_life tizim tekshiruvi ushlaydi.
+"""
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import checks
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, Extract, Power
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .availability import index as availability_index
+from .models import Driver, Review
+
+# 2020-01-01 UTC: vaznlar shu nuqtadan o'sadi (float 30 kunlik yarim umrda ~80 yilga yetadi)
+RATING_EPOCH = 1577836800
+RATING_FIELD = DecimalField(max_digits=3, decimal_places=2)
+# Vazn ko'rsatkichi chegarasi: 2 ** 1024 double precision dan chiqadi, qolgani yig'indilar uchun zaxira
+MAX_WEIGHT_EXPONENT = 1000
+# Sozlama hozirdan kamida shuncha vaqt oldinga yetishi kerak
+WEIGHT_HORIZON_SECONDS = 10 * 365 * 86400
+
+
+def _half_life_seconds():
+    days = settings.DRIVER_RATING_HALF_LIFE_DAYS
+    return days * 86400 if days else None
+
+
+@checks.register()
+def check_half_life(app_configs, **kwargs):
+    """DRIVER_RATING_HALF_LIFE_DAYS musbat va WEIGHT_HORIZON_SECONDS davomida vazn float ga sig'adi"""
+    days = settings.DRIVER_RATING_HALF_LIFE_DAYS
+    if days is None:
+        return []
+    if not isinstance(days, (int, float)) or days <= 0:
+        return [checks.Error(
+            "DRIVER_RATING_HALF_LIFE_DAYS musbat son yoki None bo'lishi kerak.", id='restaurant.E001',
+        )]
+    minimum = (time.time() + WEIGHT_HORIZON_SECONDS - RATING_EPOCH) / MAX_WEIGHT_EXPONENT / 86400
+    if days < minimum:
+        return [checks.Error(
+            f"DRIVER_RATING_HALF_LIFE_DAYS={days} da sharh vazni float dan chiqib ketadi.",
+            hint=f"Kamida {minimum:.1f} kun bo'lishi kerak.", id='restaurant.E002',
+        )]
+    return []
+
+
+def decay_weight(created_at):
+    half_life = _half_life_seconds()
+    if half_life is None:
+        return 1.0
+    return 2.0 ** ((created_at.timestamp() - RATING_EPOCH) / half_life)
+
+
+def decay_weight_expression(field='created_at'):
+    """decay_weight() ning SQL ko'rinishi (guruhlangan qayta hisoblash uchun)"""
+    half_life = _half_life_seconds()
+    if half_life is None:
+        return Value(1.0, output_field=FloatField())
+    exponent = (Cast(Extract(field, 'epoch'), FloatField()) - RATING_EPOCH) / half_life
+    return Power(Value(2.0, output_field=FloatField()), exponent, output_field=FloatField())
+
+
+def rating_value(decay_sum, decay_weight_total, count):
+    if not count or not decay_weight_total:
+        return Decimal('0')
+    return Decimal(decay_sum / decay_weight_total).quantize(Decimal('0.01'))
+
+
+def change_driver_rating(driver_id, rating, created_at, sign):
+    """
+    Bitta sharhni (sign=1) qo'shadi yoki (sign=-1) ayiradi. Reyting shu UPDATE ning o'zida
+    yangi yig'indilardan hisoblanadi; indeks commit dan keyin yangilanadi.
+    """
+    if driver_id is None:
+        return
+    weight = decay_weight(created_at)
+    count = F('rating_count') + sign
+    decay_sum = F('rating_decay_sum') + sign * rating * weight
+    decay_total = F('rating_decay_weight') + sign * weight
+    Driver.objects.filter(pk=driver_id).update(
+        rating_sum=F('rating_sum') + sign * rating,
+        rating_count=count,
+        rating_decay_sum=decay_sum,
+        rating_decay_weight=decay_total,
+        rating=Case(
+            When(GreaterThan(count, 0), then=Cast(decay_sum / decay_total, RATING_FIELD)),
+            default=Value(Decimal('0')), output_field=RATING_FIELD,
+        ),
+        updated_at=timezone.now(),
+    )
+    if availability_index.is_loaded():
+        transaction.on_commit(lambda: refresh_index([driver_id]))
+
+
+def refresh_index(driver_ids):
+    """Bulk UPDATE Driver signalini yubormaydi — yangi reyting indeksga shu yerda yoziladi"""
+    if not availability_index.is_loaded():
+        return
+    for driver_id, rating, is_online, is_active in (
+        Driver.objects.filter(pk__in=driver_ids).values_list('id', 'rating', 'is_online', 'is_active')
+    ):
+        availability_index.upsert_driver(driver_id, rating, is_online and is_active)
+
+
+def recompute_all():
+    """
+    Barcha haydovchilar yig'indilarini Review ustidagi bitta guruhlangan so'rovdan qayta
+    yozadi. Yangilangan haydovchilar sonini qaytaradi.
+    """
+    weight = decay_weight_expression()
+    totals = {
+        row['driver_id']: row
+        for row in Review.objects.filter(driver__isnull=False).order_by().values('driver_id').annotate(
+            total=Sum('rating'), count=Count('id'),
+            decay_sum=Sum(F('rating') * weight, output_field=FloatField()),
+            decay_weight=Sum(weight, output_field=FloatField()),
+        )
+    }
+    now = timezone.now()
+    drivers = list(Driver.objects.only('id'))
+    for driver in drivers:
+        row = totals.get(driver.pk, {})
+        driver.rating_sum = row.get('total') or 0
+        driver.rating_count = row.get('count') or 0
+        driver.rating_decay_sum = row.get('decay_sum') or 0.0
+        driver.rating_decay_weight = row.get('decay_weight') or 0.0
+        driver.rating = rating_value(driver.rating_decay_sum, driver.rating_decay_weight, driver.rating_count)
+        driver.updated_at = now
+
+    with transaction.atomic():
+        Driver.objects.bulk_update(
+            drivers,
+            ['rating_sum', 'rating_count', 'rating_decay_sum', 'rating_decay_weight', 'rating', 'updated_at'],
+            batch_size=1000,
+        )
+        transaction.on_commit(availability_index.invalidate)
+    return len(drivers)
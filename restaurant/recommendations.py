@@ -0,0 +1,256 @@
+"""
+Tavsiyalar: "bu taom bilan birga buyurtma qilinadi" va mijozga restoranlar.
+
+build_recommendations buyrug'i (kechasi) ikki siyrak matritsani NumPy bilan partiyalab hisoblaydi
+va top-K natijani DishRecommendation / CustomerRecommendation jadvallariga yozadi. Endpointlar
+faqat bitta qatorni birlamchi kalit bo'yicha o'qiydi.
+
+- taom x taom: bir buyurtmadagi turli taomlar juftliklari soni, kosinus bilan normallashtiriladi;
+- mijoz x restoran yaqinligi: log(1 + buyurtmalar) + layk + sharh bahosi (3 dan yuqori/past);
+  restoranlar o'xshashligi shu matritsadan (AᵀA, kosinus), mijozga esa u hali tanlamagan
+  restoranlar sum(yaqinlik * o'xshashlik) bo'yicha tavsiya qilinadi.
+
+Ma'lumot buyurtma/mijoz id oraliqlari bo'yicha RECOMMENDATION_BATCH_SIZE dan o'qiladi. Xotira
+o'qilgan qatorlar soniga emas, katalog hajmiga (juftliklar bitta restoran ichida bo'ladi) bog'liq.
+Natijalar har partiyada upsert qilinadi, eskirgan qatorlar oxirida o'chiriladi.
+"""
+import numpy as np
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min
+from django.utils import timezone
+
+from .models import (
+    Customer, Dish, Order, OrderItem, Restaurant, RestaurantLike, Review,
+    CustomerRecommendation, DishRecommendation,
+)
+
+EXCLUDED_STATUSES = ('cancelled',)
+# Juft kalitlar to'plami shuncha elementdan oshsa birlashtiriladi
+COMPACT_THRESHOLD = 1_000_000
+
+
+class PairAccumulator:
+    """(kalit -> vazn) siyrak yig'indisi: partiyalar qo'shiladi, vaqti-vaqti bilan np.unique bilan birlashadi"""
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=float)
+        self._pending = []
+        self._pending_size = 0
+
+    def add(self, keys, values):
+        self._pending.append((keys, values))
+        self._pending_size += len(keys)
+        if self._pending_size > max(len(self.keys), COMPACT_THRESHOLD):
+            self._compact()
+
+    def _compact(self):
+        if not self._pending:
+            return
+        keys = np.concatenate([self.keys, *(keys for keys, _ in self._pending)])
+        values = np.concatenate([self.values, *(values for _, values in self._pending)])
+        self.keys, inverse = np.unique(keys, return_inverse=True)
+        self.values = np.bincount(inverse, weights=values)
+        self._pending, self._pending_size = [], 0
+
+    def result(self):
+        self._compact()
+        return self.keys, self.values
+
+
+def _ranges(lengths):
+    """[0..l0), [0..l1), ... ketma-ketliklarini bitta massivga yig'adi"""
+    total = int(lengths.sum())
+    starts = np.cumsum(lengths) - lengths
+    return np.arange(total) - np.repeat(starts, lengths)
+
+
+def basket_pairs(groups, items):
+    """
+    Bir guruh (buyurtma/mijoz) ichidagi barcha i != j juftliklarining indekslari.
+    groups tartiblangan bo'lishi kerak.
+    """
+    count = len(groups)
+    if not count:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, count])
+    per_item = np.repeat(sizes, sizes)
+    left = np.repeat(np.arange(count), per_item)
+    right = np.repeat(np.repeat(starts, sizes), per_item) + _ranges(per_item)
+    distinct = items[left] != items[right]
+    return left[distinct], right[distinct]
+
+
+def top_k(rows, cols, scores, k):
+    """Har bir qator uchun eng yuqori k ta (col, score); {row: (cols, scores)} qaytaradi"""
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.empty(0, dtype=np.int64)
+    rank = _ranges(np.diff(np.r_[starts, len(rows)]))
+    keep = rank < k
+    rows, cols, scores = rows[keep], cols[keep], scores[keep]
+    bounds = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.empty(0, dtype=np.int64)
+    return {
+        int(rows[start]): (cols[start:end].tolist(), np.round(scores[start:end], 6).tolist())
+        for start, end in zip(bounds, np.r_[bounds[1:], len(rows)])
+    }
+
+
+def _id_batches(queryset, field):
+    bounds = queryset.aggregate(low=Min(field), high=Max(field))
+    if bounds['low'] is None:
+        return
+    step = settings.RECOMMENDATION_BATCH_SIZE
+    for low in range(bounds['low'], bounds['high'] + 1, step):
+        yield low, low + step
+
+
+def _rows(queryset, columns):
+    data = np.array(list(queryset), dtype=float).reshape(-1, columns)
+    return data.T
+
+
+# Taom x taom
+
+def dish_cooccurrence():
+    """Juftliklar (i, j, kosinus) — i, j taom id lari"""
+    width = (Dish.objects.aggregate(high=Max('id'))['high'] or 0) + 1
+    orders_with_dish = np.zeros(width)
+    pairs = PairAccumulator()
+    # width hisoblangandan keyin qo'shilgan taomlar keyingi qayta qurishda hisobga olinadi
+    items = OrderItem.objects.filter(dish_id__lt=width).exclude(order__status__in=EXCLUDED_STATUSES)
+
+    for low, high in _id_batches(Order.objects.all(), 'id'):
+        orders, dishes = _rows(
+            items.filter(order_id__gte=low, order_id__lt=high).order_by().values_list('order_id', 'dish_id').distinct(), 2,
+        )
+        orders, dishes = orders.astype(np.int64), dishes.astype(np.int64)
+        order = np.lexsort((dishes, orders))
+        orders, dishes = orders[order], dishes[order]
+        orders_with_dish += np.bincount(dishes, minlength=width)
+        left, right = basket_pairs(orders, dishes)
+        pairs.add(dishes[left] * width + dishes[right], np.ones(len(left)))
+
+    keys, together = pairs.result()
+    first, second = keys // width, keys % width
+    return first, second, together / np.sqrt(orders_with_dish[first] * orders_with_dish[second])
+
+
+# Mijoz x restoran
+
+def customer_affinity(low, high, width):
+    """[low, high) oraliqdagi mijozlar uchun (mijoz, restoran, yaqinlik), mijoz bo'yicha tartiblangan"""
+    scope = {'customer_id__gte': low, 'customer_id__lt': high, 'restaurant_id__lt': width}
+    orders = Order.objects.filter(**scope).exclude(status__in=EXCLUDED_STATUSES)
+    order_rows = _rows(
+        orders.order_by().values('customer_id', 'restaurant_id').annotate(count=Count('id'))
+        .values_list('customer_id', 'restaurant_id', 'count'), 3,
+    )
+    like_rows = _rows(
+        RestaurantLike.objects.filter(**scope).order_by()
+        .values_list('customer_id', 'restaurant_id').distinct(), 2,
+    )
+    review_rows = _rows(
+        Review.objects.filter(**scope).order_by()
+        .values('customer_id', 'restaurant_id').annotate(rating=Avg('rating'))
+        .values_list('customer_id', 'restaurant_id', 'rating'), 3,
+    )
+    customers = np.concatenate([order_rows[0], like_rows[0], review_rows[0]]).astype(np.int64)
+    restaurants = np.concatenate([order_rows[1], like_rows[1], review_rows[1]]).astype(np.int64)
+    weights = np.concatenate([
+        np.log1p(order_rows[2]),
+        np.full(len(like_rows[0]), settings.RECOMMENDATION_LIKE_WEIGHT),
+        settings.RECOMMENDATION_REVIEW_WEIGHT * (review_rows[2] - 3) / 2,
+    ])
+    keys, inverse = np.unique(customers * width + restaurants, return_inverse=True)
+    # Yomon sharh yaqinlikni nolgacha tushiradi: restoran o'xshashlikka hissa qo'shmaydi,
+    # lekin mijoz uni tanlagan hisoblanadi va unga qayta tavsiya qilinmaydi
+    weights = np.maximum(np.bincount(inverse, weights=weights), 0)
+    return keys // width, keys % width, weights
+
+
+def restaurant_similarity(customer_batches, width, k):
+    """Restoran -> eng o'xshash k ta restoran (CSR: indptr, cols, scores) mijozlar ustidagi kosinus bilan"""
+    norms = np.zeros(width)
+    pairs = PairAccumulator()
+    for low, high in customer_batches:
+        customers, restaurants, weights = customer_affinity(low, high, width)
+        norms += np.bincount(restaurants, weights=weights ** 2, minlength=width)
+        left, right = basket_pairs(customers, restaurants)
+        pairs.add(restaurants[left] * width + restaurants[right], weights[left] * weights[right])
+
+    keys, dot = pairs.result()
+    keys, dot = keys[dot > 0], dot[dot > 0]
+    first, second = keys // width, keys % width
+    neighbours = top_k(first, second, dot / np.sqrt(norms[first] * norms[second]), k)
+
+    indptr = np.zeros(width + 1, dtype=np.int64)
+    for restaurant_id, (cols, _) in neighbours.items():
+        indptr[restaurant_id + 1] = len(cols)
+    indptr = np.cumsum(indptr)
+    cols = np.array([col for restaurant_id in sorted(neighbours) for col in neighbours[restaurant_id][0]], dtype=np.int64)
+    scores = np.array([score for restaurant_id in sorted(neighbours) for score in neighbours[restaurant_id][1]])
+    return indptr, cols, scores
+
+
+def score_customers(customers, restaurants, weights, similarity, width):
+    """Mijoz tanlagan restoranlar qo'shnilari orqali hali tanlanmagan restoranlar bali"""
+    indptr, neighbour_cols, neighbour_scores = similarity
+    counts = indptr[restaurants + 1] - indptr[restaurants]
+    source = np.repeat(np.arange(len(restaurants)), counts)
+    positions = np.repeat(indptr[restaurants], counts) + _ranges(counts)
+
+    candidates = customers[source] * width + neighbour_cols[positions]
+    keys, inverse = np.unique(candidates, return_inverse=True)
+    scores = np.bincount(inverse, weights=weights[source] * neighbour_scores[positions])
+    fresh = ~np.isin(keys, customers * width + restaurants) & (scores > 0)
+    keys, scores = keys[fresh], scores[fresh]
+    return keys // width, keys % width, scores
+
+
+# Yozish
+
+def _save(model, rows, key_field, ids_field, built_at):
+    objects = [
+        model(**{key_field: key, ids_field: ids, 'scores': scores, 'built_at': built_at})
+        for key, (ids, scores) in rows.items()
+    ]
+    model.objects.bulk_create(
+        objects, batch_size=settings.BULK_WRITE_BATCH_SIZE,
+        update_conflicts=True, unique_fields=['pk'], update_fields=[ids_field, 'scores', 'built_at'],
+    )
+    return len(objects)
+
+
+def build_dish_recommendations(k=None, built_at=None):
+    k = k or settings.RECOMMENDATION_TOP_K
+    built_at = built_at or timezone.now()
+    first, second, scores = dish_cooccurrence()
+    saved = _save(DishRecommendation, top_k(first, second, scores, k), 'dish_id', 'dish_ids', built_at)
+    DishRecommendation.objects.filter(built_at__lt=built_at).delete()
+    return saved
+
+
+def build_customer_recommendations(k=None, built_at=None):
+    k = k or settings.RECOMMENDATION_TOP_K
+    built_at = built_at or timezone.now()
+    width = (Restaurant.objects.aggregate(high=Max('id'))['high'] or 0) + 1
+    batches = list(_id_batches(Customer.objects.all(), 'id'))
+    similarity = restaurant_similarity(batches, width, k)
+
+    saved = 0
+    for low, high in batches:
+        customers, restaurants, weights = customer_affinity(low, high, width)
+        rows = top_k(*score_customers(customers, restaurants, weights, similarity, width), k)
+        saved += _save(CustomerRecommendation, rows, 'customer_id', 'restaurant_ids', built_at)
+    CustomerRecommendation.objects.filter(built_at__lt=built_at).delete()
+    return saved
+
+
+def build_all(k=None):
+    built_at = timezone.now()
+    return {
+        'dishes': build_dish_recommendations(k, built_at),
+        'customers': build_customer_recommendations(k, built_at),
+    }
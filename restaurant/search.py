@@ -0,0 +1,101 @@
+"""
+PostgreSQL to'liq matnli qidiruvi (SearchVectorField + GIN) va pg_trgm o'xshashligi.
+
+FullTextSearchFilter — filters.SearchFilter o'rniga filter_backends ga qo'yiladi.
+View atributlari:
+    search_vector_fields  — tsvector ustunlari (masalan 'restaurant__search_vector')
+    search_trigram_fields — xatolarga chidamli qidiruv uchun matn ustunlari
+pg_trgm o'rnatilmagan bo'lsa, trigram ustunlari bo'yicha icontains ishlatiladi.
+"""
+import re
+from functools import reduce
+from operator import add, or_
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast, Coalesce, Greatest
+from rest_framework import filters
+
+_trigram_available = None
+
+
+def restaurant_vector():
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector('name', weight='A', config=config)
+        + SearchVector('description', weight='B', config=config)
+        + SearchVector('address', weight='C', config=config)
+        + SearchVector('phone', weight='D', config=config)
+    )
+
+
+def dish_vector():
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector('name', weight='A', config=config)
+        + SearchVector('category', weight='B', config=config)
+        + SearchVector('description', weight='C', config=config)
+    )
+
+
+def update_search_vectors(model, pks=None):
+    """Berilgan (yoki barcha) qatorlarning search_vector ustunini bitta UPDATE bilan yangilaydi"""
+    from .models import Restaurant, Dish
+
+    vector = {Restaurant: restaurant_vector, Dish: dish_vector}[model]()
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(search_vector=vector)
+
+
+def trigram_available():
+    global _trigram_available
+    if _trigram_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available = cursor.fetchone() is not None
+    return _trigram_available
+
+
+def build_query(terms):
+    """Har bir so'zni prefiks sifatida qidiradi: 'sus pla' -> 'sus:* & pla:*'"""
+    tokens = [token for term in terms for token in re.findall(r'\w+', term)]
+    if not tokens:
+        return None
+    raw = ' & '.join(f'{token}:*' for token in tokens)
+    return SearchQuery(raw, search_type='raw', config=settings.SEARCH_CONFIG)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+
+    def filter_queryset(self, request, queryset, view):
+        vector_fields = getattr(view, 'search_vector_fields', None)
+        terms = self.get_search_terms(request)
+        if not vector_fields or not terms:
+            return super().filter_queryset(request, queryset, view)
+
+        query = build_query(terms)
+        if query is None:
+            return queryset
+
+        condition = reduce(or_, (Q(**{field: query}) for field in vector_fields))
+        ranks = [Coalesce(SearchRank(F(field), query), Value(0.0)) for field in vector_fields]
+
+        trigram_fields = getattr(view, 'search_trigram_fields', ())
+        if trigram_fields and trigram_available():
+            text = ' '.join(terms)
+            condition |= reduce(or_, (Q(**{f'{field}__trigram_similar': text}) for field in trigram_fields))
+            ranks.append(Greatest(
+                *(TrigramSimilarity(field, text) for field in trigram_fields), Value(0.0),
+                output_field=FloatField(),
+            ))
+        elif trigram_fields:
+            condition |= reduce(or_, (
+                Q(**{f'{field}__icontains': term}) for field in trigram_fields for term in terms
+            ))
+
+        # ts_rank real qaytaradi; double precision ga o'tkazilgan qiymat kursor pozitsiyasida aniq
+        # qaytadi (KeysetPagination search_rank bo'yicha sahifalaydi)
+        rank = Cast(reduce(add, ranks), FloatField())
+        return queryset.annotate(search_rank=rank).filter(condition).order_by('-search_rank')
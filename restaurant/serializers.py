@@ -1,10 +1,42 @@
+from django.db import transaction
+from django.db.models import F, Prefetch, prefetch_related_objects
 from rest_framework import serializers
 from .models import (
     Restaurant, Menu, Dish,
     Customer, Driver, Order, OrderItem,
-    Payment, Delivery, Review
+    Payment, Delivery, Review, DailyRestaurantStats,
 )
-
+from . import bulk, kitchen
+from .mixins import SparseFieldsMixin
+from .transitions import can_transition, transition_orders, transition_deliveries, ORDER_FOR_DELIVERY
+from .trending import index as trending_index
+
+
+
+def validate_transition(model, current, target):
+    if not can_transition(model, current, target):
+        raise serializers.ValidationError(f"'{current}' holatidan '{target}' holatiga o'tib bo'lmaydi.")
+
+
+def update_with_transition(instance, validated_data, transition_function):
+    """
+    Oddiy maydonlar o'zgargan ustunlar bilan saqlanadi, status esa transitions.py orqali
+    o'tkaziladi: bog'langan buyurtma/yetkazish, oshxona yuklamasi va haydovchi bandligi
+    /transition/ amalidagidek yangilanadi.
+    """
+    target = validated_data.pop('status', instance.status)
+    with transaction.atomic():
+        if validated_data:
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save(update_fields=[*validated_data, 'updated_at'])
+        if target != instance.status:
+            if not transition_function([instance.pk], target):
+                raise serializers.ValidationError(
+                    {'status': f"'{instance.status}' holatidan '{target}' holatiga o'tib bo'lmaydi."}
+                )
+            instance.refresh_from_db(fields=['status', 'updated_at'])
+    return instance
 
 
 class ReviewMiniSerializer(serializers.ModelSerializer):
@@ -19,34 +51,35 @@ class ReviewMiniSerializer(serializers.ModelSerializer):
         return obj.customer.full_name if obj.customer else None
 
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     reviews = ReviewMiniSerializer(many=True, read_only=True)
-    average_rating = serializers.SerializerMethodField()
+    average_rating = serializers.FloatField(read_only=True)
     likes_data = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Restaurant
-        fields = ['id','name','description','address','phone','email','is_active','created_at','updated_at','average_rating','likes_data','comments_count','reviews',]
+        fields = [
+            'id','name','description','address','phone','email','is_active','created_at','updated_at','average_rating','likes_data','comments_count','reviews',
+            'kitchen_load_minutes', 'kitchen_capacity_minutes',
+        ]
+        read_only_fields = ['comments_count']
         depth = 1
 
-    def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews.exists():
-            return round(sum(r.rating for r in reviews) / reviews.count(), 2)
-        return None
-
     def get_likes_data(self, instance):
-        likes = instance.likes.count()
+        likes = instance.likes_count
         dislikes = 0
         return {'likes': likes, 'dislikes': dislikes}
 
-    def get_comments_count(self, instance):
-        return instance.comments.count()
 
+class RestaurantNestedSerializer(RestaurantSerializer):
+    """Boshqa javoblar ichida (menyu va taomlar keshlanadi): tez o'zgaruvchi oshxona yuklamasisiz"""
+
+    class Meta(RestaurantSerializer.Meta):
+        fields = [field for field in RestaurantSerializer.Meta.fields if not field.startswith('kitchen_')]
 
-class MenuSerializer(serializers.ModelSerializer):
-    restaurant = RestaurantSerializer(read_only=True)
+
+class MenuSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    restaurant = RestaurantNestedSerializer(read_only=True)
     restaurant_id = serializers.PrimaryKeyRelatedField(
         source="restaurant", queryset=Restaurant.objects.all(), write_only=True
     )
@@ -56,7 +89,7 @@ class MenuSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class DishSerializer(serializers.ModelSerializer):
+class DishSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     menu = MenuSerializer(read_only=True)
     menu_id = serializers.PrimaryKeyRelatedField(
         source="menu", queryset=Menu.objects.all(), write_only=True
@@ -70,7 +103,7 @@ class DishSerializer(serializers.ModelSerializer):
         ]
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_full_name = serializers.SerializerMethodField()
 
     class Meta:
@@ -86,34 +119,40 @@ class CustomerSerializer(serializers.ModelSerializer):
         return None
 
 
-class DriverSerializer(serializers.ModelSerializer):
+class DriverSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Driver
         fields = '__all__'
+        # Reyting sharhlardan hisoblanadi (restaurant/ratings.py)
+        read_only_fields = ['rating', 'rating_sum', 'rating_count', 'rating_decay_sum', 'rating_decay_weight']
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     dish = DishSerializer(read_only=True)
     dish_id = serializers.PrimaryKeyRelatedField(
         source="dish", queryset=Dish.objects.all(), write_only=True
     )
-    total_price = serializers.SerializerMethodField()
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
         model = OrderItem
         fields = '__all__'
+        extra_kwargs = {'unit_price': {'required': False}}
 
-    def get_total_price(self, obj):
-        return obj.quantity * obj.dish.price if obj.dish else 0
+    def validate(self, attrs):
+        # Narx berilmasa, buyurtma paytidagi taom narxi saqlab qo'yiladi
+        if 'unit_price' not in attrs and self.instance is None:
+            attrs['unit_price'] = attrs['dish'].price
+        return attrs
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     customer = CustomerSerializer(read_only=True)
     customer_id = serializers.PrimaryKeyRelatedField(
         source="customer", queryset=Customer.objects.all(), write_only=True
     )
-    restaurant = RestaurantSerializer(read_only=True)
+    restaurant = RestaurantNestedSerializer(read_only=True)
     restaurant_id = serializers.PrimaryKeyRelatedField(
         source="restaurant", queryset=Restaurant.objects.all(), write_only=True
     )
@@ -121,19 +160,28 @@ class OrderSerializer(serializers.ModelSerializer):
     driver_id = serializers.PrimaryKeyRelatedField(
         source="driver", queryset=Driver.objects.all(), write_only=True
     )
-    calculated_total = serializers.SerializerMethodField()
+    calculated_total = serializers.DecimalField(
+        source='total_amount', max_digits=10, decimal_places=2, read_only=True
+    )
 
     class Meta:
         model = Order
         fields = '__all__'
+        # Taxminiy vaqt refresh_eta buyrug'i tomonidan yoziladi (restaurant/eta.py)
+        read_only_fields = ['total_amount', 'estimated_delivery_time']
         depth = 1
 
+    def validate_status(self, value):
+        if self.instance is not None and value != self.instance.status:
+            validate_transition(Order, self.instance.status, value)
+        return value
 
-    def get_calculated_total(self, obj):
-        return sum(item.quantity * item.dish.price for item in obj.items.all())
+    def update(self, instance, validated_data):
+        # Faqat o'zgargan ustunlar yoziladi, status transition_orders orqali o'tadi
+        return update_with_transition(instance, validated_data, transition_orders)
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     order = OrderSerializer(read_only=True)
     order_id = serializers.PrimaryKeyRelatedField(
         source="order", queryset=Order.objects.all(), write_only=True
@@ -148,10 +196,11 @@ class PaymentSerializer(serializers.ModelSerializer):
         return obj.get_status_display() if hasattr(obj, 'get_status_display') else obj.status
 
 
-class DeliverySerializer(serializers.ModelSerializer):
+class DeliverySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     driver = DriverSerializer(read_only=True)
+    # Berilmasa, eng yaxshi bo'sh haydovchi avtomatik biriktiriladi (DeliveryViewSet.perform_create)
     driver_id = serializers.PrimaryKeyRelatedField(
-        source="driver", queryset=Driver.objects.all(), write_only=True
+        source="driver", queryset=Driver.objects.all(), write_only=True, required=False, allow_null=True
     )
     order = OrderSerializer(read_only=True)
     order_id = serializers.PrimaryKeyRelatedField(
@@ -161,14 +210,23 @@ class DeliverySerializer(serializers.ModelSerializer):
     class Meta:
         model = Delivery
         fields = '__all__'
+        read_only_fields = ['estimated_time']
 
+    def validate_status(self, value):
+        if self.instance is not None and value != self.instance.status:
+            validate_transition(Delivery, self.instance.status, value)
+        return value
 
-class ReviewSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        return update_with_transition(instance, validated_data, transition_deliveries)
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     customer = CustomerSerializer(read_only=True)
     customer_id = serializers.PrimaryKeyRelatedField(
         source="customer", queryset=Customer.objects.all(), write_only=True
     )
-    restaurant = RestaurantSerializer(read_only=True)
+    restaurant = RestaurantNestedSerializer(read_only=True)
     restaurant_id = serializers.PrimaryKeyRelatedField(
         source="restaurant", queryset=Restaurant.objects.all(), write_only=True
     )
@@ -176,3 +234,299 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
+
+
+
+class RestaurantSummarySerializer(serializers.ModelSerializer):
+    """Compact rejimda restoranni faqat asosiy maydonlari bilan ko‘rsatish uchun"""
+    average_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Restaurant
+        fields = ['id', 'name', 'average_rating']
+
+
+class CustomerSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = ['id', 'full_name']
+
+
+class DriverSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Driver
+        fields = ['id', 'full_name', 'phone']
+
+
+class DishSummarySerializer(serializers.ModelSerializer):
+    menu_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Dish
+        fields = ['id', 'name', 'price', 'menu_id']
+
+
+class OrderItemCompactSerializer(serializers.ModelSerializer):
+    dish_name = serializers.CharField(source='dish.name', read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'dish', 'dish_name', 'quantity', 'unit_price', 'total_price']
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """To‘lov va yetkazib berish ichida buyurtmani id lar bilan ko‘rsatish uchun"""
+
+    class Meta:
+        model = Order
+        fields = ['id', 'status', 'total_amount', 'placed_at', 'customer', 'restaurant', 'driver']
+
+
+class OrderCompactSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    customer = CustomerSummarySerializer(read_only=True)
+    restaurant = RestaurantSummarySerializer(read_only=True)
+    driver = DriverSummarySerializer(read_only=True)
+    items = OrderItemCompactSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'status', 'total_amount', 'delivery_address', 'notes',
+            'placed_at', 'updated_at', 'estimated_delivery_time',
+            'customer', 'restaurant', 'driver', 'items',
+        ]
+
+
+class PaymentCompactSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    order = OrderSummarySerializer(read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = '__all__'
+
+
+class DeliveryCompactSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    driver = DriverSummarySerializer(read_only=True)
+    order = OrderSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Delivery
+        fields = '__all__'
+        read_only_fields = ['estimated_time']
+
+    def validate_status(self, value):
+        if self.instance is not None and value != self.instance.status:
+            validate_transition(Delivery, self.instance.status, value)
+        return value
+
+    def update(self, instance, validated_data):
+        return update_with_transition(instance, validated_data, transition_deliveries)
+
+
+class CheckoutItemSerializer(serializers.Serializer):
+    dish_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class OrderCheckoutSerializer(serializers.ModelSerializer):
+    """Buyurtmani barcha elementlari bilan bitta tranzaksiyada yaratish uchun"""
+    items = CheckoutItemSerializer(many=True, allow_empty=False, write_only=True)
+    customer_id = serializers.PrimaryKeyRelatedField(
+        source="customer", queryset=Customer.objects.all(), write_only=True, required=False
+    )
+    restaurant_id = serializers.PrimaryKeyRelatedField(
+        source="restaurant", queryset=Restaurant.objects.filter(is_active=True), write_only=True
+    )
+
+    class Meta:
+        model = Order
+        fields = ['delivery_address', 'notes', 'customer_id', 'restaurant_id', 'items']
+
+    def validate(self, attrs):
+        request = self.context.get('request')
+        profile = getattr(request.user, 'customer_profile', None) if request else None
+        if profile is not None:
+            attrs['customer'] = profile
+        elif 'customer' not in attrs:
+            raise serializers.ValidationError({'customer_id': "Bu maydon majburiy."})
+        return attrs
+
+    @staticmethod
+    def lock_dishes(restaurant, dish_ids):
+        """
+        Barcha taomlar bitta IN so'rovi bilan tranzaksiya ichida o'qiladi va qulflanadi:
+        narx va mavjudlik buyurtma yozilguncha o'zgarmaydi.
+        """
+        dishes = (
+            Dish.objects.filter(is_available=True, menu__is_active=True, menu__restaurant=restaurant)
+            .order_by('pk').select_for_update(of=('self',)).in_bulk(dish_ids)
+        )
+        missing = sorted(dish_ids - dishes.keys())
+        if missing:
+            raise serializers.ValidationError(
+                {'items': f"Taomlar topilmadi yoki buyurtma qilib bo‘lmaydi: {missing}"}
+            )
+        return dishes
+
+    def create(self, validated_data):
+        items = validated_data.pop('items')
+        with transaction.atomic():
+            dishes = self.lock_dishes(validated_data['restaurant'], {item['dish_id'] for item in items})
+            lines = [
+                OrderItem(
+                    dish=dishes[item['dish_id']],
+                    quantity=item['quantity'],
+                    unit_price=dishes[item['dish_id']].price,
+                )
+                for item in items
+            ]
+            minutes = kitchen.order_minutes(lines)
+            # Oshxona navbatiga joy bo'lmasa 429 (Retry-After) — buyurtma yaratilmaydi
+            kitchen.admit(validated_data['restaurant'].pk, minutes)
+            order = Order.objects.create(
+                total_amount=sum(line.total_price for line in lines), kitchen_minutes=minutes, **validated_data
+            )
+            for line in lines:
+                line.order = order
+            OrderItem.objects.bulk_create(lines)
+            # bulk_create signal yubormaydi, trend hisoblagichini o'zimiz to'ldiramiz
+            if trending_index.is_loaded():
+                transaction.on_commit(
+                    lambda: trending_index.dishes_ordered([(line.dish_id, line.quantity) for line in lines])
+                )
+        return order
+
+    def to_representation(self, instance):
+        prefetch_related_objects(
+            [instance], Prefetch('items', queryset=OrderItem.objects.select_related('dish'))
+        )
+        return OrderCompactSerializer(instance, context=self.context).data
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+
+class OrderBulkTransitionSerializer(OrderTransitionSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+
+
+class DeliveryTransitionSerializer(serializers.Serializer):
+    # 'assigned' boshlang'ich holat, unga qaytib bo'lmaydi; 'cancelled' faqat buyurtma bilan birga
+    status = serializers.ChoiceField(
+        choices=[choice for choice in Delivery.STATUS_CHOICES if choice[0] in ORDER_FOR_DELIVERY]
+    )
+
+
+class DeliveryBulkTransitionSerializer(DeliveryTransitionSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Ommaviy yozish: context['bulk_mode'] — 'create', 'upsert' yoki 'update' (bulk.MODES).
+    Mavjud qatorlar va ota obyektlar (menyu/restoran) qator soniga qaramay ikki so'rov
+    bilan tekshiriladi. Bola serializer atributlari:
+        bulk_parent_field  — ota id maydoni ('menu_id')
+        bulk_parent_model  — ota model, bulk_parent_owner — otadan restoran id si
+        bulk_owner_lookup  — qatordan restoran id sigacha yo'l ('menu__restaurant_id')
+        bulk_search_fields — o'zgarsa qidiruv vektori yangilanadigan maydonlar
+    """
+
+    def to_internal_value(self, data):
+        # validate() xatolari non_field_errors ga o'raladi, qatorma-qator xatolar shu yerda beriladi
+        rows = super().to_internal_value(data)
+        mode = self.context['bulk_mode']
+        child = self.child
+        model = child.Meta.model
+        errors = [{} for _ in rows]
+
+        ids = [row.get('id') for row in rows]
+        seen = set()
+        for error, pk in zip(errors, ids):
+            if pk is None and mode == 'update':
+                error['id'] = ["Bu maydon majburiy."]
+            elif pk is not None and mode == 'create':
+                error['id'] = ["Yaratishda id berilmaydi, PUT (upsert) yoki PATCH ishlating."]
+            elif pk is not None and pk in seen:
+                error['id'] = ["Bir so'rovda takrorlangan id."]
+            seen.add(pk)
+
+        existing = model.objects.annotate(bulk_owner=F(child.bulk_owner_lookup)).in_bulk(
+            {pk for pk in ids if pk is not None}
+        )
+        parent_ids = {row[child.bulk_parent_field] for row in rows if child.bulk_parent_field in row}
+        parents = dict(
+            child.bulk_parent_model.objects.filter(pk__in=parent_ids)
+            .values_list('pk', child.bulk_parent_owner)
+        )
+        for error, row, pk in zip(errors, rows, ids):
+            if pk is not None and pk not in existing and 'id' not in error:
+                error['id'] = [f"{pk} id li obyekt topilmadi."]
+            parent = row.get(child.bulk_parent_field)
+            if parent is not None and parent not in parents:
+                error[child.bulk_parent_field] = [f"{parent} id li obyekt topilmadi."]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        self.existing = existing
+        self.restaurant_ids = {obj.bulk_owner for obj in existing.values()} | set(parents.values())
+        return rows
+
+    def save(self):
+        child = self.child
+        self.created, self.updated = bulk.write(
+            child.Meta.model, self.context['bulk_mode'], self.validated_data,
+            self.existing, self.restaurant_ids, child.bulk_search_fields,
+        )
+        return self.created, self.updated
+
+    @property
+    def data(self):
+        # Daraxt qayta serializatsiya qilinmaydi, faqat id lar qaytadi
+        return {'created': self.created, 'updated': self.updated}
+
+
+class MenuBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(min_value=1, required=False)
+    restaurant_id = serializers.IntegerField(min_value=1)
+
+    bulk_parent_field = 'restaurant_id'
+    bulk_parent_model = Restaurant
+    bulk_parent_owner = 'pk'
+    bulk_owner_lookup = 'restaurant_id'
+    bulk_search_fields = ()
+
+    class Meta:
+        model = Menu
+        fields = ['id', 'name', 'description', 'is_active', 'restaurant_id']
+        list_serializer_class = BulkListSerializer
+
+
+class DishBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(min_value=1, required=False)
+    menu_id = serializers.IntegerField(min_value=1)
+
+    bulk_parent_field = 'menu_id'
+    bulk_parent_model = Menu
+    bulk_parent_owner = 'restaurant_id'
+    bulk_owner_lookup = 'menu__restaurant_id'
+    bulk_search_fields = ('name', 'category', 'description')
+
+    class Meta:
+        model = Dish
+        fields = ['id', 'name', 'description', 'category', 'price', 'is_available', 'prep_time_minutes', 'menu_id']
+        list_serializer_class = BulkListSerializer
+
+
+class DailyRestaurantStatsSerializer(serializers.ModelSerializer):
+    average_basket = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = DailyRestaurantStats
+        fields = [
+            'restaurant', 'day', 'orders_count', 'cancelled_count', 'items_count',
+            'revenue', 'paid_amount', 'average_basket',
+        ]
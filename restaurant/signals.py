@@ -0,0 +1,294 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache as response_cache
+from . import kitchen
+from . import ratings
+from .availability import index as availability_index
+from .trending import index as trending_index
+from .dispatch import ACTIVE_DELIVERY_STATUSES
+from .search import update_search_vectors
+from .models import (
+    Restaurant, RestaurantLike, RestaurantComment, Menu, Dish, Review, Order, OrderItem, Driver, Delivery,
+    StaleDailyStats,
+)
+
+
+def _change_restaurant_counters(restaurant_id, **deltas):
+    """
+    Restoran hisoblagichlarini F() orqali bitta UPDATE bilan o'zgartiradi.
+    updated_at ham yangilanadi: sharh va layklar restoran javobining bir qismi (ETag).
+    Hisoblagich 0 dan pastga tushmaydi (kitchen.change_load kabi): yig'indi 0 ga tushib
+    qolgan bo'lsa, PositiveIntegerField cheklovi UPDATE ni IntegrityError bilan to'xtatardi.
+    """
+    if restaurant_id is None:
+        return
+    changes = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items() if delta}
+    Restaurant.objects.filter(pk=restaurant_id).update(updated_at=timezone.now(), **changes)
+
+
+@receiver(post_save, sender=RestaurantLike)
+def restaurant_like_created(sender, instance, created, **kwargs):
+    if created:
+        _change_restaurant_counters(instance.restaurant_id, likes_count=1)
+        if trending_index.is_loaded():
+            transaction.on_commit(lambda: trending_index.restaurant_liked(instance.restaurant_id))
+
+
+@receiver(post_delete, sender=RestaurantLike)
+def restaurant_like_deleted(sender, instance, **kwargs):
+    _change_restaurant_counters(instance.restaurant_id, likes_count=-1)
+
+
+@receiver(post_save, sender=RestaurantComment)
+def restaurant_comment_created(sender, instance, created, **kwargs):
+    if created:
+        _change_restaurant_counters(instance.restaurant_id, comments_count=1)
+
+
+@receiver(post_delete, sender=RestaurantComment)
+def restaurant_comment_deleted(sender, instance, **kwargs):
+    _change_restaurant_counters(instance.restaurant_id, comments_count=-1)
+
+
+@receiver(pre_save, sender=Review)
+def review_remember_previous(sender, instance, **kwargs):
+    # Tahrirlashda eski baho, restoran va haydovchini eslab qolamiz
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = (
+            sender.objects.filter(pk=instance.pk)
+            .values('rating', 'restaurant_id', 'driver_id', 'created_at').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    _review_driver_saved(instance, previous)
+    if previous and previous['restaurant_id'] == instance.restaurant_id:
+        _change_restaurant_counters(instance.restaurant_id, rating_sum=instance.rating - previous['rating'])
+        return
+    if previous:
+        _change_restaurant_counters(
+            previous['restaurant_id'], rating_sum=-previous['rating'], rating_count=-1
+        )
+    _change_restaurant_counters(instance.restaurant_id, rating_sum=instance.rating, rating_count=1)
+
+
+def _review_driver_saved(instance, previous):
+    if previous and (previous['driver_id'], previous['rating']) == (instance.driver_id, instance.rating):
+        return
+    if previous:
+        ratings.change_driver_rating(previous['driver_id'], previous['rating'], previous['created_at'], -1)
+    ratings.change_driver_rating(instance.driver_id, instance.rating, instance.created_at, 1)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    _change_restaurant_counters(instance.restaurant_id, rating_sum=-instance.rating, rating_count=-1)
+    ratings.change_driver_rating(instance.driver_id, instance.rating, instance.created_at, -1)
+
+
+def _change_order(order_id, total=0, minutes=0):
+    """
+    Buyurtma summasi va oshxona ishini bitta UPDATE bilan o'zgartiradi. updated_at har qanday
+    element o'zgarishida oshadi (summasi bir xil boshqa taom ham DailyDishStats ni o'zgartiradi).
+    """
+    if order_id is None:
+        return
+    changes = {}
+    if total:
+        changes['total_amount'] = F('total_amount') + total
+    if minutes:
+        changes['kitchen_minutes'] = Greatest(F('kitchen_minutes') + minutes, 0)
+    Order.objects.filter(pk=order_id).update(updated_at=timezone.now(), **changes)
+    kitchen.change_order_load(order_id, minutes)
+
+
+@receiver(pre_save, sender=OrderItem)
+def order_item_remember_previous(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = (
+            sender.objects.filter(pk=instance.pk)
+            .values('order_id', 'quantity', 'unit_price', 'dish_id', 'dish__prep_time_minutes').first()
+        )
+
+
+@receiver(post_save, sender=OrderItem)
+def order_item_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    minutes = instance.dish.prep_time_minutes * instance.quantity
+    if created and trending_index.is_loaded():
+        transaction.on_commit(lambda: trending_index.dishes_ordered([(instance.dish_id, instance.quantity)]))
+    if previous:
+        previous_total = previous['quantity'] * previous['unit_price']
+        previous_minutes = previous['dish__prep_time_minutes'] * previous['quantity']
+    if previous and previous['order_id'] == instance.order_id:
+        _change_order(instance.order_id, instance.total_price - previous_total, minutes - previous_minutes)
+        return
+    if previous:
+        _change_order(previous['order_id'], -previous_total, -previous_minutes)
+    _change_order(instance.order_id, instance.total_price, minutes)
+
+
+@receiver(post_delete, sender=OrderItem)
+def order_item_deleted(sender, instance, **kwargs):
+    _change_order(instance.order_id, -instance.total_price, -instance.dish.prep_time_minutes * instance.quantity)
+
+
+@receiver(pre_save, sender=Order)
+def order_remember_previous(sender, instance, update_fields=None, **kwargs):
+    # Holat yoki restoran o'zgarsa oshxona yuklamasi, restoran yoki kun o'zgarsa kunlik statistika ko'chiriladi
+    instance._previous = None
+    if instance.pk is None or (
+        update_fields is not None and not {'status', 'restaurant', 'placed_at'} & set(update_fields)
+    ):
+        return
+    instance._previous = (
+        sender.objects.filter(pk=instance.pk).values('status', 'restaurant_id', 'kitchen_minutes', 'placed_at').first()
+    )
+
+
+@receiver(post_save, sender=Order)
+def order_kitchen_load(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if not previous:
+        return
+    was, now = kitchen.in_kitchen(previous['status']), kitchen.in_kitchen(instance.status)
+    if previous['restaurant_id'] == instance.restaurant_id and was == now:
+        return
+    minutes = previous['kitchen_minutes']
+    if was:
+        kitchen.change_load(previous['restaurant_id'], -minutes)
+    if now:
+        kitchen.change_load(instance.restaurant_id, minutes)
+
+
+@receiver(post_save, sender=Order)
+def order_daily_stats_moved(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if not previous:
+        return
+    day = timezone.localdate(previous['placed_at'])
+    if previous['restaurant_id'] != instance.restaurant_id or day != timezone.localdate(instance.placed_at):
+        StaleDailyStats.objects.bulk_create(
+            [StaleDailyStats(restaurant_id=previous['restaurant_id'], day=day)], ignore_conflicts=True,
+        )
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def restaurant_changed(sender, instance, **kwargs):
+    response_cache.invalidate_restaurant(instance.pk)
+
+
+@receiver(pre_save, sender=Menu)
+def menu_remember_previous(sender, instance, **kwargs):
+    # Menyu boshqa restoranga ko'chirilsa eski restoran keshi ham eskiradi
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = sender.objects.filter(pk=instance.pk).values('restaurant_id').first()
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+def menu_changed(sender, instance, **kwargs):
+    response_cache.invalidate_restaurant(instance.restaurant_id, 'menu', instance.pk)
+    _invalidate_previous_owner(getattr(instance, '_previous', None), instance.restaurant_id)
+
+
+@receiver(pre_save, sender=Dish)
+def dish_remember_previous(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = (
+            sender.objects.filter(pk=instance.pk).values(restaurant_id=F('menu__restaurant_id')).first()
+        )
+
+
+@receiver(post_save, sender=Dish)
+@receiver(post_delete, sender=Dish)
+def dish_changed(sender, instance, **kwargs):
+    restaurant_id = Menu.objects.filter(pk=instance.menu_id).values_list('restaurant_id', flat=True).first()
+    response_cache.invalidate_restaurant(restaurant_id, 'dish', instance.pk)
+    _invalidate_previous_owner(getattr(instance, '_previous', None), restaurant_id)
+
+
+def _invalidate_previous_owner(previous, restaurant_id):
+    if previous and previous['restaurant_id'] != restaurant_id:
+        response_cache.invalidate_restaurant(previous['restaurant_id'])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    # Sharhlar menyu va taom javoblari ichidagi restoran ma'lumotida ko'rinadi
+    response_cache.invalidate_restaurant(instance.restaurant_id)
+
+
+def _search_fields_changed(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_search_vector(sender, instance, update_fields=None, **kwargs):
+    if _search_fields_changed(update_fields, {'name', 'description', 'address', 'phone'}):
+        update_search_vectors(Restaurant, [instance.pk])
+
+
+@receiver(post_save, sender=Dish)
+def dish_search_vector(sender, instance, update_fields=None, **kwargs):
+    if _search_fields_changed(update_fields, {'name', 'description', 'category'}):
+        update_search_vectors(Dish, [instance.pk])
+
+
+@receiver(post_save, sender=Driver)
+def driver_availability_changed(sender, instance, **kwargs):
+    if not availability_index.is_loaded():
+        return
+    # Reyting save() da yozilmaydi (DERIVED_FIELDS) — indeksga bazadagi qiymat o'qiladi
+    driver_id = instance.pk
+    transaction.on_commit(lambda: ratings.refresh_index([driver_id]))
+
+
+@receiver(post_delete, sender=Driver)
+def driver_deleted(sender, instance, **kwargs):
+    driver_id = instance.pk
+    transaction.on_commit(lambda: availability_index.remove_driver(driver_id))
+
+
+@receiver(pre_save, sender=Delivery)
+def delivery_remember_previous(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = sender.objects.filter(pk=instance.pk).values('driver_id', 'status').first()
+
+
+def _active_driver(driver_id, status):
+    return driver_id if driver_id is not None and status in ACTIVE_DELIVERY_STATUSES else None
+
+
+@receiver(post_save, sender=Delivery)
+def delivery_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    was = _active_driver(previous['driver_id'], previous['status']) if previous else None
+    now = _active_driver(instance.driver_id, instance.status)
+    if was == now:
+        return
+    if was is not None:
+        transaction.on_commit(lambda: availability_index.delivery_finished(was))
+    if now is not None:
+        transaction.on_commit(lambda: availability_index.delivery_started(now))
+
+
+@receiver(post_delete, sender=Delivery)
+def delivery_deleted(sender, instance, **kwargs):
+    driver_id = _active_driver(instance.driver_id, instance.status)
+    if driver_id is not None:
+        transaction.on_commit(lambda: availability_index.delivery_finished(driver_id))
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.analytics import refresh_daily_stats
+from restaurant.models import (
+    Restaurant, Menu, Dish, Customer, Order, OrderItem, Payment, DailyRestaurantStats, DailyDishStats,
+)
+
+DAY_ONE = datetime(2024, 5, 1, 12, 0, tzinfo=dt_timezone.utc)
+DAY_TWO = DAY_ONE + timedelta(days=1)
+
+
+@override_settings(DAILY_STATS_OVERLAP_SECONDS=0)
+class DailyStatsTestCase(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        menu = Menu.objects.create(name="Lunch Menu", restaurant=self.restaurant)
+        self.burger = Dish.objects.create(name="Burger", price=Decimal('5.00'), menu=menu)
+        self.fries = Dish.objects.create(name="Fries", price=Decimal('2.00'), menu=menu)
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+
+        self.first = self.create_order(DAY_ONE, burgers=2, fries=1)
+        self.second = self.create_order(DAY_ONE, burgers=1)
+        self.third = self.create_order(DAY_TWO, fries=3)
+        Payment.objects.create(order=self.first, amount=Decimal('12.00'), method='card', status='paid')
+        # Hammasi oxirgi ishga tushirishdan oldin o'zgargandek
+        Order.objects.update(updated_at=DAY_TWO)
+        Payment.objects.update(updated_at=DAY_TWO)
+
+    def create_order(self, placed_at, burgers=0, fries=0):
+        order = Order.objects.create(delivery_address="Chilonzor 5", customer=self.customer, restaurant=self.restaurant)
+        if burgers:
+            OrderItem.objects.create(order=order, dish=self.burger, quantity=burgers, unit_price=self.burger.price)
+        if fries:
+            OrderItem.objects.create(order=order, dish=self.fries, quantity=fries, unit_price=self.fries.price)
+        Order.objects.filter(pk=order.pk).update(placed_at=placed_at)
+        return order
+
+    def test_rollup_values(self):
+        self.assertEqual(refresh_daily_stats(), 2)
+        day_one = DailyRestaurantStats.objects.get(day=DAY_ONE.date())
+        self.assertEqual((day_one.orders_count, day_one.items_count), (2, 4))
+        self.assertEqual(day_one.revenue, Decimal('17.00'))
+        self.assertEqual(day_one.paid_amount, Decimal('12.00'))
+        self.assertEqual(day_one.average_basket, Decimal('8.50'))
+        self.assertEqual(DailyDishStats.objects.get(day=DAY_TWO.date(), dish=self.fries).quantity, 3)
+        print("✅ Kunlik statistika:", day_one.orders_count, day_one.revenue, day_one.average_basket)
+
+    def test_incremental_refresh_only_touches_changed_days(self):
+        refresh_daily_stats()
+        untouched = DailyRestaurantStats.objects.get(day=DAY_TWO.date())
+
+        self.second.refresh_from_db()
+        self.second.status = 'cancelled'
+        self.second.save()
+        self.assertEqual(refresh_daily_stats(), 1)
+
+        day_one = DailyRestaurantStats.objects.get(day=DAY_ONE.date())
+        self.assertEqual((day_one.orders_count, day_one.cancelled_count), (2, 1))
+        self.assertEqual(day_one.revenue, Decimal('12.00'))
+        self.assertEqual(DailyRestaurantStats.objects.get(day=DAY_TWO.date()).pk, untouched.pk)
+        self.assertEqual(refresh_daily_stats(), 0)
+
+    def test_incremental_refresh_follows_moved_orders_and_items(self):
+        refresh_daily_stats()
+        other = Restaurant.objects.create(
+            name="Sushi Place", address="456 Side St", phone="998909998877", email="sushi@example.com",
+        )
+        # Buyurtma boshqa restoranga ko'chdi: eski (restoran, kun) ham qayta hisoblanadi
+        self.third.refresh_from_db()
+        self.third.restaurant = other
+        self.third.save()
+        self.assertEqual(refresh_daily_stats(), 1)
+        self.assertFalse(DailyRestaurantStats.objects.filter(restaurant=self.restaurant, day=DAY_TWO.date()).exists())
+        self.assertEqual(DailyRestaurantStats.objects.get(restaurant=other, day=DAY_TWO.date()).orders_count, 1)
+
+        # Kun o'zgarishi ham eski kunni qayta hisoblaydi
+        self.second.refresh_from_db()
+        self.second.placed_at = DAY_TWO
+        self.second.save()
+        self.assertEqual(refresh_daily_stats(), 2)
+        day_one = DailyRestaurantStats.objects.get(restaurant=self.restaurant, day=DAY_ONE.date())
+        self.assertEqual((day_one.orders_count, day_one.items_count), (1, 3))
+        self.assertEqual(DailyRestaurantStats.objects.get(restaurant=self.restaurant, day=DAY_TWO.date()).orders_count, 1)
+
+        # Summasi o'zgarmagan taom almashtirish ham DailyDishStats ga yetib boradi
+        same_price = Dish.objects.create(name="Cola", price=Decimal('2.00'), menu=self.fries.menu)
+        item = OrderItem.objects.get(order=self.first, dish=self.fries)
+        item.dish = same_price
+        item.save()
+        refresh_daily_stats()
+        self.assertEqual(DailyDishStats.objects.get(day=DAY_ONE.date(), dish=same_price).quantity, 1)
+        self.assertFalse(DailyDishStats.objects.filter(day=DAY_ONE.date(), dish=self.fries).exists())
+        print("✅ Ko'chgan buyurtma va almashtirilgan taom kunlik statistikada yangilandi")
+
+    def test_analytics_endpoint_reads_rollup(self):
+        call_command('refresh_daily_stats', stdout=StringIO())
+        params = {'restaurant': self.restaurant.id, 'day__gte': '2024-05-01', 'day__lte': '2024-05-31'}
+
+        response = self.client.get(reverse('dailyrestaurantstats-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['day'] for row in response.data], ['2024-05-02', '2024-05-01'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dailyrestaurantstats-summary'), params)
+        self.assertEqual(response.data['orders_count'], 3)
+        self.assertEqual(response.data['revenue'], Decimal('23.00'))
+        self.assertEqual(response.data['top_dishes'][0]['dish__name'], 'Fries')
+        self.assertFalse([q for q in queries if '"restaurant_order"' in q['sql']])
+        print("✅ Analitika:", response.data)
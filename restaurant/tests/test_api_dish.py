@@ -1,6 +1,9 @@
+from django.contrib.auth.models import User
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from restaurant.models import Restaurant, Menu, Dish
 from restaurant.serializers import DishSerializer
 
@@ -71,3 +74,246 @@ class DishAPITestCase(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['name'], 'Fries')
         print("✅ SearchFilter ishladi. Natija:", response.data)
+
+    def test_5_sparse_fields(self):
+        url = reverse('dish-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,name,price'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'name', 'price'})
+        # ETag tekshiruvi + taomlar ro'yxati
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('restaurant_menu', queries[1]['sql'])
+        print("✅ Faqat so'ralgan maydonlar qaytdi:", response.data)
+
+    def test_6_expand_nested_relation(self):
+        url = reverse('dish-list')
+        response = self.client.get(url, {'fields': 'id,menu'})
+        self.assertEqual(response.data[0]['menu'], self.menu.id)
+
+        response = self.client.get(url, {'fields': 'id,menu', 'expand': 'menu'})
+        self.assertEqual(response.data[0]['menu']['name'], "Lunch Menu")
+        self.assertEqual(response.data[0]['menu']['restaurant']['name'], "FastFood King")
+        print("✅ expand orqali menyu to'liq qaytdi:", response.data)
+
+    def cache_stats(self):
+        return self.client.get(reverse('metrics')).data['counters'].get('response_cache', {})
+
+    def test_7_list_and_detail_are_cached(self):
+        self.admin_client()
+        before = self.cache_stats()
+        url = reverse('dish-list')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(response.data), 2)
+
+        detail_url = reverse('dish-detail', args=[self.dish1.id])
+        self.assertEqual(self.client.get(detail_url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(detail_url)['X-Cache'], 'HIT')
+
+        # Hit/miss hisoblagichlari /metrics/ orqali ko'rinadi
+        after = self.cache_stats()
+        self.assertEqual(after.get('hits', 0) - before.get('hits', 0), 2)
+        self.assertEqual(after.get('misses', 0) - before.get('misses', 0), 2)
+        print("✅ Taomlar keshdan olindi:", after)
+
+    def test_8_cache_is_invalidated_by_changes(self):
+        url = reverse('dish-list')
+        detail_url = reverse('dish-detail', args=[self.dish1.id])
+        self.client.get(url)
+        self.client.get(detail_url)
+
+        self.dish1.price = 6.49
+        self.dish1.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(next(d for d in response.data if d['id'] == self.dish1.id)['price'], '6.49')
+        response = self.client.get(detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['price'], '6.49')
+
+    def test_9_other_restaurants_keep_their_cache(self):
+        url = reverse('dish-list')
+        params = {'menu__restaurant': self.restaurant.id}
+        self.client.get(url, params)
+
+        other = Restaurant.objects.create(
+            name="Osh Markazi", address="Beshyog'och", phone="998935556677", email="osh@example.com",
+        )
+        Dish.objects.create(name="Osh", price=4.5, menu=Menu.objects.create(name="Asosiy", restaurant=other))
+
+        self.assertEqual(self.client.get(url, params)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+    def test_10_conditional_get(self):
+        url = reverse('dish-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        # Ro'yxatda Last-Modified yo'q: o'chirilgan qator MAX(updated_at) ni o'zgartirmaydi
+        self.assertNotIn('Last-Modified', response)
+        last_modified = self.client.get(reverse('dish-detail', args=[self.dish1.pk]))['Last-Modified']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+        self.assertFalse(response.content)
+
+        response = self.client.get(
+            reverse('dish-detail', args=[self.dish1.pk]), HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, status.HTTP_200_OK)
+
+        self.restaurant.name = "Burger King"
+        self.restaurant.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        print("✅ 304 Not Modified ishladi")
+
+    def test_11_full_text_search_is_ranked(self):
+        Dish.objects.create(
+            name="Cola", description="Goes well with fries", price=1.5, category="Drinks", menu=self.menu,
+        )
+        url = reverse('dish-list')
+        response = self.client.get(url, {'search': 'fri'})
+        self.assertEqual([d['name'] for d in response.data], ['Fries', 'Cola'])
+
+        response = self.client.get(url, {'search': 'drinks'})
+        self.assertEqual([d['name'] for d in response.data], ['Cola'])
+
+        response = self.client.get(url, {'search': 'fastfood'})
+        self.assertEqual(len(response.data), 3)
+        print("✅ To'liq matnli qidiruv natijasi:", [d['name'] for d in response.data])
+
+    def admin_client(self):
+        admin = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(admin)
+
+    def test_12_bulk_create_dishes(self):
+        url = reverse('dish-bulk')
+        rows = [{'name': f"Somsa {i}", 'price': '1.50', 'menu_id': self.menu.id} for i in range(200)]
+        self.assertEqual(self.client.post(url, rows, format='json').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.admin_client()
+        self.client.get(reverse('dish-list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['created']), 200)
+        self.assertEqual(response.data['updated'], [])
+        # Qator soniga bog'liq emas: mavjudlar, menyular, INSERT, qidiruv vektori, tranzaksiya
+        query_count = len(queries)
+        self.assertLessEqual(query_count, 7)
+
+        # Signal yo'q, lekin kesh va qidiruv vektori yangilangan
+        response = self.client.get(reverse('dish-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data), 202)
+        response = self.client.get(reverse('dish-list'), {'search': 'somsa'})
+        self.assertEqual(len(response.data), 200)
+        print("✅ 200 ta taom bitta so'rovda yaratildi:", query_count, "ta SQL")
+
+    def test_13_bulk_price_update(self):
+        self.admin_client()
+        detail_url = reverse('dish-detail', args=[self.dish1.id])
+        etag = self.client.get(detail_url)['ETag']
+
+        response = self.client.patch(reverse('dish-bulk'), [
+            {'id': self.dish1.id, 'price': '7.25'},
+            {'id': self.dish2.id, 'price': '3.10', 'name': "Big Fries"},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'created': [], 'updated': [self.dish1.id, self.dish2.id]})
+
+        self.dish1.refresh_from_db()
+        self.assertEqual(str(self.dish1.price), '7.25')
+        self.assertEqual(self.dish1.name, "Burger")
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['price'], '7.25')
+        response = self.client.get(reverse('dish-list'), {'search': 'big'})
+        self.assertEqual([d['name'] for d in response.data], ["Big Fries"])
+        print("✅ Narxlar ommaviy yangilandi")
+
+    def test_14_bulk_upsert_and_validation(self):
+        self.admin_client()
+        url = reverse('dish-bulk')
+        response = self.client.put(url, [
+            {'id': self.dish1.id, 'name': "Cheeseburger", 'price': '6.50', 'menu_id': self.menu.id},
+            {'name': "Cola", 'price': '1.00', 'menu_id': self.menu.id},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['updated'], [self.dish1.id])
+        self.assertEqual(len(response.data['created']), 1)
+        self.dish1.refresh_from_db()
+        self.assertEqual(self.dish1.name, "Cheeseburger")
+        # PUT to'liq qator: berilmagan tavsif tozalanadi
+        self.assertIsNone(self.dish1.description)
+        self.assertEqual(Dish.objects.count(), 3)
+
+        response = self.client.patch(url, [
+            {'price': '1.00'},
+            {'id': 999999, 'price': '1.00'},
+            {'id': self.dish2.id, 'menu_id': 999999},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data[0])
+        self.assertIn('id', response.data[1])
+        self.assertIn('menu_id', response.data[2])
+
+        response = self.client.post(url, [{'id': self.dish2.id, 'name': "X", 'price': '1', 'menu_id': self.menu.id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Dish.objects.count(), 3)
+
+    def test_15_bulk_menus_move_between_restaurants(self):
+        self.admin_client()
+        other = Restaurant.objects.create(
+            name="Osh Markazi", address="Beshyog'och", phone="998935556677", email="osh@example.com",
+        )
+        params = {'restaurant': self.restaurant.id}
+        self.assertEqual(len(self.client.get(reverse('menu-list'), params).data), 1)
+
+        response = self.client.patch(reverse('menu-bulk'), [{'id': self.menu.id, 'restaurant_id': other.id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Eski egasining keshi ham eskiradi
+        response = self.client.get(reverse('menu-list'), params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data, [])
+
+        response = self.client.post(reverse('menu-bulk'), [
+            {'name': "Nonushta", 'restaurant_id': other.id}, {'name': "Kechki", 'restaurant_id': other.id},
+        ], format='json')
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual(Menu.objects.filter(restaurant=other).count(), 3)
+        print("✅ Menyular ommaviy yozildi")
+
+    def test_16_moving_menu_and_dish_invalidates_previous_owner(self):
+        self.admin_client()
+        other = Restaurant.objects.create(
+            name="Osh Markazi", address="Beshyog'och", phone="998935556677", email="osh@example.com",
+        )
+        other_menu = Menu.objects.create(name="Asosiy", restaurant=other)
+        menus = {'restaurant': self.restaurant.id}
+        dishes = {'menu__restaurant': self.restaurant.id}
+        self.client.get(reverse('menu-list'), menus)
+        self.assertEqual(len(self.client.get(reverse('dish-list'), dishes).data), 2)
+
+        # Detal so'rovisiz ko'chirish ham eski restoran keshini eskirtiradi
+        response = self.client.patch(reverse('dish-detail', args=[self.dish1.id]), {'menu_id': other_menu.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('dish-list'), dishes)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([dish['id'] for dish in response.data], [self.dish2.id])
+
+        response = self.client.patch(reverse('menu-detail', args=[self.menu.id]), {'restaurant_id': other.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('menu-list'), menus)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data, [])
+        print("✅ Ko'chirilgan menyu va taom eski restoran keshini eskirtirdi")
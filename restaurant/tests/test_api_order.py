@@ -0,0 +1,398 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.models import (
+    Restaurant, Menu, Dish, Customer, Driver, Order, OrderItem, Payment, Delivery
+)
+from restaurant.availability import index as availability_index
+from restaurant.dispatch import ACTIVE_DELIVERY_STATUSES
+from restaurant.pagination import OrderPagination
+from restaurant.search import update_search_vectors
+
+
+class OrderAPITestCase(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St",
+            phone="998901112233", email="fastfood@example.com",
+        )
+        self.menu = Menu.objects.create(name="Lunch Menu", restaurant=self.restaurant)
+        self.burger = Dish.objects.create(name="Burger", price=Decimal('5.99'), menu=self.menu)
+        self.fries = Dish.objects.create(name="Fries", price=Decimal('2.99'), menu=self.menu)
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+        self.driver = Driver.objects.create(full_name="Sardor", phone="998907654321", vehicle_info="Nexia", is_online=True)
+
+    def create_order(self, **kwargs):
+        # Buyurtma va uning elementlarini yaratish
+        order = Order.objects.create(
+            delivery_address="Chilonzor 5", customer=self.customer,
+            restaurant=self.restaurant, driver=self.driver, **kwargs
+        )
+        OrderItem.objects.create(order=order, dish=self.burger, quantity=2, unit_price=self.burger.price)
+        OrderItem.objects.create(order=order, dish=self.fries, quantity=1, unit_price=self.fries.price)
+        return order
+
+    def test_compact_orders_have_bounded_depth(self):
+        self.create_order()
+        response = self.client.get(reverse('order-list'), {'view': 'compact'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        order = response.data['results'][0]
+        self.assertEqual(order['restaurant'], {'id': self.restaurant.id, 'name': "FastFood King", 'average_rating': None})
+        self.assertEqual(order['items'][0]['dish'], self.burger.id)
+        self.assertNotIn('menu', order['items'][0])
+        print("✅ Compact buyurtma:", order)
+
+    def test_compact_query_count_is_constant(self):
+        self.create_order()
+        with CaptureQueriesContext(connection) as one_order:
+            self.client.get(reverse('order-list'), {'view': 'compact'})
+        for _ in range(4):
+            self.create_order()
+        with CaptureQueriesContext(connection) as five_orders:
+            response = self.client.get(reverse('order-list'), {'view': 'compact'})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(five_orders), len(one_order))
+
+    def test_full_query_count_is_constant(self):
+        self.create_order()
+        with CaptureQueriesContext(connection) as one_order:
+            self.client.get(reverse('order-list'))
+        for _ in range(4):
+            self.create_order()
+        with CaptureQueriesContext(connection) as five_orders:
+            self.client.get(reverse('order-list'))
+        self.assertEqual(len(five_orders), len(one_order))
+
+    def test_compact_payment_and_delivery(self):
+        order = self.create_order()
+        Payment.objects.create(order=order, amount=Decimal('14.97'), method='card')
+        Delivery.objects.create(order=order, driver=self.driver)
+
+        response = self.client.get(reverse('payment-list'), {'view': 'compact'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['order']['id'], order.id)
+        self.assertEqual(response.data[0]['order']['restaurant'], self.restaurant.id)
+
+        response = self.client.get(reverse('delivery-list'), {'view': 'compact'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        delivery = response.data['results'][0]
+        self.assertEqual(delivery['driver']['full_name'], "Sardor")
+        self.assertEqual(delivery['order']['customer'], self.customer.id)
+        print("✅ Compact to‘lov va yetkazib berish:", response.data)
+
+    def test_sparse_fields_collapse_items_to_ids(self):
+        order = self.create_order()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('order-list'), {'fields': 'id,status,items,restaurant'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['results'][0]
+        self.assertEqual(set(data), {'id', 'status', 'items', 'restaurant'})
+        self.assertEqual(sorted(data['items']), sorted(order.items.values_list('id', flat=True)))
+        self.assertEqual(data['restaurant'], self.restaurant.id)
+        # ETag tekshiruvi, buyurtmalar va element id lari
+        self.assertEqual(len(queries), 3)
+
+    def test_list_etag_covers_page_window_and_nested_rows(self):
+        orders = [self.create_order(status='preparing') for _ in range(3)]
+        url = reverse('order-list')
+        response = self.client.get(url, {'view': 'compact', 'page_size': 2})
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'view': 'compact', 'page_size': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Tekshiruv butun tarix emas, faqat sahifa oynasi ustida
+        self.assertEqual(len(queries), 1)
+        self.assertIn('LIMIT 3', queries[0]['sql'])
+
+        # Sahifadagi qator o'chirilsa MAX(updated_at) o'zgarmaydi, lekin ETag o'zgaradi
+        orders[2].delete()
+        response = self.client.get(url, {'view': 'compact', 'page_size': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Yetkazishlar ro'yxati buyurtma ichidagi mijozning o'zgarishini ham ko'radi
+        Delivery.objects.create(order=orders[0], driver=self.driver)
+        url = reverse('delivery-list')
+        etag = self.client.get(url)['ETag']
+        self.customer.full_name = "Ali Karimov"
+        self.customer.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_orders_are_cursor_paginated(self):
+        for _ in range(5):
+            self.create_order()
+        response = self.client.get(reverse('order-list'), {'view': 'compact', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+        seen = [order['id'] for order in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen.extend(order['id'] for order in response.data['results'])
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(seen), 5)
+        print("✅ Kursor bo‘yicha sahifalash ishladi:", seen)
+
+    def test_search_results_are_paginated_by_rank(self):
+        best = self.create_order()
+        other = Restaurant.objects.create(
+            name="Burger Town", description="Sushi ham bor", address="456 Side St",
+            phone="998909998877", email="burger@example.com",
+        )
+        later = [self.create_order() for _ in range(2)]
+        Order.objects.filter(pk__in=[order.pk for order in later]).update(restaurant=other)
+
+        response = self.client.get(reverse('order-list'), {'view': 'compact', 'search': 'fastfood king', 'page_size': 1})
+        self.assertEqual([order['id'] for order in response.data['results']], [best.id])
+
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(name="Sushi King")
+        update_search_vectors(Restaurant, [self.restaurant.pk])
+        response = self.client.get(reverse('order-list'), {'view': 'compact', 'search': 'sushi', 'page_size': 1})
+        seen = [order['id'] for order in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen.extend(order['id'] for order in response.data['results'])
+        # Nomdagi moslik (A vazn) tavsifdagidan (B) yuqori, placed_at dan qat'i nazar
+        self.assertEqual(seen, [best.id, later[1].id, later[0].id])
+
+    def test_ordering_param_keeps_keyset_order(self):
+        orders = [self.create_order(status=status) for status in ('preparing', 'pending', 'preparing')]
+        response = self.client.get(reverse('order-list'), {'view': 'compact', 'ordering': 'status', 'page_size': 2})
+        seen = [order['id'] for order in response.data['results']]
+        response = self.client.get(response.data['next'])
+        seen.extend(order['id'] for order in response.data['results'])
+        self.assertEqual(seen, sorted((order.id for order in orders), reverse=True))
+
+    def test_page_size_is_capped(self):
+        for _ in range(4):
+            self.create_order()
+        with mock.patch.object(OrderPagination, 'max_page_size', 3):
+            response = self.client.get(reverse('order-list'), {'view': 'compact', 'page_size': 10 ** 6})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_checkout_creates_order_with_items(self):
+        url = reverse('order-checkout')
+        data = {
+            'restaurant_id': self.restaurant.id,
+            'customer_id': self.customer.id,
+            'delivery_address': "Yunusobod 7",
+            'items': [{'dish_id': self.burger.id, 'quantity': 2}, {'dish_id': self.fries.id}],
+        }
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        order = Order.objects.get(pk=response.data['id'])
+        self.assertEqual(order.total_amount, Decimal('14.97'))
+        self.assertEqual(order.items.count(), 2)
+        self.assertEqual(order.items.get(dish=self.burger).unit_price, Decimal('5.99'))
+        self.assertEqual(response.data['total_amount'], '14.97')
+        print("✅ Checkout orqali buyurtma yaratildi:", response.data)
+
+    def test_checkout_query_count_does_not_grow_with_items(self):
+        url = reverse('order-checkout')
+        data = {'restaurant_id': self.restaurant.id, 'customer_id': self.customer.id, 'delivery_address': "Chilonzor"}
+        self.client.post(url, {**data, 'items': [{'dish_id': self.fries.id}]}, format='json')
+
+        with CaptureQueriesContext(connection) as one_item:
+            self.client.post(url, {**data, 'items': [{'dish_id': self.burger.id}]}, format='json')
+        many_items = [{'dish_id': dish.id, 'quantity': 3} for dish in (self.burger, self.fries)] * 10
+        with CaptureQueriesContext(connection) as twenty_items:
+            response = self.client.post(url, {**data, 'items': many_items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(twenty_items), len(one_item))
+
+    def test_checkout_rejects_foreign_dishes(self):
+        other = Restaurant.objects.create(name="Other", address="x", phone="998900000001", email="o@example.com")
+        foreign = Dish.objects.create(name="Plov", price=Decimal('4.00'), menu=Menu.objects.create(name="M", restaurant=other))
+        response = self.client.post(reverse('order-checkout'), {
+            'restaurant_id': self.restaurant.id,
+            'customer_id': self.customer.id,
+            'delivery_address': "Chilonzor",
+            'items': [{'dish_id': self.burger.id}, {'dish_id': foreign.id}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_checkout_locks_dishes_inside_transaction(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('order-checkout'), {
+                'restaurant_id': self.restaurant.id, 'customer_id': self.customer.id, 'delivery_address': "Chilonzor",
+                'items': [{'dish_id': self.burger.id}],
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        statements = [query['sql'] for query in queries.captured_queries]
+        lookup = next(index for index, sql in enumerate(statements) if 'FOR UPDATE OF "restaurant_dish"' in sql)
+        # Narx va mavjudlik savepoint/tranzaksiya ichida, buyurtma yozilishidan oldin o'qiladi
+        begin = next(index for index, sql in enumerate(statements) if sql.startswith('SAVEPOINT'))
+        insert = next(index for index, sql in enumerate(statements) if sql.startswith('INSERT INTO "restaurant_order"'))
+        self.assertLess(begin, lookup)
+        self.assertLess(lookup, insert)
+
+    def test_total_follows_item_changes(self):
+        order = self.create_order()
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('14.97'))
+
+        item = order.items.get(dish=self.fries)
+        item.quantity = 3
+        item.save()
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('20.95'))
+
+        item.delete()
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('11.98'))
+
+        response = self.client.post(reverse('orderitem-list'), {
+            'order': order.id, 'dish_id': self.fries.id, 'quantity': 1,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['unit_price'], '2.99')
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('14.97'))
+        print("✅ Buyurtma summasi elementlar bilan birga yangilandi:", order.total_amount)
+
+    def test_stale_save_keeps_item_totals(self):
+        # create_order dagi obyekt elementlar qo'shilishidan oldingi (0) summalarni saqlaydi
+        order = self.create_order()
+        order.notes = "Qo'ng'iroq qiling"
+        order.save()
+        order.refresh_from_db()
+        self.assertEqual(order.notes, "Qo'ng'iroq qiling")
+        self.assertEqual(order.total_amount, Decimal('14.97'))
+        self.assertGreater(order.kitchen_minutes, 0)
+
+        # Nomi aytilsa maydon yoziladi
+        order.total_amount = Decimal('1.00')
+        order.save(update_fields=['total_amount'])
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('1.00'))
+        print("✅ Eskirgan buyurtma nusxasini saqlash summalarni bosib ketmadi")
+
+    def test_status_update_is_single_update(self):
+        order = self.create_order()
+        url = reverse('order-detail', args=[order.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'status': 'preparing'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['calculated_total'], '14.97')
+        # Status transition_orders orqali bitta (CTE li) UPDATE bilan o'tadi
+        updates = [q['sql'] for q in queries if 'UPDATE' in q['sql']]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('total_amount', updates[0])
+
+    def test_cancel_releases_delivery_and_patch_moves_delivery(self):
+        cancelled = self.create_order(status='preparing')
+        cancelled_delivery = Delivery.objects.create(order=cancelled, driver=self.driver)
+        active = self.create_order(status='preparing')
+        delivery = Delivery.objects.create(order=active, driver=self.driver)
+        availability_index.rebuild()
+        self.addCleanup(availability_index.invalidate)
+        self.assertEqual(availability_index.load_of(self.driver.pk), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('order-transition', args=[cancelled.id]), {'status': 'cancelled'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cancelled_delivery.refresh_from_db()
+        self.assertEqual(cancelled_delivery.status, 'cancelled')
+        self.assertIsNone(cancelled_delivery.pickup_at)
+        self.assertEqual(availability_index.load_of(self.driver.pk), 1)
+
+        # PATCH status ham bog'langan yetkazishni o'tkazadi
+        url = reverse('order-detail', args=[active.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.patch(url, {'status': 'delivering'}, format='json').status_code, status.HTTP_200_OK)
+            response = self.client.patch(url, {'status': 'completed'}, format='json')
+        self.assertEqual(response.data['status'], 'completed')
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, 'delivered')
+        self.assertEqual(availability_index.load_of(self.driver.pk), 0)
+        self.assertFalse(Delivery.objects.filter(driver=self.driver, status__in=ACTIVE_DELIVERY_STATUSES).exists())
+
+        # Yetkazishni to'g'ridan-to'g'ri bekor qilib bo'lmaydi
+        response = self.client.patch(reverse('delivery-detail', args=[delivery.id]), {'status': 'cancelled'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        print("✅ Bekor qilingan buyurtma yetkazishi va haydovchi bandligi bo'shatildi")
+
+    def test_search_orders_by_restaurant_and_customer(self):
+        self.create_order()
+        url = reverse('order-list')
+        self.assertEqual(len(self.client.get(url, {'search': 'fastfood'}).data['results']), 1)
+        self.assertEqual(len(self.client.get(url, {'search': 'Valiyev'}).data['results']), 1)
+        self.assertEqual(len(self.client.get(url, {'search': 'sushi'}).data['results']), 0)
+
+    def test_invalid_status_change_is_rejected(self):
+        order = self.create_order()
+        response = self.client.patch(reverse('order-detail', args=[order.id]), {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('order-transition', args=[order.id]), {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'pending')
+
+    def test_transition_action(self):
+        order = self.create_order()
+        response = self.client.post(reverse('order-transition', args=[order.id]), {'status': 'preparing'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'id': order.id, 'status': 'preparing'})
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'preparing')
+
+    def test_bulk_transition_is_single_statement(self):
+        orders = [self.create_order(status='preparing') for _ in range(3)]
+        pending = self.create_order()
+        for order in orders[:2]:
+            Delivery.objects.create(order=order, driver=self.driver)
+
+        ids = [order.id for order in orders] + [pending.id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('order-bulk-transition'), {'ids': ids, 'status': 'delivering'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['changed'], sorted(order.id for order in orders))
+        self.assertEqual(response.data['skipped'], [pending.id])
+        self.assertEqual(len([q for q in queries if 'UPDATE' in q['sql']]), 1)
+
+        delivery = Delivery.objects.get(order=orders[0])
+        self.assertEqual(delivery.status, 'picked_up')
+        self.assertIsNotNone(delivery.pickup_at)
+
+        response = self.client.post(
+            reverse('order-bulk-transition'), {'ids': ids, 'status': 'completed'}, format='json'
+        )
+        self.assertEqual(len(response.data['changed']), 3)
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, 'delivered')
+        self.assertIsNotNone(delivery.delivered_at)
+        print("✅ Buyurtmalar bitta so'rov bilan o'tkazildi:", response.data['changed'])
+
+    def test_delivery_transition_moves_order(self):
+        order = self.create_order(status='preparing')
+        delivery = Delivery.objects.create(order=order, driver=self.driver)
+        url = reverse('delivery-transition', args=[delivery.id])
+
+        self.assertEqual(self.client.post(url, {'status': 'delivered'}, format='json').status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.post(url, {'status': 'picked_up'}, format='json').status_code, status.HTTP_200_OK)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'delivering')
+
+    def test_bulk_transition_is_staff_only(self):
+        order = self.create_order()
+        self.client.force_authenticate(User.objects.create_user(username='mijoz', password='mijoz12345@'))
+        response = self.client.post(reverse('order-bulk-transition'), {'ids': [order.id], 'status': 'preparing'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,11 +1,14 @@
 import json
+from io import StringIO
+from django.core.management import call_command
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from restaurant.models import Restaurant, Menu, Dish
+from restaurant.models import Restaurant, Menu, Dish, Customer, RestaurantLike, RestaurantComment
 from restaurant.serializers import RestaurantSerializer
 
 
@@ -164,3 +167,62 @@ class RestaurantAPITestCase(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['name'], 'Sushi Place')
         print("✅ SearchFilter ishladi. Natija:", response.data)
+
+    def test_5_list_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small_page:
+            self.client.get(self.list_url)
+
+        for i in range(5):
+            restaurant = Restaurant.objects.create(
+                name=f"Cafe {i}", address="Chilonzor",
+                phone=f"99890000000{i}", email=f"cafe{i}@example.com",
+            )
+            customer = Customer.objects.create(
+                full_name=f"Mijoz {i}", email=f"mijoz{i}@example.com", phone=f"99891000000{i}",
+            )
+            RestaurantLike.objects.create(restaurant=restaurant, customer=customer)
+            RestaurantComment.objects.create(restaurant=restaurant, customer=customer, text="Zo'r")
+
+        with CaptureQueriesContext(connection) as big_page:
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(len(big_page), len(small_page))
+        cafe = next(r for r in response.data if r['name'] == 'Cafe 0')
+        self.assertEqual(cafe['likes_data'], {'likes': 1, 'dislikes': 0})
+        self.assertEqual(cafe['comments_count'], 1)
+        print("✅ So'rovlar soni qatorlar soniga bog'liq emas:", len(big_page))
+
+    def test_6_counters_follow_likes_and_comments(self):
+        customer = Customer.objects.create(full_name="Vali", email="vali@example.com", phone="998931112233")
+        like = RestaurantLike.objects.create(restaurant=self.restaurant1, customer=customer)
+        RestaurantComment.objects.create(restaurant=self.restaurant1, customer=customer, text="Mazali")
+        self.restaurant1.refresh_from_db()
+        self.assertEqual((self.restaurant1.likes_count, self.restaurant1.comments_count), (1, 1))
+
+        like.delete()
+        self.restaurant1.refresh_from_db()
+        self.assertEqual(self.restaurant1.likes_count, 0)
+
+        Restaurant.objects.filter(pk=self.restaurant1.pk).update(likes_count=42, comments_count=0)
+        call_command('rebuild_restaurant_counters', stdout=StringIO())
+        self.restaurant1.refresh_from_db()
+        self.assertEqual((self.restaurant1.likes_count, self.restaurant1.comments_count), (0, 1))
+
+        # 0 ga tushib qolgan hisoblagich manfiy bo'lmaydi (PositiveIntegerField)
+        like = RestaurantLike.objects.create(restaurant=self.restaurant1, customer=customer)
+        Restaurant.objects.filter(pk=self.restaurant1.pk).update(likes_count=0)
+        like.delete()
+        self.restaurant1.refresh_from_db()
+        self.assertEqual(self.restaurant1.likes_count, 0)
+
+        # get_object() dan keyin qo'shilgan layk restoranni tahrirlashda yo'qolmaydi
+        stale = Restaurant.objects.get(pk=self.restaurant1.pk)
+        RestaurantLike.objects.create(restaurant=self.restaurant1, customer=customer)
+        serializer = RestaurantSerializer(stale, data={'description': "Yangi"}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.restaurant1.refresh_from_db()
+        self.assertEqual((self.restaurant1.likes_count, self.restaurant1.comments_count), (1, 1))
+        print("✅ Hisoblagichlar to'g'ri yangilandi")
@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from restaurant.models import Restaurant, Menu, Dish, Customer, Order, OrderItem
+
+
+class AsyncReadViewsTestCase(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.admin_headers = {'Authorization': f'Token {Token.objects.create(user=self.admin).key}'}
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.other = Restaurant.objects.create(
+            name="Sushi Place", address="456 Side St", phone="998909998877", email="sushi@example.com",
+        )
+        self.menu = Menu.objects.create(name="Lunch Menu", restaurant=self.restaurant)
+        Menu.objects.create(name="Sushi Menu", restaurant=self.other)
+        self.burger = Dish.objects.create(name="Burger", price=Decimal('5.99'), menu=self.menu)
+
+        owner = User.objects.create_user(username='ali', password='ali12345@')
+        self.customer_headers = {'Authorization': f'Token {Token.objects.create(user=owner).key}'}
+        self.customer = Customer.objects.create(
+            full_name="Ali Valiyev", email="ali@example.com", phone="998901234567", user=owner,
+        )
+        stranger = Customer.objects.create(full_name="Vali", email="vali@example.com", phone="998901234568")
+
+        self.orders = []
+        for index in range(5):
+            order = Order.objects.create(delivery_address="Chilonzor 5", customer=self.customer, restaurant=self.restaurant)
+            OrderItem.objects.create(order=order, dish=self.burger, quantity=index + 1, unit_price=self.burger.price)
+            self.orders.append(order)
+        Order.objects.create(delivery_address="Yunusobod 7", customer=stranger, restaurant=self.other)
+
+    async def test_responses_match_sync_endpoints(self):
+        for name, args in [
+            ('restaurant-list', []), ('restaurant-detail', [self.restaurant.pk]),
+            ('dish-list', []), ('order-detail', [self.orders[0].pk]),
+        ]:
+            sync = await self.async_client.get(reverse(name, args=args), headers=self.admin_headers)
+            async_ = await self.async_client.get(reverse(f'async-{name}', args=args), headers=self.admin_headers)
+            self.assertEqual(async_.status_code, 200, name)
+            self.assertEqual(async_.json(), sync.json(), name)
+        print("✅ Async javoblar sinxron endpointlar bilan bir xil")
+
+    async def test_permissions_and_errors(self):
+        response = await self.async_client.get(reverse('async-restaurant-list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+        response = await self.async_client.get(reverse('async-restaurant-list'), headers={'Authorization': 'Token wrong'})
+        self.assertEqual(response.status_code, 401)
+
+        # Menyu va taomlar hamma uchun ochiq
+        response = await self.async_client.get(reverse('async-menu-list'), {'restaurant': self.restaurant.pk})
+        self.assertEqual([menu['name'] for menu in response.json()], ["Lunch Menu"])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        response = await self.async_client.get(reverse('async-menu-list'), {'restaurant': self.restaurant.pk})
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        response = await self.async_client.get(reverse('async-dish-list'), {'menu': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('menu', response.json())
+
+        response = await self.async_client.get(reverse('async-dish-detail', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        print("✅ Async autentifikatsiya, ruxsat, filtr va xatolar")
+
+    async def test_conditional_get(self):
+        url = reverse('async-restaurant-detail', args=[self.restaurant.pk])
+        first = await self.async_client.get(url, headers=self.admin_headers)
+        second = await self.async_client.get(url, headers={**self.admin_headers, 'If-None-Match': first['ETag']})
+        self.assertEqual(second.status_code, 304)
+        print("✅ Async ETag/304")
+
+    async def test_orders_keyset_pagination_and_visibility(self):
+        url = reverse('async-order-list')
+        seen = []
+        params = {'page_size': 2}
+        while url:
+            response = await self.async_client.get(url, params, headers=self.customer_headers)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen.extend(order['id'] for order in body['results'])
+            url, params = body['next'], {}
+        # Mijoz faqat o'z buyurtmalarini, yangisidan boshlab ko'radi
+        self.assertEqual(seen, [order.pk for order in reversed(self.orders)])
+
+        response = await self.async_client.get(reverse('async-order-list'), {'view': 'compact'}, headers=self.customer_headers)
+        self.assertEqual(response.json()['results'][0]['items'][0]['dish'], self.burger.pk)
+
+        response = await self.async_client.get(reverse('async-order-list'), {'cursor': 'bad'}, headers=self.customer_headers)
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get(reverse('async-order-list'))
+        self.assertEqual(response.json()['results'], [])
+        print("✅ Async buyurtmalar keyset sahifalash bilan:", seen)
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.availability import index
+from restaurant.dispatch import dispatch_batch
+from restaurant.models import Restaurant, Customer, Driver, Order, Delivery
+
+
+class DriverAvailabilityTestCase(APITestCase):
+
+    def setUp(self):
+        index.invalidate()
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+        self.best = Driver.objects.create(full_name="Sardor", phone="998900000001", vehicle_info="Nexia", is_online=True, rating=Decimal('4.90'))
+        self.good = Driver.objects.create(full_name="Jasur", phone="998900000002", vehicle_info="Cobalt", is_online=True, rating=Decimal('4.50'))
+        Driver.objects.create(full_name="Offline", phone="998900000003", vehicle_info="Spark", is_online=False, rating=Decimal('5.00'))
+
+    def tearDown(self):
+        index.invalidate()
+
+    def create_order(self, number=1):
+        return Order.objects.create(delivery_address=f"Chilonzor {number}", customer=self.customer, restaurant=self.restaurant)
+
+    def test_claim_without_queries(self):
+        index.rebuild()
+        with CaptureQueriesContext(connection) as queries:
+            first, second, third = index.claim(), index.claim(), index.claim()
+        self.assertEqual(len(queries), 0)
+        self.assertEqual((first, second, third), (self.best.id, self.good.id, None))
+        print("✅ Haydovchilar reyting bo'yicha bazasiz band qilindi")
+
+    def test_signals_keep_index_in_sync(self):
+        index.rebuild()
+        order = self.create_order()
+        with self.captureOnCommitCallbacks(execute=True):
+            delivery = Delivery.objects.create(order=order, driver=self.best)
+        self.assertEqual(index.load_of(self.best.id), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delivery.status = 'delivered'
+            delivery.save()
+        self.assertEqual(index.load_of(self.best.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.best.is_online = False
+            self.best.save()
+        self.assertEqual(index.claim(), self.good.id)
+        print("✅ Indeks Driver va Delivery signallari bilan yangilandi")
+
+    def test_dispatch_updates_index(self):
+        index.rebuild()
+        self.create_order()
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_batch()
+        self.assertEqual(index.load_of(self.best.id), 1)
+        self.assertEqual(index.claim(), self.good.id)
+
+    def test_delivery_without_driver_gets_best_free_driver(self):
+        first, second = self.create_order(1), self.create_order(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('delivery-list'), {'order_id': first.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['driver']['id'], self.best.id)
+        first.refresh_from_db()
+        self.assertEqual(first.driver, self.best)
+        self.assertEqual(index.load_of(self.best.id), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('delivery-list'), {'order_id': second.id}, format='json')
+        self.assertEqual(response.data['driver']['id'], self.good.id)
+
+        response = self.client.post(reverse('delivery-list'), {'order_id': self.create_order(3).id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        print("✅ Yetkazish bo'sh haydovchiga avtomatik biriktirildi")
+
+    def test_reservation_survives_rebuild(self):
+        index.rebuild()
+        driver_id = index.claim()
+        # TTL qayta qurilishi claim va commit dagi delivery_started orasiga tushadi
+        index.rebuild()
+        self.assertEqual(index.load_of(driver_id), 1)
+        index.delivery_started(driver_id)
+        self.assertEqual(index.load_of(driver_id), 1)
+
+    def test_delivery_driver_overrides_order_driver(self):
+        order = Order.objects.create(
+            delivery_address="Chilonzor 1", customer=self.customer, restaurant=self.restaurant, driver=self.good,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('delivery-list'), {'order_id': order.id}, format='json')
+        self.assertEqual(response.data['driver']['id'], self.best.id)
+        order.refresh_from_db()
+        self.assertEqual(order.driver, self.best)
+
+        other = self.create_order(2)
+        self.client.post(reverse('delivery-list'), {'order_id': other.id, 'driver_id': self.good.id}, format='json')
+        other.refresh_from_db()
+        self.assertEqual(other.driver, self.good)
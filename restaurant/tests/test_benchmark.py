@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from restaurant import benchmark
+from restaurant.datagen import generate
+from restaurant.models import Restaurant, Dish, Order, OrderItem, Delivery, DailyRestaurantStats
+
+
+class BenchmarkTestCase(TestCase):
+
+    def test_generate_creates_consistent_data(self):
+        created = generate(scale=0.05, seed=1)
+
+        self.assertEqual(created['restaurants'], Restaurant.objects.count())
+        self.assertEqual(created['orders'], Order.objects.count())
+        self.assertEqual(Dish.objects.count(), created['menus'] * 10)
+        self.assertFalse(OrderItem.objects.exclude(dish__menu__restaurant=F('order__restaurant')).exists())
+        self.assertFalse(Delivery.objects.exclude(order__status__in=['delivering', 'completed']).exists())
+        self.assertTrue(DailyRestaurantStats.objects.exists())
+        restaurant = Restaurant.objects.first()
+        self.assertEqual(restaurant.likes_count, restaurant.likes.count())
+        print("✅ Sintetik ma'lumotlar izchil yaratildi")
+
+    def test_benchmark_covers_router_endpoints(self):
+        generate(scale=0.05, seed=2)
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'result.json')
+            call_command('benchmark_api', use_existing=True, repeat=2, warmup=0, save=path, stdout=out, stderr=StringIO())
+            with open(path, encoding='utf-8') as source:
+                results = json.load(source)
+
+        for name in ('restaurant.list', 'dish.retrieve', 'order.list?compact', 'dailyrestaurantstats.summary'):
+            self.assertIn(name, results)
+        for name, row in results.items():
+            self.assertEqual(row['status'], [200], (name, row['url']))
+            self.assertLessEqual(row['p50_ms'], row['p95_ms'])
+        self.assertIn('order.list', out.getvalue())
+        # Keshlanadigan endpointlar sovuq (keshsiz) va keshdan alohida o'lchanadi
+        self.assertNotIn('order.list@cached', results)
+        for name in ('dish.list', 'menu.retrieve'):
+            self.assertGreater(results[name]['queries'], results[f'{name}@cached']['queries'])
+        print("✅ Benchmark routerdagi barcha endpointlarni o'lchadi")
+
+    def test_asgi_benchmark_compares_sync_and_async(self):
+        generate(scale=0.05, seed=3)
+        results = benchmark.run_asgi(total=4, concurrency=2, only=['restaurant', 'order.list'])
+
+        self.assertEqual(set(results), {'restaurant.list', 'restaurant.retrieve', 'order.list'})
+        for name, row in results.items():
+            self.assertEqual(row['sync']['status'], [200], name)
+            self.assertEqual(row['async']['status'], [200], name)
+            self.assertGreater(row['async']['rps'], 0)
+        print("✅ ASGI benchmark sinxron va async endpointlarni solishtirdi")
+
+    def test_compare_flags_regressions(self):
+        baseline = {'order.list': {'p95_ms': 10.0, 'queries': 5, 'bytes': 100}}
+        current = {'order.list': {'p95_ms': 10.5, 'queries': 6, 'bytes': 100}}
+
+        rows = benchmark.compare(baseline, current, threshold=0.1)
+        self.assertEqual(rows[0][3], ['queries 5 -> 6'])
+        self.assertEqual(benchmark.percentile([5, 1, 4, 2, 3], 0.5), 3)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            paths = [os.path.join(workdir, 'a.json'), os.path.join(workdir, 'b.json')]
+            benchmark.save(baseline, paths[0])
+            benchmark.save(current, paths[1])
+            with self.assertRaises(CommandError):
+                call_command('benchmark_api', compare=paths, fail_on_regression=True, stdout=StringIO())
+        print("✅ Solishtirish regressiyani aniqladi")
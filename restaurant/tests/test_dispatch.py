@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from restaurant.dispatch import assign, dispatch_batch
+from restaurant.models import Restaurant, Customer, Driver, Order, Delivery
+
+
+class DispatchTestCase(TestCase):
+
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+        self.best = Driver.objects.create(full_name="Sardor", phone="998900000001", vehicle_info="Nexia", is_online=True, rating=Decimal('4.90'))
+        self.good = Driver.objects.create(full_name="Jasur", phone="998900000002", vehicle_info="Cobalt", is_online=True, rating=Decimal('4.50'))
+        Driver.objects.create(full_name="Offline", phone="998900000003", vehicle_info="Spark", is_online=False, rating=Decimal('5.00'))
+        self.orders = [
+            Order.objects.create(delivery_address=f"Chilonzor {i}", customer=self.customer, restaurant=self.restaurant)
+            for i in range(3)
+        ]
+
+    def test_oldest_orders_go_to_best_drivers(self):
+        assignments = dispatch_batch()
+        self.assertEqual(assignments, [(self.orders[0].id, self.best.id), (self.orders[1].id, self.good.id)])
+
+        self.orders[0].refresh_from_db()
+        self.assertEqual(self.orders[0].driver, self.best)
+        self.assertEqual(Delivery.objects.get(order=self.orders[1]).driver, self.good)
+        self.assertFalse(Delivery.objects.filter(order=self.orders[2]).exists())
+        print("✅ Buyurtmalar haydovchilarga biriktirildi:", assignments)
+
+    def test_busy_drivers_are_skipped_until_delivery_finishes(self):
+        dispatch_batch()
+        self.assertEqual(dispatch_batch(), [])
+
+        Delivery.objects.filter(driver=self.good).update(status='delivered')
+        self.assertEqual(dispatch_batch(), [(self.orders[2].id, self.good.id)])
+
+    def test_assign_balances_load(self):
+        loads = {}
+        assignments = assign([1, 2, 3, 4], [(10, Decimal('5.00')), (20, Decimal('4.80'))], loads, capacity=2)
+        self.assertEqual(assignments, [(1, 10), (2, 20), (3, 10), (4, 20)])
+        self.assertEqual(loads, {10: 2, 20: 2})
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from restaurant.eta import queue_minutes, refresh_estimates
+from restaurant.models import Restaurant, Menu, Dish, Customer, Order, OrderItem, Delivery
+
+
+@override_settings(
+    ETA_KITCHEN_PARALLELISM=2, ETA_DEFAULT_DELIVERY_MINUTES=20,
+    ETA_HISTORY_MIN_SAMPLES=2, ETA_UPDATE_THRESHOLD_SECONDS=60,
+)
+class DeliveryEtaTestCase(TestCase):
+
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.other = Restaurant.objects.create(
+            name="Sushi Place", address="456 Side St", phone="998909998877", email="sushi@example.com",
+        )
+        menu = Menu.objects.create(name="Lunch Menu", restaurant=self.restaurant)
+        self.plov = Dish.objects.create(name="Plov", price=Decimal('30000'), menu=menu, prep_time_minutes=20)
+        self.somsa = Dish.objects.create(name="Somsa", price=Decimal('8000'), menu=menu, prep_time_minutes=10)
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+        self.now = timezone.now()
+
+    def create_order(self, restaurant, status, items=()):
+        order = Order.objects.create(
+            delivery_address="Chilonzor 5", customer=self.customer, restaurant=restaurant, status=status,
+        )
+        Order.objects.filter(pk=order.pk).update(placed_at=self.now)
+        for dish, quantity in items:
+            OrderItem.objects.create(order=order, dish=dish, quantity=quantity, unit_price=dish.price)
+        return order
+
+    def minutes_from_now(self, order):
+        order.refresh_from_db()
+        return round((order.estimated_delivery_time - self.now).total_seconds() / 60, 1)
+
+    def test_queue_minutes_per_restaurant(self):
+        restaurants = np.array([1, 2, 1, 1])
+        priority = np.array([1, 0, 0, 1])
+        placed = np.array([10.0, 5.0, 20.0, 5.0])
+        work = np.array([10.0, 8.0, 6.0, 4.0])
+        # Restoran 1 navbati: preparing(6), keyin pending placed_at bo'yicha (4, 10)
+        self.assertEqual(queue_minutes(restaurants, priority, placed, work, 2).tolist(), [5.0, 0.0, 0.0, 3.0])
+        print("✅ Oshxona navbati har restoran uchun alohida hisoblandi")
+
+    def test_refresh_uses_prep_times_queue_and_history(self):
+        # Ish: max(20, (20*1 + 10*2) / 2) = 20 daqiqa, navbat bo'sh
+        preparing = self.create_order(self.restaurant, 'preparing', [(self.plov, 1), (self.somsa, 2)])
+        # Ish: 10, oldida 20 daqiqalik ish / 2 oshpaz = 10
+        pending = self.create_order(self.restaurant, 'pending', [(self.somsa, 1)])
+        # Boshqa restoran navbati alohida, taomsiz buyurtma
+        elsewhere = self.create_order(self.other, 'pending')
+        completed = self.create_order(self.restaurant, 'completed', [(self.plov, 1)])
+
+        for minutes in (30, 40):
+            delivered = self.create_order(self.restaurant, 'completed')
+            Delivery.objects.create(
+                order=delivered, status='delivered',
+                pickup_at=self.now - timedelta(minutes=minutes + 60), delivered_at=self.now - timedelta(minutes=60),
+            )
+        on_the_way = self.create_order(self.restaurant, 'delivering')
+        delivery = Delivery.objects.create(order=on_the_way, status='picked_up', pickup_at=self.now - timedelta(minutes=5))
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = refresh_estimates(now=self.now)
+        self.assertLessEqual(len(queries), 7)
+        self.assertEqual(updated, {'orders': 4, 'deliveries': 1})
+
+        # Yo'l: restoran tarixi o'rtachasi 35 daqiqa; boshqa restoranga barcha restoranlar o'rtachasi
+        self.assertEqual(self.minutes_from_now(preparing), 20 + 35)
+        self.assertEqual(self.minutes_from_now(pending), 10 + 10 + 35)
+        self.assertEqual(self.minutes_from_now(elsewhere), 35)
+        self.assertEqual(self.minutes_from_now(on_the_way), 30)
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.estimated_time, timedelta(minutes=35))
+        completed.refresh_from_db()
+        self.assertIsNone(completed.estimated_delivery_time)
+
+        # Baho deyarli o'zgarmasa qayta yozilmaydi
+        self.assertEqual(refresh_estimates(now=self.now + timedelta(seconds=30)), {'orders': 0, 'deliveries': 0})
+        print("✅ Faol buyurtmalar ETA si bitta o'tishda hisoblandi:", len(queries), "ta SQL")
+
+    def test_defaults_without_history(self):
+        order = self.create_order(self.restaurant, 'pending', [(self.plov, 1)])
+        refresh_estimates(now=self.now)
+        self.assertEqual(self.minutes_from_now(order), 20 + 20)
+
+        # Kechikkan buyurtma bahosi hozirgidan oldin bo'lmaydi
+        later = self.now + timedelta(hours=2)
+        refresh_estimates(now=later)
+        order.refresh_from_db()
+        self.assertEqual(order.estimated_delivery_time, later + timedelta(minutes=20))
+        print("✅ Tarix bo'lmasa standart yo'l vaqti ishlatildi")
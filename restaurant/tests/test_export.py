@@ -0,0 +1,72 @@
+import json
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.models import Restaurant, Menu, Dish, Customer, Order, OrderItem, Payment, Review
+
+
+class ExportTestCase(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.other = Restaurant.objects.create(
+            name="Sushi Place", address="456 Side St", phone="998909998877", email="sushi@example.com",
+        )
+        menu = Menu.objects.create(name="Lunch Menu", restaurant=self.restaurant)
+        self.burger = Dish.objects.create(name="Burger", price=Decimal('5.99'), menu=menu)
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+
+        self.order = Order.objects.create(delivery_address="Chilonzor 5", customer=self.customer, restaurant=self.restaurant)
+        OrderItem.objects.create(order=self.order, dish=self.burger, quantity=2, unit_price=self.burger.price)
+        Payment.objects.create(order=self.order, amount=Decimal('11.98'), method='card', status='paid')
+        Review.objects.create(order=self.order, customer=self.customer, restaurant=self.restaurant, rating=5)
+        Order.objects.create(delivery_address="Yunusobod 7", customer=self.customer, restaurant=self.other, status='cancelled')
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_orders_csv_is_streamed(self):
+        response = self.client.get(reverse('export', args=['orders']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = self.read(response).splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'placed_at', 'status'])
+        self.assertEqual(len(lines), 3)
+        print("✅ CSV eksport:", lines)
+
+    def test_ndjson_filters(self):
+        url = reverse('export', args=['order-items'])
+        response = self.client.get(url, {'output': 'ndjson', 'restaurant': self.restaurant.id, 'status': 'pending'})
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['dish__name'], 'Burger')
+        self.assertEqual(rows[0]['unit_price'], '5.99')
+
+        response = self.client.get(reverse('export', args=['orders']), {'output': 'ndjson', 'date_to': '2000-01-01'})
+        self.assertEqual(self.read(response), '')
+
+        response = self.client.get(reverse('export', args=['reviews']), {'status': 'paid'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_is_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user(username='mijoz', password='mijoz12345@'))
+        self.assertEqual(self.client.get(reverse('export', args=['payments'])).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_data', 'payments', '--status', 'paid', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('11.98', lines[1])
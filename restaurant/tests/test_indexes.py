@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from restaurant.dispatch import DISPATCHABLE_ORDER_STATUSES
+from restaurant.models import Restaurant, Menu, Dish, Customer, Driver, Order, Review
+
+
+class IndexUsageTestCase(APITestCase):
+    """
+    Ro'yxat endpointlari haqiqatda yuboradigan so'rovlar EXPLAIN qilinadi: rejada kerakli
+    indeks bo'lishi va xotirada saralash (Sort) bo'lmasligi kerak. Test jadvallari kichik,
+    shuning uchun seq scan va bitmap scan o'chiriladi — aks holda planner har doim
+    jadvalni o'qib, keyin saralaydi.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ali', password='ali12345@')
+        self.client.force_authenticate(self.user)
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.customer = Customer.objects.create(
+            full_name="Ali Valiyev", email="ali@example.com", phone="998901234567", user=self.user,
+        )
+        order = Order.objects.create(delivery_address="Chilonzor 5", customer=self.customer, restaurant=self.restaurant)
+        Review.objects.create(order=order, customer=self.customer, restaurant=self.restaurant, rating=5)
+        Driver.objects.create(full_name="Sardor", phone="998900000001", vehicle_info="Nexia", is_online=True, rating=Decimal('4.90'))
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_bitmapscan = off')
+
+    def explain(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def list_query_plan(self, url, table):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        selects = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql'] and 'ORDER BY' in q['sql']
+        ]
+        self.assertTrue(selects, f"{table} bo'yicha ro'yxat so'rovi topilmadi")
+        return self.explain(selects[0])
+
+    def assertIndexScan(self, plan, index_name):
+        self.assertIn(index_name, plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_customer_order_list(self):
+        plan = self.list_query_plan(reverse('order-list'), 'restaurant_order')
+        self.assertIndexScan(plan, 'order_customer_placed_at_idx')
+        print("✅ Buyurtmalar ro'yxati indeks bo'yicha o'qildi:\n", plan)
+
+    def test_customer_review_list(self):
+        plan = self.list_query_plan(reverse('review-list'), 'restaurant_review')
+        self.assertIndexScan(plan, 'review_customer_created_idx')
+
+    def test_restaurant_reviews_prefetch(self):
+        queryset = Review.objects.filter(restaurant_id__in=[self.restaurant.id]).order_by('-created_at', '-id')
+        self.assertIn('review_restaurant_created_idx', queryset.explain())
+
+    def test_dispatch_queries_use_partial_indexes(self):
+        orders = Order.objects.filter(status__in=DISPATCHABLE_ORDER_STATUSES).order_by('placed_at', 'id')[:10]
+        self.assertIndexScan(orders.explain(), 'order_open_placed_at_idx')
+
+        drivers = Driver.objects.filter(is_online=True, is_active=True).order_by('-rating')
+        self.assertIndexScan(drivers.explain(), 'driver_available_rating_idx')
+
+    def test_menu_available_dishes_use_composite_index(self):
+        # Menyudagi taomlarning ko'pi mavjud emas: planner statistika bo'yicha ikki ustunli indeksni tanlashi kerak
+        menus = [Menu.objects.create(name=f"Menyu {index}", restaurant=self.restaurant) for index in range(5)]
+        Dish.objects.bulk_create([
+            Dish(name=f"Taom {index}", price=Decimal('10000'), menu=menus[index % 5], is_available=index % 20 == 0)
+            for index in range(1000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE restaurant_dish')
+        plan = Dish.objects.filter(menu=menus[0], is_available=True).order_by().explain()
+        self.assertIn('dish_menu_available_idx', plan)
+        self.assertIn('Index Cond: ((menu_id = ', plan)
+        self.assertIn('AND (is_available = true)', plan)
@@ -0,0 +1,147 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant import kitchen
+from restaurant.models import Restaurant, Menu, Dish, Customer, Order, OrderItem, Delivery
+from restaurant.serializers import RestaurantSerializer
+
+
+@override_settings(KITCHEN_MAX_BACKLOG_MINUTES=None, ETA_KITCHEN_PARALLELISM=3)
+class KitchenLoadTestCase(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        menu = Menu.objects.create(name="Lunch Menu", restaurant=self.restaurant)
+        self.plov = Dish.objects.create(name="Plov", price=Decimal('30000'), menu=menu, prep_time_minutes=20)
+        self.somsa = Dish.objects.create(name="Somsa", price=Decimal('8000'), menu=menu, prep_time_minutes=5)
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+
+    def checkout(self, *items):
+        return self.client.post(reverse('order-checkout'), {
+            'restaurant_id': self.restaurant.id, 'customer_id': self.customer.id, 'delivery_address': "Chilonzor",
+            'items': [{'dish_id': dish.id, 'quantity': quantity} for dish, quantity in items],
+        }, format='json')
+
+    def load(self):
+        self.restaurant.refresh_from_db()
+        return self.restaurant.kitchen_load_minutes
+
+    def test_checkout_and_transitions_track_load(self):
+        first = self.checkout((self.plov, 1), (self.somsa, 2))
+        second = self.checkout((self.plov, 2))
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get(pk=first.data['id']).kitchen_minutes, 30)
+        self.assertEqual(self.load(), 70)
+
+        response = self.client.get(reverse('restaurant-detail', args=[self.restaurant.pk]))
+        self.assertEqual(response.data['kitchen_load_minutes'], 70)
+        etag = response['ETag']
+
+        # pending -> preparing navbatda qoladi, bekor qilish yuklamani kamaytiradi
+        self.client.post(reverse('order-bulk-transition'), {'ids': [first.data['id'], second.data['id']], 'status': 'preparing'}, format='json')
+        self.assertEqual(self.load(), 70)
+        self.client.post(reverse('order-transition', args=[second.data['id']]), {'status': 'cancelled'}, format='json')
+        self.assertEqual(self.load(), 30)
+
+        # Yetkazish olinganda buyurtma delivering ga o'tadi va oshxonadan chiqadi
+        delivery = Delivery.objects.create(order_id=first.data['id'])
+        self.client.post(reverse('delivery-bulk-transition'), {'ids': [delivery.pk], 'status': 'picked_up'}, format='json')
+        self.assertEqual(self.load(), 0)
+
+        # Yuklama updated_at ni o'zgartirmaydi, lekin ETag o'zgaradi
+        response = self.client.get(reverse('restaurant-detail', args=[self.restaurant.pk]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['kitchen_load_minutes'], 0)
+        print("✅ Oshxona yuklamasi checkout va holat o'tishlarida yangilandi")
+
+    def test_list_etag_follows_load_moving_between_restaurants(self):
+        other = Restaurant.objects.create(
+            name="Sushi Place", address="456 Side St", phone="998909998877", email="sushi@example.com",
+        )
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(kitchen_load_minutes=30)
+        response = self.client.get(reverse('restaurant-list'))
+        etag = response['ETag']
+        self.assertEqual(self.client.get(reverse('restaurant-list'), HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Yig'indi o'zgarmaydi (30), lekin yuklama boshqa restoranga ko'chdi
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(kitchen_load_minutes=10)
+        Restaurant.objects.filter(pk=other.pk).update(kitchen_load_minutes=20)
+        response = self.client.get(reverse('restaurant-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        print("✅ Restoranlar orasida ko'chgan yuklama ro'yxat ETag ini o'zgartirdi")
+
+    def test_restaurant_update_keeps_concurrent_load(self):
+        # get_object() dan keyin commit bo'lgan yuklama eskirgan nusxa bilan bosib ketilmaydi
+        stale = Restaurant.objects.get(pk=self.restaurant.pk)
+        kitchen.change_load(self.restaurant.pk, 25)
+        serializer = RestaurantSerializer(stale, data={'description': "Yangi"}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(self.load(), 25)
+        self.assertEqual(self.restaurant.description, "Yangi")
+
+        response = self.client.patch(
+            reverse('restaurant-detail', args=[self.restaurant.pk]), {'kitchen_capacity_minutes': 60}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.load(), 25)
+        print("✅ Restoranni tahrirlash oshxona yuklamasini bosib ketmadi")
+
+    def test_admission_control(self):
+        self.restaurant.kitchen_capacity_minutes = 30
+        self.restaurant.save()
+
+        # Bo'sh oshxona sig'imdan katta buyurtmani ham qabul qiladi
+        self.assertEqual(self.checkout((self.plov, 2)).status_code, status.HTTP_201_CREATED)
+        response = self.checkout((self.somsa, 1))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # Ortiqcha ish: 40 + 5 - 30 = 15 daqiqa, 3 ta oshpaz -> 300 soniya
+        self.assertEqual(response['Retry-After'], '300')
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(self.load(), 40)
+
+        Order.objects.update(status='cancelled')
+        call_command('rebuild_kitchen_load', stdout=StringIO())
+        self.assertEqual(self.load(), 0)
+        self.assertEqual(self.checkout((self.somsa, 1)).status_code, status.HTTP_201_CREATED)
+
+        with override_settings(KITCHEN_MAX_BACKLOG_MINUTES=5):
+            Restaurant.objects.update(kitchen_capacity_minutes=None)
+            self.assertEqual(self.checkout((self.somsa, 1)).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        print("✅ Oshxona sig'imidan oshgan buyurtma 429 bilan rad etildi")
+
+    def test_item_and_status_changes_and_rebuild(self):
+        order = Order.objects.create(delivery_address="Chilonzor 5", customer=self.customer, restaurant=self.restaurant)
+        item = OrderItem.objects.create(order=order, dish=self.plov, quantity=1, unit_price=self.plov.price)
+        OrderItem.objects.create(order=order, dish=self.somsa, quantity=2, unit_price=self.somsa.price)
+        self.assertEqual(self.load(), 30)
+
+        item.quantity = 3
+        item.save()
+        self.assertEqual(self.load(), 70)
+        item.delete()
+        self.assertEqual(self.load(), 10)
+
+        response = self.client.patch(reverse('order-detail', args=[order.pk]), {'status': 'cancelled'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.load(), 0)
+
+        order.refresh_from_db()
+        self.assertEqual(order.kitchen_minutes, 10)
+        Order.objects.filter(pk=order.pk).update(status='pending', kitchen_minutes=0)
+        call_command('rebuild_kitchen_load', stdout=StringIO())
+        self.assertEqual(self.load(), 10)
+        print("✅ OrderItem va holat o'zgarishlari yuklamaga qo'shildi, rebuild bir xil natija berdi")
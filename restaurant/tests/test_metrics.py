@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.metrics import QueryBudgetExceeded, registry
+from restaurant.models import Restaurant, Customer, Order
+from restaurant.views import OrderViewSet
+
+
+class QueryMetricsTestCase(APITestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+        restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+        Order.objects.create(delivery_address="Chilonzor 5", customer=customer, restaurant=restaurant)
+
+    def test_headers_and_histograms(self):
+        with self.settings(QUERY_METRICS_HEADERS=True):
+            response = self.client.get(reverse('order-list'), {'view': 'compact'})
+        self.assertEqual(response['X-Query-Count'], '3')
+        for header in ('X-DB-Time-Ms', 'X-Serialize-Time-Ms', 'X-Response-Time-Ms'):
+            self.assertGreaterEqual(float(response[header]), 0)
+        self.assertEqual(int(response['X-Response-Bytes']), len(response.content))
+
+        metrics = self.client.get(reverse('metrics')).data
+        order_list = metrics['order.list']
+        self.assertEqual(order_list['count'], 1)
+        self.assertEqual(order_list['queries']['sum'], 3)
+        self.assertEqual(order_list['queries']['buckets']['le_3'], 1)
+        print("✅ order.list metrikalari:", order_list['queries'])
+
+    def test_headers_hidden_outside_debug(self):
+        with self.settings(QUERY_METRICS_HEADERS=False):
+            response = self.client.get(reverse('order-list'))
+        self.assertNotIn('X-Query-Count', response)
+
+    def test_budget_exceeded_fails(self):
+        with mock.patch.object(OrderViewSet, 'query_budgets', {'list': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('order-list'))
+
+    def test_metrics_is_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user(username='mijoz', password='mijoz12345@'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
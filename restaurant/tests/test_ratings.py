@@ -0,0 +1,143 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.availability import index
+from restaurant.models import Restaurant, Customer, Driver, Order, Review
+from restaurant.ratings import check_half_life
+from restaurant.serializers import DriverSerializer
+
+
+class DriverRatingTestCase(APITestCase):
+
+    def setUp(self):
+        index.invalidate()
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+        self.order = Order.objects.create(delivery_address="Chilonzor 5", customer=self.customer, restaurant=self.restaurant)
+        self.sardor = Driver.objects.create(full_name="Sardor", phone="998900000001", vehicle_info="Nexia", is_online=True)
+        self.jasur = Driver.objects.create(full_name="Jasur", phone="998900000002", vehicle_info="Cobalt", is_online=True)
+
+    def tearDown(self):
+        index.invalidate()
+
+    def review(self, driver, rating):
+        return Review.objects.create(
+            order=self.order, customer=self.customer, restaurant=self.restaurant, driver=driver, rating=rating,
+        )
+
+    def test_incremental_rating(self):
+        first = self.review(self.sardor, 5)
+        second = self.review(self.sardor, 2)
+        self.sardor.refresh_from_db()
+        self.assertEqual((self.sardor.rating_sum, self.sardor.rating_count, self.sardor.rating), (7, 2, Decimal('3.50')))
+
+        # Baho o'zgarishi va boshqa haydovchiga o'tkazilishi
+        second.rating = 4
+        second.save()
+        first.driver = self.jasur
+        first.save()
+        self.sardor.refresh_from_db()
+        self.jasur.refresh_from_db()
+        self.assertEqual((self.sardor.rating_count, self.sardor.rating), (1, Decimal('4.00')))
+        self.assertEqual((self.jasur.rating_count, self.jasur.rating), (1, Decimal('5.00')))
+
+        second.delete()
+        self.sardor.refresh_from_db()
+        self.assertEqual((self.sardor.rating_sum, self.sardor.rating_count, self.sardor.rating), (0, 0, Decimal('0.00')))
+        print("✅ Haydovchi reytingi sharhlar bilan bosqichma-bosqich yangilandi")
+
+    def test_review_api_updates_rating_and_index(self):
+        index.rebuild()
+        url = reverse('review-list')
+        payload = {
+            'customer_id': self.customer.pk, 'restaurant_id': self.restaurant.pk,
+            'order': self.order.pk, 'driver': self.jasur.pk, 'rating': 5,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.jasur.refresh_from_db()
+        self.assertEqual(self.jasur.rating, Decimal('5.00'))
+        # Indeks yangi reytingni ko'radi: eng yuqori reytingli bo'sh haydovchi birinchi
+        self.assertEqual(index.claim(), self.jasur.pk)
+
+        self.client.patch(reverse('driver-detail', args=[self.jasur.pk]), {'rating': '1.00'}, format='json')
+        self.jasur.refresh_from_db()
+        self.assertEqual(self.jasur.rating, Decimal('5.00'))
+
+        # Ro'yxat sharhlarni skanerlamaydi
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('driver-list'))
+        self.assertNotIn('restaurant_review', ' '.join(query['sql'] for query in queries.captured_queries))
+        self.assertEqual(response.json()[0]['id'], self.jasur.pk)
+        print("✅ Sharh API si haydovchi reytingi va indeksini yangiladi")
+
+    def test_driver_update_keeps_concurrent_review(self):
+        index.rebuild()
+        # get_object() dan keyin yozilgan sharh haydovchini tahrirlashda yo'qolmaydi
+        stale = Driver.objects.get(pk=self.jasur.pk)
+        self.review(self.jasur, 5)
+        serializer = DriverSerializer(stale, data={'vehicle_info': "Malibu"}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+        self.jasur.refresh_from_db()
+        self.assertEqual((self.jasur.rating_count, self.jasur.rating_sum, self.jasur.vehicle_info), (1, 5, "Malibu"))
+        self.assertEqual(self.jasur.rating, Decimal('5.00'))
+        # Indeks bazadagi reytingni oladi, eskirgan nusxadagi 0 ni emas
+        self.assertEqual(index.claim(), self.jasur.pk)
+        print("✅ Haydovchini tahrirlash parallel sharh yig'indilarini bosib ketmadi")
+
+    @override_settings(DRIVER_RATING_HALF_LIFE_DAYS=30)
+    def test_decay_and_recompute_match(self):
+        old = self.review(self.sardor, 1)
+        Review.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=60))
+        self.sardor.refresh_from_db()
+        # Yaratilgandagi vazn bilan: oddiy o'rtacha
+        self.assertEqual(self.sardor.rating, Decimal('1.00'))
+
+        # Eski sharh vaznini qayta hisoblash bilan to'g'rilab, yangisini qo'shamiz
+        call_command('recompute_driver_ratings', stdout=StringIO())
+        self.review(self.sardor, 5)
+        incremental = Driver.objects.get(pk=self.sardor.pk)
+        # 60 kun = 2 yarim umr: eski sharh vazni 1/4 -> (1*0.25 + 5) / 1.25 = 4.2
+        self.assertEqual(incremental.rating, Decimal('4.20'))
+
+        Driver.objects.update(rating=0, rating_sum=0, rating_count=0, rating_decay_sum=0, rating_decay_weight=0)
+        with CaptureQueriesContext(connection) as queries:
+            call_command('recompute_driver_ratings', stdout=StringIO())
+        self.assertEqual(sum('restaurant_review' in query['sql'] for query in queries.captured_queries), 1)
+        recomputed = Driver.objects.get(pk=self.sardor.pk)
+        self.assertEqual(
+            (recomputed.rating, recomputed.rating_sum, recomputed.rating_count),
+            (incremental.rating, incremental.rating_sum, incremental.rating_count),
+        )
+        self.assertAlmostEqual(recomputed.rating_decay_weight / incremental.rating_decay_weight, 1, places=9)
+        self.assertEqual(Driver.objects.get(pk=self.jasur.pk).rating, Decimal('0.00'))
+        print("✅ Vaqt bo'yicha so'nuvchi reyting va guruhlangan qayta hisoblash bir xil")
+
+    def test_half_life_is_checked_at_startup(self):
+        for days, errors in ((None, []), (30, []), (2, ['restaurant.E002']), (0, ['restaurant.E001']), ('7', ['restaurant.E001'])):
+            with override_settings(DRIVER_RATING_HALF_LIFE_DAYS=days):
+                self.assertEqual([error.id for error in check_half_life(None)], errors, days)
+        # manage.py check (va runserver/migrate) noto'g'ri sozlama bilan to'xtaydi
+        with override_settings(DRIVER_RATING_HALF_LIFE_DAYS=2), self.assertRaises(SystemCheckError):
+            call_command('check', stdout=StringIO(), stderr=StringIO())
+        print("✅ Vazn float dan chiqadigan yarim umr ishga tushishda rad etildi")
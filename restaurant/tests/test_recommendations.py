@@ -0,0 +1,145 @@
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.models import (
+    Restaurant, Menu, Dish, Customer, Order, OrderItem, RestaurantLike, Review,
+    DishRecommendation, CustomerRecommendation,
+)
+from restaurant.recommendations import basket_pairs, top_k, build_all
+
+
+@override_settings(RECOMMENDATION_TOP_K=5)
+class RecommendationTestCase(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.burgers, self.sushi, self.pizza, self.plov = [
+            Restaurant.objects.create(
+                name=name, address="123 Main St", phone=f"99890111223{index}", email=f"r{index}@example.com",
+            )
+            for index, name in enumerate(["Burger House", "Sushi Place", "Pizza Town", "Plov Center"])
+        ]
+        menu = Menu.objects.create(name="Lunch Menu", restaurant=self.burgers)
+        self.burger, self.fries, self.cola, self.salad = [
+            Dish.objects.create(name=name, price=Decimal('20000'), menu=menu)
+            for name in ["Burger", "Fries", "Cola", "Salad"]
+        ]
+        self.customers = [
+            Customer.objects.create(full_name=f"Mijoz {index}", email=f"c{index}@example.com", phone=f"99890123456{index}")
+            for index in range(4)
+        ]
+
+    def order(self, customer, restaurant, dishes=(), status='completed'):
+        order = Order.objects.create(
+            delivery_address="Chilonzor 5", customer=customer, restaurant=restaurant, status=status,
+        )
+        for dish in dishes:
+            OrderItem.objects.create(order=order, dish=dish, quantity=1, unit_price=dish.price)
+        return order
+
+    def test_basket_pairs_and_top_k(self):
+        groups = np.array([1, 1, 1, 2, 2, 3])
+        items = np.array([10, 20, 30, 10, 10, 40])
+        left, right = basket_pairs(groups, items)
+        pairs = sorted(zip(items[left].tolist(), items[right].tolist()))
+        # Bir buyurtmadagi bir xil taom juftlik hosil qilmaydi, yolg'iz taom ham
+        self.assertEqual(pairs, [(10, 20), (10, 30), (20, 10), (20, 30), (30, 10), (30, 20)])
+
+        rows = top_k(np.array([1, 1, 1, 2]), np.array([5, 6, 7, 5]), np.array([0.2, 0.9, 0.5, 0.1]), 2)
+        self.assertEqual(rows, {1: ([6, 7], [0.9, 0.5]), 2: ([5], [0.1])})
+        print("✅ Savat juftliklari va top-K NumPy bilan hisoblandi")
+
+    def test_also_ordered(self):
+        customer = self.customers[0]
+        self.order(customer, self.burgers, [self.burger, self.fries, self.cola])
+        self.order(customer, self.burgers, [self.burger, self.fries])
+        self.order(customer, self.burgers, [self.burger, self.salad])
+        self.order(customer, self.burgers, [self.cola, self.salad], status='cancelled')
+
+        with override_settings(RECOMMENDATION_BATCH_SIZE=1):
+            call_command('build_recommendations', stdout=StringIO())
+        row = DishRecommendation.objects.get(pk=self.burger.pk)
+        self.assertEqual(row.dish_ids, [self.fries.pk, self.cola.pk, self.salad.pk])
+        # Kosinus: 2 / sqrt(3 * 2)
+        self.assertAlmostEqual(row.scores[0], 2 / np.sqrt(6), places=5)
+        # Bekor qilingan buyurtma hisobga olinmaydi
+        self.assertNotIn(self.salad.pk, DishRecommendation.objects.get(pk=self.cola.pk).dish_ids)
+
+        self.salad.is_available = False
+        self.salad.save()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dish-also-ordered', args=[self.burger.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([dish['id'] for dish in response.data], [self.fries.pk, self.cola.pk])
+        self.assertEqual(response.data[0]['name'], "Fries")
+        # Narx boshqa taom endpointlari kabi Decimal satr ko'rinishida
+        self.assertEqual(response.json()[0]['price'], '20000.00')
+        self.assertEqual(response.data[0]['menu_id'], self.burger.menu_id)
+
+        # Qatori yo'q taom bo'sh ro'yxat, mavjud bo'lmagan taom 404
+        other = Dish.objects.create(name="Tea", price=Decimal('5000'), menu=self.burger.menu)
+        self.assertEqual(self.client.get(reverse('dish-also-ordered', args=[other.pk])).data, [])
+        self.assertEqual(
+            self.client.get(reverse('dish-also-ordered', args=[other.pk + 100])).status_code, status.HTTP_404_NOT_FOUND,
+        )
+        print("✅ 'Birga buyurtma qilinadi' top-K jadvaldan o'qildi")
+
+    def test_recommended_restaurants(self):
+        ali, vali, sardor, new = self.customers
+        # burgers va sushi bir xil mijozlarda, pizza — boshqa mijozda
+        for customer in (ali, vali):
+            self.order(customer, self.burgers)
+            RestaurantLike.objects.create(customer=customer, restaurant=self.sushi)
+        self.order(vali, self.burgers)
+        self.order(sardor, self.pizza)
+        self.order(sardor, self.burgers)
+        Review.objects.create(
+            customer=sardor, restaurant=self.plov, rating=1, comment="Yomon",
+            order=self.order(sardor, self.plov, status='cancelled'),
+        )
+
+        build_all()
+        user = User.objects.create_user(username='sardor', password='sardor12345@')
+        Customer.objects.filter(pk=sardor.pk).update(user=user)
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('restaurant-recommended'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Tanlangan restoranlar (yomon baho berilgan plov ham) tavsiya qilinmaydi
+        self.assertEqual([restaurant['id'] for restaurant in response.data], [self.sushi.pk])
+        self.assertGreater(response.data[0]['score'], 0)
+
+        # Tarixsiz mijoz uchun eng ko'p layk olgan restoranlar
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('restaurant-recommended'), {'customer': new.pk})
+        self.assertEqual(response.data[0]['id'], self.sushi.pk)
+        self.assertIsNone(response.data[0]['score'])
+        self.assertEqual(
+            self.client.get(reverse('restaurant-recommended'), {'customer': 'x'}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+        # Qayta qurish eskirgan qatorlarni o'chiradi, partiya hajmi natijani o'zgartirmaydi
+        Order.objects.filter(customer=sardor).update(status='cancelled')
+        Review.objects.filter(customer=sardor).delete()
+        RestaurantLike.objects.create(customer=sardor, restaurant=self.pizza)
+        self.order(ali, self.plov)
+        build_all()
+        before = dict(CustomerRecommendation.objects.values_list('pk', 'restaurant_ids'))
+        with override_settings(RECOMMENDATION_BATCH_SIZE=1):
+            build_all()
+        after = dict(CustomerRecommendation.objects.values_list('pk', 'restaurant_ids'))
+        self.assertNotIn(sardor.pk, after)
+        self.assertEqual(after, {vali.pk: [self.plov.pk]})
+        self.assertEqual(before, after)
+        print("✅ Mijozga restoranlar tavsiyasi va ommabop restoranlar zaxirasi ishladi")
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from restaurant.models import Restaurant, Menu, Dish, Customer, Order, OrderItem, RestaurantLike
+from restaurant.trending import SlidingWindowCounter, index as trending_index
+
+
+@override_settings(TRENDING_INDEX_TTL=3600, TRENDING_MAX_K=10)
+class TrendingTestCase(APITestCase):
+
+    def setUp(self):
+        trending_index.invalidate()
+        self.user = User.objects.create_user(username='admin', password='admin12345@', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+        self.restaurant = Restaurant.objects.create(
+            name="FastFood King", address="123 Main St", phone="998901112233", email="fastfood@example.com",
+        )
+        self.other = Restaurant.objects.create(
+            name="Sushi Place", address="456 Side St", phone="998909998877", email="sushi@example.com",
+        )
+        menu = Menu.objects.create(name="Lunch Menu", restaurant=self.restaurant)
+        self.plov = Dish.objects.create(name="Plov", price=Decimal('30000'), menu=menu)
+        self.somsa = Dish.objects.create(name="Somsa", price=Decimal('8000'), menu=menu)
+        self.customer = Customer.objects.create(full_name="Ali Valiyev", email="ali@example.com", phone="998901234567")
+
+    def tearDown(self):
+        trending_index.invalidate()
+
+    def order(self, placed_at, *items):
+        order = Order.objects.create(delivery_address="Chilonzor 5", customer=self.customer, restaurant=self.restaurant)
+        Order.objects.filter(pk=order.pk).update(placed_at=placed_at)
+        for dish, quantity in items:
+            OrderItem.objects.create(order=order, dish=dish, quantity=quantity, unit_price=dish.price)
+
+    def test_sliding_window_counter(self):
+        counter = SlidingWindowCounter({'short': 2, 'long': 5})
+        counter.advance(100)
+        counter.add(1, 96, 4)
+        counter.add(1, 100, 1)
+        counter.add(2, 99, 3)
+        counter.add(3, 95, 7)            # ikkala oynadan ham tashqarida
+        self.assertEqual(counter.top('short', 5), [(2, 3), (1, 1)])
+        self.assertEqual(counter.top('long', 5), [(1, 5), (2, 3)])
+
+        counter.advance(101)
+        counter.add(2, 101, 1)
+        # Teng sonlarda kichik id oldin
+        self.assertEqual(counter.top('short', 5), [(1, 1), (2, 1)])
+        self.assertEqual(counter.top('long', 1), [(2, 4)])
+
+        # Eski savatlar oynadan chiqadi va xotiradan o'chiriladi
+        counter.advance(110)
+        self.assertEqual(counter.top('long', 5), [])
+        self.assertEqual(counter._buckets, {})
+        print("✅ Daqiqalik savatlar oynalardan o'z vaqtida chiqdi")
+
+    def test_rebuild_live_updates_and_endpoint(self):
+        now = timezone.now()
+        self.order(now - timedelta(minutes=10), (self.plov, 2))
+        self.order(now - timedelta(hours=3), (self.somsa, 5))
+        self.order(now - timedelta(days=2), (self.somsa, 50))
+        like = RestaurantLike.objects.create(customer=self.customer, restaurant=self.other)
+        RestaurantLike.objects.filter(pk=like.pk).update(created_at=now - timedelta(hours=2))
+
+        response = self.client.get(reverse('trending'), {'window': 'hour'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['dishes'], [{'id': self.plov.pk, 'count': 2}])
+        self.assertEqual(response.data['restaurants'], [])
+        response = self.client.get(reverse('trending'), {'window': 'day'})
+        self.assertEqual(response.data['dishes'], [
+            {'id': self.somsa.pk, 'count': 5}, {'id': self.plov.pk, 'count': 2},
+        ])
+        self.assertEqual(response.data['restaurants'], [{'id': self.other.pk, 'count': 1}])
+
+        # Yangi hodisalar (checkout dagi bulk_create ham) indeksga commit dan keyin qo'shiladi
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post(reverse('order-checkout'), {
+                'restaurant_id': self.restaurant.id, 'customer_id': self.customer.id, 'delivery_address': "Chilonzor",
+                'items': [{'dish_id': self.somsa.id, 'quantity': 3}],
+            }, format='json')
+            RestaurantLike.objects.create(customer=self.customer, restaurant=self.restaurant)
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('trending'), {'window': 'hour', 'k': 1})
+        self.assertEqual(response.data['dishes'], [{'id': self.somsa.pk, 'count': 3}])
+        self.assertEqual(response.data['restaurants'], [{'id': self.restaurant.pk, 'count': 1}])
+
+        # Qayta qurish bir xil natija beradi
+        trending_index.invalidate()
+        self.assertEqual(self.client.get(reverse('trending'), {'window': 'hour', 'k': 1}).data, response.data)
+
+        for params in ({'window': 'week'}, {'k': 0}, {'k': 'x'}, {'k': 11}):
+            self.assertEqual(self.client.get(reverse('trending'), params).status_code, status.HTTP_400_BAD_REQUEST)
+        print("✅ Trend taomlar va restoranlar xotiradagi hisoblagichdan, SQL siz qaytarildi")
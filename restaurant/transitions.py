@@ -0,0 +1,139 @@
+"""
+Order va Delivery holat mashinasi.
+
+Ruxsat etilgan o'tishlar modellardagi TRANSITIONS lug'atida. O'tishlar bitta
+shartli UPDATE ... WHERE status = ANY(...) bilan bajariladi: holati mos kelmagan
+qatorlar o'zgarmaydi, RETURNING esa haqiqatan o'zgargan qatorlarni qaytaradi.
+Bog'langan yetkazish (yoki buyurtma) va pickup_at/delivered_at o'sha so'rovning
+o'zida, PostgreSQL ning ma'lumot o'zgartiruvchi CTE si orqali yangilanadi.
+UPDATE signal yubormaydi, shuning uchun haydovchilar indeksi qo'lda, oshxona navbatidan
+chiqqan buyurtmalar ishi esa restoranlar yuklamasidan o'sha CTE ichida ayiriladi.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import kitchen
+from .availability import index as availability_index
+from .models import Order, Delivery
+
+# Buyurtma holati -> unga mos yetkazish holati (va aksincha). Bekor qilingan buyurtmaning
+# yetkazishi ham bekor bo'ladi, lekin yetkazishni bekor qilish buyurtmani bekor qilmaydi
+DELIVERY_FOR_ORDER = {'delivering': 'picked_up', 'completed': 'delivered', 'cancelled': 'cancelled'}
+ORDER_FOR_DELIVERY = {'picked_up': 'delivering', 'delivered': 'completed'}
+# Bu holatlarga o'tgan yetkazishlar haydovchini bo'shatadi
+FINISHED_DELIVERY_STATUSES = ('delivered', 'cancelled')
+
+
+def can_transition(model, current, target):
+    return target in model.TRANSITIONS.get(current, ())
+
+
+def sources(model, target):
+    """target holatiga o'tish mumkin bo'lgan holatlar"""
+    return [status for status, targets in model.TRANSITIONS.items() if target in targets]
+
+
+def _earlier_delivery_statuses(target):
+    # Yetkazish buyurtmadan orqada qolgan bo'lsa ham (masalan assigned -> delivered) yetib oladi
+    if target == 'cancelled':
+        # Bekor qilinadigan buyurtmalar (pending/preparing) yetkazishi hali olinmagan
+        return ['assigned']
+    statuses = [status for status, _ in Delivery.STATUS_CHOICES]
+    return statuses[:statuses.index(target)]
+
+
+def _delivery_assignments(target, now, alias):
+    """Yetkazish holati va vaqt ustunlari uchun SET qismi va parametrlari"""
+    qn = connection.ops.quote_name
+    assignments = ['status = %s', 'updated_at = %s']
+    params = [target, now]
+    if target == 'cancelled':
+        return ', '.join(assignments), params
+    # delivered ga to'g'ridan-to'g'ri o'tilsa ham pickup_at bo'sh qolmaydi
+    assignments.append(f'pickup_at = COALESCE({alias}.{qn("pickup_at")}, %s)')
+    params.append(now)
+    if target == 'delivered':
+        assignments.append('delivered_at = %s')
+        params.append(now)
+    return ', '.join(assignments), params
+
+
+def _finish_deliveries(driver_ids):
+    driver_ids = [driver_id for driver_id in driver_ids if driver_id is not None]
+
+    def release():
+        for driver_id in driver_ids:
+            availability_index.delivery_finished(driver_id)
+
+    if driver_ids:
+        transaction.on_commit(release)
+
+
+def transition_orders(order_ids, target):
+    """
+    Buyurtmalarni target holatiga o'tkazadi, o'zgargan buyurtma id larini qaytaradi.
+    delivering/completed/cancelled da bog'langan yetkazish picked_up/delivered/cancelled bo'ladi.
+    """
+    qn = connection.ops.quote_name
+    now = timezone.now()
+    order_table = qn(Order._meta.db_table)
+    delivery_table = qn(Delivery._meta.db_table)
+    changed_sql = (
+        f'UPDATE {order_table} SET status = %s, updated_at = %s '
+        f'WHERE id = ANY(%s) AND status = ANY(%s) RETURNING id, restaurant_id, kitchen_minutes'
+    )
+    order_sources = sources(Order, target)
+    params = [target, now, list(order_ids), order_sources]
+    ctes = [f'changed AS ({changed_sql})']
+    select = 'SELECT changed.id, NULL FROM changed'
+
+    delivery_status = DELIVERY_FOR_ORDER.get(target)
+    if delivery_status is not None:
+        assignments, delivery_params = _delivery_assignments(delivery_status, now, 'd')
+        ctes.append(
+            f'moved AS (UPDATE {delivery_table} AS d SET {assignments} FROM changed '
+            f'WHERE d.order_id = changed.id AND d.status = ANY(%s) RETURNING d.order_id, d.driver_id)'
+        )
+        select = 'SELECT changed.id, moved.driver_id FROM changed LEFT JOIN moved ON moved.order_id = changed.id'
+        params += [*delivery_params, _earlier_delivery_statuses(delivery_status)]
+    if kitchen.leaves_kitchen(order_sources, target):
+        ctes.append(f'unloaded AS ({kitchen.unload_sql("changed")})')
+    sql = f'WITH {", ".join(ctes)} {select}'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        if DELIVERY_FOR_ORDER.get(target) in FINISHED_DELIVERY_STATUSES:
+            _finish_deliveries(driver_id for _, driver_id in rows)
+    return sorted(order_id for order_id, _ in rows)
+
+
+def transition_deliveries(delivery_ids, target):
+    """
+    Yetkazishlarni target holatiga o'tkazadi, o'zgargan yetkazish id larini qaytaradi.
+    Bog'langan buyurtma delivering/completed holatiga o'tadi (agar o'tishi mumkin bo'lsa).
+    """
+    qn = connection.ops.quote_name
+    now = timezone.now()
+    order_table = qn(Order._meta.db_table)
+    delivery_table = qn(Delivery._meta.db_table)
+    assignments, params = _delivery_assignments(target, now, 'd')
+    order_status = ORDER_FOR_DELIVERY[target]
+    ctes = [
+        f'moved AS (UPDATE {delivery_table} AS d SET {assignments} '
+        f'WHERE d.id = ANY(%s) AND d.status = ANY(%s) RETURNING d.id, d.order_id, d.driver_id)',
+        f'changed AS (UPDATE {order_table} AS o SET status = %s, updated_at = %s FROM moved '
+        f'WHERE o.id = moved.order_id AND o.status = ANY(%s) RETURNING o.id, o.restaurant_id, o.kitchen_minutes)',
+    ]
+    order_sources = sources(Order, order_status)
+    if kitchen.leaves_kitchen(order_sources, order_status):
+        ctes.append(f'unloaded AS ({kitchen.unload_sql("changed")})')
+    sql = f'WITH {", ".join(ctes)} SELECT moved.id, moved.driver_id FROM moved'
+    params += [list(delivery_ids), sources(Delivery, target), order_status, now, order_sources]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        if target in FINISHED_DELIVERY_STATUSES:
+            _finish_deliveries(driver_id for _, driver_id in rows)
+    return sorted(delivery_id for delivery_id, _ in rows)
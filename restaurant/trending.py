@@ -0,0 +1,174 @@
+"""
+"Hozir trendda": oxirgi soat va kunda eng ko'p buyurtma qilingan taomlar va layk olgan restoranlar.
+
+Har bir hisoblagich daqiqalik savatlarda saqlanadi ({daqiqa: {id: son}}), har bir oyna uchun
+esa tayyor yig'indi ({id: son}). Yangi hodisa o'z savatiga va hali oynadan chiqmagan yig'indilarga
+qo'shiladi; vaqt o'tishi bilan oynadan chiqqan savatlar yig'indidan ayiriladi. Top-K ro'yxat
+yig'indi o'zgarganda bir marta tartiblanadi va keyingi o'qishlar uni tayyor holda oladi —
+javob buyurtmalar soniga bog'liq emas va bazaga murojaat qilmaydi.
+
+Indeks jarayon (process) ichida yashaydi: OrderItem va RestaurantLike yaratilishi (signallar,
+checkout dagi bulk_create) uni to'ldiradi, TRENDING_INDEX_TTL soniyadan keyin esa bazadan
+qayta quriladi, shunda boshqa jarayonlardagi hodisalar ham yetib keladi.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+WINDOWS = {'hour': 60, 'day': 24 * 60}
+
+
+def minute_of(moment):
+    return int(moment.timestamp() // 60)
+
+
+class SlidingWindowCounter:
+    """Daqiqalik savatlar ustidagi bir nechta sirpanuvchi oyna hisoblagichi"""
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = dict(windows)
+        self.longest = max(self.windows, key=self.windows.get)
+        self.span = self.windows[self.longest]
+        self._buckets = {}
+        self._minutes = []        # savatlar daqiqalari, tartiblangan
+        self._totals = {window: {} for window in self.windows}
+        self._cutoffs = {window: None for window in self.windows}
+        self._top = {}
+
+    def _subtract(self, window, minute):
+        totals = self._totals[window]
+        for key, count in self._buckets[minute].items():
+            left = totals[key] - count
+            if left > 0:
+                totals[key] = left
+            else:
+                del totals[key]
+
+    def advance(self, now_minute):
+        """Oynadan chiqqan savatlarni yig'indilardan ayiradi, eng katta oynadan eskilarini o'chiradi"""
+        for window, size in self.windows.items():
+            cutoff = now_minute - size + 1
+            previous = self._cutoffs[window]
+            if previous is not None and cutoff <= previous:
+                continue
+            start = bisect_left(self._minutes, previous) if previous is not None else 0
+            end = bisect_left(self._minutes, cutoff)
+            for minute in self._minutes[start:end]:
+                self._subtract(window, minute)
+            if end > start:
+                self._top.pop(window, None)
+            self._cutoffs[window] = cutoff
+        expired = bisect_left(self._minutes, self._cutoffs[self.longest])
+        for minute in self._minutes[:expired]:
+            del self._buckets[minute]
+        del self._minutes[:expired]
+
+    def add(self, key, minute, count=1):
+        if not count:
+            return
+        oldest = self._cutoffs[self.longest]
+        if oldest is not None and minute < oldest:
+            return
+        bucket = self._buckets.get(minute)
+        if bucket is None:
+            bucket = self._buckets[minute] = {}
+            insort(self._minutes, minute)
+        bucket[key] = bucket.get(key, 0) + count
+        for window, cutoff in self._cutoffs.items():
+            if cutoff is None or minute >= cutoff:
+                totals = self._totals[window]
+                totals[key] = totals.get(key, 0) + count
+                self._top.pop(window, None)
+
+    def top(self, window, k):
+        """[(id, son), ...] kamayish tartibida; tartiblangan ro'yxat keyingi o'zgarishgacha saqlanadi"""
+        ranked = self._top.get(window)
+        if ranked is None or (len(ranked) < k and len(ranked) < len(self._totals[window])):
+            size = max(k, settings.TRENDING_MAX_K)
+            ranked = self._top[window] = heapq.nlargest(
+                size, self._totals[window].items(), key=lambda item: (item[1], -item[0]),
+            )
+        return ranked[:k]
+
+
+class TrendingIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.dishes = SlidingWindowCounter()
+        self.restaurants = SlidingWindowCounter()
+        self._loaded_at = None
+
+    def rebuild(self, now=None):
+        from .models import OrderItem, RestaurantLike
+
+        now = now or timezone.now()
+        since = now - timedelta(minutes=self.dishes.span)
+        dish_rows = (
+            OrderItem.objects.filter(order__placed_at__gt=since)
+            .order_by()
+            .values('dish_id', minute=TruncMinute('order__placed_at'))
+            .annotate(count=Sum('quantity'))
+            .values_list('dish_id', 'minute', 'count')
+        )
+        like_rows = (
+            RestaurantLike.objects.filter(created_at__gt=since)
+            .order_by()
+            .values('restaurant_id', minute=TruncMinute('created_at'))
+            .annotate(count=Count('id'))
+            .values_list('restaurant_id', 'minute', 'count')
+        )
+        with self._lock:
+            self._reset()
+            current = minute_of(now)
+            for counter, rows in ((self.dishes, dish_rows), (self.restaurants, like_rows)):
+                counter.advance(current)
+                for key, minute, count in rows:
+                    counter.add(key, minute_of(minute), count)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def ensure_loaded(self, now=None):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > settings.TRENDING_INDEX_TTL:
+            self.rebuild(now)
+
+    def dishes_ordered(self, items, moment=None):
+        """items — [(dish_id, quantity), ...]"""
+        minute = minute_of(moment or timezone.now())
+        with self._lock:
+            for dish_id, quantity in items:
+                self.dishes.add(dish_id, minute, quantity)
+
+    def restaurant_liked(self, restaurant_id, moment=None):
+        minute = minute_of(moment or timezone.now())
+        with self._lock:
+            self.restaurants.add(restaurant_id, minute)
+
+    def top(self, window, k, now=None):
+        """{'dishes': [(id, son), ...], 'restaurants': [...]} — window oynasi bo'yicha"""
+        now = now or timezone.now()
+        self.ensure_loaded(now)
+        current = minute_of(now)
+        with self._lock:
+            self.dishes.advance(current)
+            self.restaurants.advance(current)
+            return {'dishes': self.dishes.top(window, k), 'restaurants': self.restaurants.top(window, k)}
+
+
+index = TrendingIndex()
@@ -3,9 +3,12 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     RestaurantViewSet, MenuViewSet, DishViewSet,
     CustomerViewSet, DriverViewSet, OrderViewSet,
-    OrderItemViewSet, PaymentViewSet, DeliveryViewSet, ReviewViewSet
+    OrderItemViewSet, PaymentViewSet, DeliveryViewSet, ReviewViewSet,
+    DailyStatsViewSet, ExportView, MetricsView, TrendingView,
 )
 
+from .async_views import AsyncRestaurantView, AsyncMenuView, AsyncDishView, AsyncOrderView
+
 router = DefaultRouter()
 router.register(r'restaurants', RestaurantViewSet)
 router.register(r'menus', MenuViewSet)
@@ -17,7 +20,21 @@ router.register(r'order-items', OrderItemViewSet)
 router.register(r'payments', PaymentViewSet)
 router.register(r'deliveries', DeliveryViewSet)
 router.register(r'reviews', ReviewViewSet)
+router.register(r'analytics', DailyStatsViewSet)
 
 urlpatterns = [
+    path('api/export/<str:dataset>/', ExportView.as_view(), name='export'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+    path('api/trending/', TrendingView.as_view(), name='trending'),
     path('api/', include(router.urls)),
+
+    # ASGI-native o'qish endpointlari (restaurant/async_views.py)
+    path('api/async/restaurants/', AsyncRestaurantView.as_view(), name='async-restaurant-list'),
+    path('api/async/restaurants/<int:pk>/', AsyncRestaurantView.as_view(), name='async-restaurant-detail'),
+    path('api/async/menus/', AsyncMenuView.as_view(), name='async-menu-list'),
+    path('api/async/menus/<int:pk>/', AsyncMenuView.as_view(), name='async-menu-detail'),
+    path('api/async/dishes/', AsyncDishView.as_view(), name='async-dish-list'),
+    path('api/async/dishes/<int:pk>/', AsyncDishView.as_view(), name='async-dish-detail'),
+    path('api/async/orders/', AsyncOrderView.as_view(), name='async-order-list'),
+    path('api/async/orders/<int:pk>/', AsyncOrderView.as_view(), name='async-order-detail'),
 ]
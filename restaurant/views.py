@@ -1,4 +1,14 @@
-from rest_framework import viewsets, permissions,filters
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import viewsets, permissions,filters, status, serializers
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django_filters.filterset import filterset_factory
 from django_filters.rest_framework import DjangoFilterBackend
 
 
@@ -6,72 +16,227 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import (
     Restaurant, Menu, Dish,
     Customer, Driver, Order, OrderItem,
-    Payment, Delivery, Review
+    Payment, Delivery, Review, DailyRestaurantStats, DailyDishStats,
+    DishRecommendation, CustomerRecommendation,
 )
 from .serializers import (
     RestaurantSerializer, MenuSerializer, DishSerializer,
     CustomerSerializer, DriverSerializer, OrderSerializer,
-    OrderItemSerializer, PaymentSerializer, DeliverySerializer, ReviewSerializer
+    OrderItemSerializer, PaymentSerializer, DeliverySerializer, ReviewSerializer,
+    OrderCompactSerializer, PaymentCompactSerializer, DeliveryCompactSerializer,
+    OrderCheckoutSerializer, OrderTransitionSerializer, OrderBulkTransitionSerializer,
+    DeliveryTransitionSerializer, DeliveryBulkTransitionSerializer, DailyRestaurantStatsSerializer,
+    MenuBulkSerializer, DishBulkSerializer, RestaurantSummarySerializer, DishSummarySerializer,
 )
+from .mixins import (
+    CompactViewMixin, QueryPlanMixin, CachedResponseMixin, ConditionalGetMixin, TransitionMixin, QueryBudgetMixin,
+    BulkWriteMixin,
+)
+from .metrics import registry as metrics_registry
+from .search import FullTextSearchFilter
+from .availability import index as availability_index
+from .trending import index as trending_index, WINDOWS as TRENDING_WINDOWS
+from .transitions import transition_orders, transition_deliveries
+from . import export
+from .pagination import OrderPagination, ReviewPagination, DeliveryPagination
+
+
+def _int_or_404(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise NotFound()
+
+
+def _int_or_400(field, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({field: "Butun son kiriting."})
+
+
+def reviews_with_customers(lookup='reviews'):
+    return Prefetch(lookup, queryset=Review.objects.select_related('customer'))
+
+
+def order_items_with_dishes(lookup='items'):
+    return Prefetch(lookup, queryset=OrderItem.objects.select_related('dish__menu__restaurant'))
+
+
+def order_select_related(prefix=''):
+    return [f'{prefix}customer__user', f'{prefix}restaurant', f'{prefix}driver']
 
 
-class RestaurantViewSet(viewsets.ModelViewSet):
+def order_prefetches(prefix=''):
+    """OrderSerializer ichidagi restoran, taom va sharhlar daraxti uchun prefetch rejasi"""
+    return [
+        reviews_with_customers(f'{prefix}restaurant__reviews'),
+        order_items_with_dishes(f'{prefix}items'),
+        reviews_with_customers(f'{prefix}items__dish__menu__restaurant__reviews'),
+    ]
+
+
+class RestaurantViewSet(QueryBudgetMixin, ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter,filters.OrderingFilter]
+    query_budgets = {'list': 4, 'retrieve': 4, 'recommended': 4}
+    # Oshxona yuklamasi updated_at ni o'zgartirmaydi (restaurant/kitchen.py)
+    etag_value_fields = ('kitchen_load_minutes',)
+    prefetch_related_map = {'reviews': [reviews_with_customers()]}
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['name']
     search_fields = ['name', 'address', 'phone']
-    ordering_fields = ['name', 'created_at']
+    search_vector_fields = ['search_vector']
+    search_trigram_fields = ['name']
+    ordering_fields = ['name', 'created_at', 'likes_count', 'comments_count', 'rating_count']
     permission_classes = [permissions.IsAuthenticated]
 
+    @action(detail=False)
+    def recommended(self, request):
+        """
+        Mijozga tavsiya qilinadigan restoranlar (build_recommendations top-K jadvalidan).
+        Tavsiya bo'lmasa — eng ko'p layk olgan restoranlar. Admin ?customer=ID berishi mumkin.
+        """
+        customer_id = getattr(getattr(request.user, 'customer_profile', None), 'pk', None)
+        if request.user.is_staff and 'customer' in request.query_params:
+            customer_id = _int_or_400('customer', request.query_params['customer'])
+
+        fields = ('id', 'name', 'likes_count', 'rating_sum', 'rating_count')
+        row = (
+            CustomerRecommendation.objects.filter(pk=customer_id).values_list('restaurant_ids', 'scores').first()
+            if customer_id is not None else None
+        )
+        if row is not None:
+            restaurant_ids, scores = row
+            restaurants = Restaurant.objects.filter(is_active=True).only(*fields).in_bulk(restaurant_ids)
+            suggestions = [
+                {**RestaurantSummarySerializer(restaurants[restaurant_id]).data, 'score': score}
+                for restaurant_id, score in zip(restaurant_ids, scores) if restaurant_id in restaurants
+            ]
+            if suggestions:
+                return Response(suggestions)
+
+        popular = Restaurant.objects.filter(is_active=True).only(*fields).order_by('-likes_count', 'id')
+        return Response([
+            {**RestaurantSummarySerializer(restaurant).data, 'score': None}
+            for restaurant in popular[:settings.RECOMMENDATION_TOP_K]
+        ])
+
 
-class MenuViewSet(viewsets.ModelViewSet):
+class MenuViewSet(
+    QueryBudgetMixin, BulkWriteMixin, ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet,
+):
     queryset = Menu.objects.all()
     serializer_class = MenuSerializer
-    filter_backends = [filters.SearchFilter]
+    bulk_serializer_class = MenuBulkSerializer
+    query_budgets = {'list': 5, 'retrieve': 4, 'bulk': 10}
+    select_related_map = {'restaurant': ['restaurant']}
+    prefetch_related_map = {'restaurant': [reviews_with_customers('restaurant__reviews')]}
+    cache_scope_param = 'restaurant'
+    etag_timestamp_fields = ('updated_at', 'restaurant__updated_at')
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = ['restaurant']
     search_fields = ['name', 'restaurant__name']
     permission_classes = [permissions.AllowAny]
 
 
-class DishViewSet(viewsets.ModelViewSet):
+class DishViewSet(
+    QueryBudgetMixin, BulkWriteMixin, ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet,
+):
     queryset = Dish.objects.all()
     serializer_class = DishSerializer
-    filter_backends = [DjangoFilterBackend,filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['name']
+    bulk_serializer_class = DishBulkSerializer
+    query_budgets = {'list': 6, 'retrieve': 4, 'bulk': 10, 'also_ordered': 2}
+    select_related_map = {'menu': ['menu__restaurant']}
+    prefetch_related_map = {'menu': [reviews_with_customers('menu__restaurant__reviews')]}
+    cache_scope_param = 'menu__restaurant'
+    cache_owner_attr = 'menu.restaurant_id'
+    etag_timestamp_fields = ('updated_at', 'menu__updated_at', 'menu__restaurant__updated_at')
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
+    filterset_fields = ['name', 'menu', 'menu__restaurant']
     search_fields = ['name', 'category', 'menu__restaurant__name']
+    search_vector_fields = ['search_vector', 'menu__restaurant__search_vector']
+    search_trigram_fields = ['name']
     ordering_fields = ['price', 'name']
     permission_classes = [permissions.AllowAny]
 
+    @action(detail=True, url_path='also-ordered')
+    def also_ordered(self, request, pk=None):
+        """Shu taom bilan birga buyurtma qilinadigan taomlar (build_recommendations top-K jadvalidan)"""
+        dish_id = _int_or_404(pk)
+        row = DishRecommendation.objects.filter(pk=dish_id).values_list('dish_ids', 'scores').first()
+        if row is None:
+            if not Dish.objects.filter(pk=dish_id).exists():
+                raise NotFound()
+            return Response([])
+        dish_ids, scores = row
+        dishes = Dish.objects.filter(is_available=True, menu__is_active=True).only(
+            'id', 'name', 'price', 'menu_id',
+        ).in_bulk(dish_ids)
+        return Response([
+            {**DishSummarySerializer(dishes[neighbour_id]).data, 'score': score}
+            for neighbour_id, score in zip(dish_ids, scores) if neighbour_id in dishes
+        ])
+
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(QueryBudgetMixin, ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    query_budgets = {'list': 3, 'retrieve': 3}
+    select_related_map = {'user_full_name': ['user']}
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class DriverViewSet(viewsets.ModelViewSet):
+class DriverViewSet(QueryBudgetMixin, ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Driver.objects.all()
     serializer_class = DriverSerializer
+    query_budgets = {'list': 3, 'retrieve': 3}
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['rating']
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all().select_related('customer', 'restaurant', 'driver')
+class OrderViewSet(QueryBudgetMixin, TransitionMixin, ConditionalGetMixin, CompactViewMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    query_budgets = {'list': 6, 'retrieve': 6, 'checkout': 10, 'transition': 5, 'bulk_transition': 4}
+    transition_function = staticmethod(transition_orders)
+    transition_serializer_class = OrderTransitionSerializer
+    bulk_transition_serializer_class = OrderBulkTransitionSerializer
+    select_related_map = {
+        'customer': ['customer__user'],
+        'restaurant': ['restaurant'],
+        'driver': ['driver'],
+    }
+    prefetch_related_map = {
+        'restaurant': [reviews_with_customers('restaurant__reviews')],
+        'items': [order_items_with_dishes(), reviews_with_customers('items__dish__menu__restaurant__reviews')],
+    }
+    compact_serializer_class = OrderCompactSerializer
+    etag_timestamp_fields = (
+        'updated_at', 'customer__updated_at', 'restaurant__updated_at',
+        'driver__updated_at', 'items__dish__updated_at',
+    )
+    compact_select_related = ('customer', 'restaurant', 'driver')
+    compact_prefetch_related = (
+        Prefetch('items', queryset=OrderItem.objects.select_related('dish')),
+    )
+    # Tartib OrderPagination da qat'iy (-placed_at, -id): ?ordering= keyset indeksini buzadi
+    filter_backends = [FullTextSearchFilter]
     search_fields = ['customer__full_name', 'restaurant__name']
-    ordering_fields = ['placed_at', 'status']
+    search_vector_fields = ['restaurant__search_vector']
+    search_trigram_fields = ['customer__full_name']
+    pagination_class = OrderPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         user = self.request.user
         if user.is_staff:
-            return self.queryset
+            return queryset
         if hasattr(user, 'customer_profile'):
-            return self.queryset.filter(customer=user.customer_profile)
-        return self.queryset.none()
+            return queryset.filter(customer=user.customer_profile)
+        return queryset.none()
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -80,48 +245,216 @@ class OrderViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
+    @action(detail=False, methods=['post'], serializer_class=OrderCheckoutSerializer)
+    def checkout(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
-class OrderItemViewSet(viewsets.ModelViewSet):
+class OrderItemViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
+    query_budgets = {'list': 3, 'retrieve': 3}
+    select_related_map = {'dish': ['dish__menu__restaurant']}
+    prefetch_related_map = {'dish': [reviews_with_customers('dish__menu__restaurant__reviews')]}
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(QueryBudgetMixin, CompactViewMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    query_budgets = {'list': 5, 'retrieve': 5}
+    select_related_map = {'order': order_select_related('order__')}
+    prefetch_related_map = {'order': order_prefetches('order__')}
+    compact_serializer_class = PaymentCompactSerializer
+    compact_select_related = ('order',)
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['paid_at', 'amount']
     permission_classes = [permissions.IsAuthenticated]
 
 
-class DeliveryViewSet(viewsets.ModelViewSet):
+class DeliveryViewSet(QueryBudgetMixin, TransitionMixin, ConditionalGetMixin, CompactViewMixin, viewsets.ModelViewSet):
     queryset = Delivery.objects.all()
     serializer_class = DeliverySerializer
-    filter_backends = [filters.OrderingFilter]
-    ordering_fields = ['status', 'created_at']
+    query_budgets = {'list': 6, 'retrieve': 6, 'transition': 5, 'bulk_transition': 4}
+    transition_function = staticmethod(transition_deliveries)
+    transition_serializer_class = DeliveryTransitionSerializer
+    bulk_transition_serializer_class = DeliveryBulkTransitionSerializer
+    select_related_map = {'driver': ['driver'], 'order': order_select_related('order__')}
+    prefetch_related_map = {'order': order_prefetches('order__')}
+    compact_serializer_class = DeliveryCompactSerializer
+    # OrderSerializer orqali javobga kiradigan jadvallar ham (OrderViewSet dagidek)
+    etag_timestamp_fields = (
+        'updated_at', 'driver__updated_at', 'order__updated_at', 'order__customer__updated_at',
+        'order__restaurant__updated_at', 'order__driver__updated_at', 'order__items__dish__updated_at',
+    )
+    compact_select_related = ('order', 'driver')
+    filter_backends = []
+    pagination_class = DeliveryPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    @staticmethod
+    def _assign_order(delivery):
+        # Buyurtma haydovchisi yetkazish haydovchisi bilan bir xil bo'ladi
+        Order.objects.filter(pk=delivery.order_id).exclude(driver_id=delivery.driver_id).update(
+            driver_id=delivery.driver_id, updated_at=timezone.now()
+        )
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.all().select_related('customer', 'restaurant', 'driver')
+    def perform_create(self, serializer):
+        if serializer.validated_data.get('driver') is not None:
+            with transaction.atomic():
+                self._assign_order(serializer.save())
+            return
+
+        # Indeks jarayon ichida: boshqa worker ham shu haydovchini band qilishi mumkin (availability.py)
+        driver_id = availability_index.claim()
+        if driver_id is None:
+            raise serializers.ValidationError({'driver_id': "Hozircha bo'sh haydovchi yo'q."})
+        try:
+            with transaction.atomic():
+                self._assign_order(serializer.save(driver_id=driver_id))
+        except Exception:
+            availability_index.release(driver_id)
+            raise
+
+
+class ReviewViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    query_budgets = {'list': 3, 'retrieve': 3}
+    select_related_map = {'customer': ['customer__user'], 'restaurant': ['restaurant']}
+    prefetch_related_map = {'restaurant': [reviews_with_customers('restaurant__reviews')]}
+    filter_backends = [FullTextSearchFilter]
     search_fields = ['customer__full_name', 'restaurant__name', 'driver__full_name']
-    ordering_fields = ['rating', 'created_at']
+    search_vector_fields = ['restaurant__search_vector']
+    search_trigram_fields = ['customer__full_name', 'driver__full_name']
+    pagination_class = ReviewPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         user = self.request.user
         if user.is_staff:
-            return self.queryset
+            return queryset
         if hasattr(user, 'customer_profile'):
-            return self.queryset.filter(customer=user.customer_profile)
-        return self.queryset.none()
+            return queryset.filter(customer=user.customer_profile)
+        return queryset.none()
 
+    # Sharh va restoran/haydovchi hisoblagichlari (signals.py) bitta tranzaksiyada yoziladi
+    @transaction.atomic
     def perform_create(self, serializer):
         user = self.request.user
         if hasattr(user, 'customer_profile'):
             serializer.save(customer=user.customer_profile)
         else:
             serializer.save()
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+
+class DailyStatsViewSet(QueryBudgetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Kunlik statistika (refresh_daily_stats buyrug'i to'ldiradi), buyurtmalar skanerlanmaydi.
+    ?restaurant=1&day__gte=2024-01-01&day__lte=2024-12-31
+    """
+    queryset = DailyRestaurantStats.objects.all()
+    serializer_class = DailyRestaurantStatsSerializer
+    query_budgets = {'list': 3, 'summary': 5}
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {'restaurant': ['exact'], 'day': ['exact', 'gte', 'lte']}
+    ordering_fields = ['day', 'revenue', 'orders_count']
+    permission_classes = [permissions.IsAdminUser]
+
+    @action(detail=False)
+    def summary(self, request):
+        """Oraliq bo'yicha jami ko'rsatkichlar va eng ko'p sotilgan taomlar"""
+        totals = self.filter_queryset(self.get_queryset()).aggregate(
+            orders_count=Sum('orders_count'), cancelled_count=Sum('cancelled_count'),
+            items_count=Sum('items_count'), revenue=Sum('revenue'), paid_amount=Sum('paid_amount'),
+        )
+        completed = (totals['orders_count'] or 0) - (totals['cancelled_count'] or 0)
+        totals['average_basket'] = round(totals['revenue'] / completed, 2) if completed else None
+
+        dish_filter = filterset_factory(DailyDishStats, fields=self.filterset_fields)(
+            request.query_params, queryset=DailyDishStats.objects.all()
+        )
+        if not dish_filter.is_valid():
+            raise serializers.ValidationError(dish_filter.errors)
+        top_dishes = (
+            dish_filter.qs.order_by()
+            .values('dish_id', 'dish__name')
+            .annotate(total_quantity=Sum('quantity'), total_revenue=Sum('revenue'))
+            .order_by('-total_quantity', 'dish_id')[:10]
+        )
+        return Response({**totals, 'top_dishes': list(top_dishes)})
+
+
+class ExportView(APIView):
+    """
+    GET export/<dataset>/?output=csv|ndjson&restaurant=&date_from=&date_to=&status=
+    dataset: orders, order-items, payments, reviews. Javob oqim bilan yuboriladi.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, dataset):
+        if dataset not in export.EXPORTS:
+            return Response({'detail': "Bunday eksport yo'q."}, status=status.HTTP_404_NOT_FOUND)
+        params = request.query_params
+        output = params.get('output', 'csv')
+        if output not in export.FORMATS:
+            raise serializers.ValidationError({'output': f"Mumkin qiymatlar: {', '.join(export.FORMATS)}"})
+        try:
+            queryset = export.export_queryset(
+                dataset,
+                restaurant=params.get('restaurant'),
+                date_from=export.parse_bound(params['date_from']) if params.get('date_from') else None,
+                date_to=export.parse_bound(params['date_to'], end=True) if params.get('date_to') else None,
+                status=params.get('status'),
+            )
+        except ValueError as error:
+            raise serializers.ValidationError({'detail': str(error)})
+
+        response = StreamingHttpResponse(
+            export.stream(dataset, output, queryset), content_type=export.FORMATS[output]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{output}"'
+        return response
+
+
+class MetricsView(APIView):
+    """Endpointlar bo'yicha so'rovlar soni, DB/serializatsiya vaqti va javob hajmi gistogrammalari"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics_registry.snapshot())
+
+
+class TrendingView(APIView):
+    """
+    GET trending/?window=hour|day&k=10
+    Oxirgi soat/kunda eng ko'p buyurtma qilingan taomlar va layk olgan restoranlar (restaurant/trending.py).
+    Javob xotiradagi hisoblagichlardan olinadi, id va son qaytariladi.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        window = request.query_params.get('window', 'hour')
+        if window not in TRENDING_WINDOWS:
+            raise serializers.ValidationError({'window': f"Mumkin qiymatlar: {', '.join(TRENDING_WINDOWS)}"})
+        k = _int_or_400('k', request.query_params.get('k', 10))
+        if not 1 <= k <= settings.TRENDING_MAX_K:
+            raise serializers.ValidationError({'k': f"1 dan {settings.TRENDING_MAX_K} gacha bo'lishi kerak."})
+        top = trending_index.top(window, k)
+        return Response({
+            'window': window,
+            'dishes': [{'id': dish_id, 'count': count} for dish_id, count in top['dishes']],
+            'restaurants': [{'id': restaurant_id, 'count': count} for restaurant_id, count in top['restaurants']],
+        })